@@ -0,0 +1,128 @@
+"""
+Token issuance benchmark: login throughput and fleet re-provisioning (sqlite + Redis from the secret config).
+
+Compares the previous issuance (two sequential session writes per token pair) with the current one
+(both session keys in one pipeline, and one pipeline for a whole batch of users).
+
+Run from the project root: `python -m benchmarks.auth_token_issuance`
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from typing import Callable, Awaitable, List
+
+from src.core.state import project_settings, PyModuleConfig, JsonFileConfig
+
+project_settings.register_config(PyModuleConfig('src.config'))
+project_settings.register_config(JsonFileConfig(project_settings.SECRET_CONFIG_PATH))
+project_settings.register_config(JsonFileConfig(project_settings.STATUS_CODES_CONFIG_PATH))
+
+USERS = int(os.environ.get("BENCH_USERS", 1_000))
+LOGINS = int(os.environ.get("BENCH_LOGINS", 2_000))
+CONCURRENCY = int(os.environ.get("BENCH_CONCURRENCY", 50))
+
+_database_path = os.path.join(tempfile.mkdtemp(), "auth_token_issuance_benchmark.db")
+project_settings.DATABASE_URL = f"sqlite+aiosqlite:///{_database_path}"
+
+from sqlalchemy import insert  # noqa: E402
+
+from src.core.db import BaseModel  # noqa: E402
+from src.main.components.auth.internal_utils.authenticator import JWTAuthenticatorST  # noqa: E402
+from src.main.components.auth.internal_utils.session_manager_redis import AuthSessionManagerRedisST  # noqa: E402
+from src.main.components.auth.models.access_token_payload import AccessTokenPayload  # noqa: E402
+from src.main.components.auth.models.auth_token_pair import AuthTokenPair  # noqa: E402
+from src.main.components.auth.models.refresh_token_payload import RefreshTokenPayload  # noqa: E402
+from src.main.components.auth.models.user import UserModel, UserInternal  # noqa: E402
+from src.main.components.auth.resources import UserResourceST  # noqa: E402
+from src.main.db import AsyncDatabaseManagerST  # noqa: E402
+
+_authenticator = JWTAuthenticatorST()
+_session_manager = AuthSessionManagerRedisST()
+_user_resource = UserResourceST()
+
+PASSWORD = "benchmark"
+
+Login = Callable[[str], Awaitable[AuthTokenPair]]
+
+
+async def legacy_create_token_pair(user: UserInternal) -> AuthTokenPair:
+    """Issuance used before: access and refresh session keys are written one after another"""
+
+    access_payload = AccessTokenPayload(user_id=user.id)  # type: ignore
+    refresh_payload = RefreshTokenPayload(user_id=user.id)  # type: ignore
+
+    if (replaced_uuid := await _session_manager.set_active_access_uuid(user.id, access_payload.uuid)) is not None:
+        await _authenticator._revoke_access_tokens(replaced_uuid)
+    await _session_manager.set_active_refresh_uuid(user.id, refresh_payload.uuid)
+
+    access_token, refresh_token = _authenticator._sign_tokens(access_payload, refresh_payload)
+    return AuthTokenPair(access_token=access_token, refresh_token=refresh_token)
+
+
+async def legacy_login(username: str) -> AuthTokenPair:
+    return await legacy_create_token_pair(await _authenticator._login_user(username, PASSWORD))
+
+
+async def current_login(username: str) -> AuthTokenPair:
+    _, token_pair = await _authenticator.login(username, PASSWORD)
+    return token_pair
+
+
+async def seed(db_manager: AsyncDatabaseManagerST) -> List[UserInternal]:
+    password = await _user_resource.hash_password(PASSWORD)
+
+    async with db_manager.engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+        await conn.execute(insert(UserModel), [
+            {"id": user_id, "username": f"device_{user_id}", "password": password, "is_device": True}
+            for user_id in range(1, USERS + 1)
+        ])
+
+    return [UserInternal(id=user_id, username=f"device_{user_id}", is_device=True, created_at=0) for user_id in range(1, USERS + 1)]  # type: ignore
+
+
+async def measure_logins(login: Login) -> float:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def _login(number: int) -> None:
+        async with semaphore:
+            await login(f"device_{number % USERS + 1}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_login(number) for number in range(LOGINS)))
+    return time.perf_counter() - started
+
+
+async def measure_fleet(users: List[UserInternal], batch: bool) -> float:
+    started = time.perf_counter()
+    if batch:
+        await _authenticator.issue_token_pairs(users)
+    else:
+        for user in users:
+            await legacy_create_token_pair(user)
+    return time.perf_counter() - started
+
+
+async def main() -> None:
+    db_manager = await AsyncDatabaseManagerST()
+    users = await seed(db_manager)
+
+    await _authenticator.issue_token_pairs(users)  # Every measured login replaces an active session, like in production
+
+    print(f"{USERS} users, {LOGINS} logins, concurrency {CONCURRENCY}")
+    for name, login in (("legacy", legacy_login), ("current", current_login)):
+        elapsed = await measure_logins(login)
+        print(f"login  {name:<8} {elapsed:8.3f}s  {LOGINS / elapsed:10.1f} logins/s")
+
+    for name, batch in (("legacy (per user)", False), ("current (batch)", True)):
+        elapsed = await measure_fleet(users, batch)
+        print(f"fleet  {name:<18} {elapsed:8.3f}s  {USERS / elapsed:10.1f} pairs/s")
+
+    await db_manager.engine.dispose()
+    os.remove(_database_path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+"""
+Network check benchmark against a seeded `device_pairs` table (sqlite).
+
+Compares the previous three-statement `is_same_network` with the current single-statement check,
+with and without `device_pairs` indexes.
+
+Run from the project root: `python -m benchmarks.device_pairs_network_check`
+"""
+
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Awaitable, List, Tuple
+
+from src.core.state import project_settings, PyModuleConfig, JsonFileConfig
+
+project_settings.register_config(PyModuleConfig('src.config'))
+project_settings.register_config(JsonFileConfig(project_settings.STATUS_CODES_CONFIG_PATH))
+
+OWNERS = int(os.environ.get("BENCH_OWNERS", 25_000))
+DEVICES_PER_OWNER = 4  # 100k pairs
+CHECKS = 2_000
+DEVICE_ID_OFFSET = 1_000_000
+
+_database_path = os.path.join(tempfile.mkdtemp(), "device_pairs_benchmark.db")
+project_settings.DATABASE_URL = f"sqlite+aiosqlite:///{_database_path}"
+
+from sqlalchemy import select, func, text, insert  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from src.core.db import BaseModel  # noqa: E402
+from src.main.components.auth.models.user import UserModel  # noqa: E402
+from src.main.components.devices.models.device_pair import DevicePairModel  # noqa: E402
+from src.main.components.devices.resources import DevicePairResourceST  # noqa: E402
+from src.main.db import AsyncDatabaseManagerST  # noqa: E402
+
+_device_pair_resource = DevicePairResourceST()
+
+NetworkCheck = Callable[[AsyncSession, int, int], Awaitable[bool]]
+
+
+async def legacy_is_same_network(session: AsyncSession, user_id_1: int, user_id_2: int) -> bool:
+    """Three-statement check used before"""
+
+    stmt_1 = select(DevicePairModel).where((DevicePairModel.user_id == user_id_1) & (DevicePairModel.device_id == user_id_2))
+    stmt_2 = select(DevicePairModel).where((DevicePairModel.user_id == user_id_2) & (DevicePairModel.device_id == user_id_1))
+
+    if (await session.execute(stmt_1)).scalars().first() or (await session.execute(stmt_2)).scalars().first():
+        return True
+
+    stmt_3 = select(DevicePairModel.user_id).where(
+        (DevicePairModel.device_id == user_id_1) | (DevicePairModel.device_id == user_id_2)
+    ).group_by(DevicePairModel.user_id).having(func.count(DevicePairModel.user_id) == 2)
+
+    return bool((await session.execute(stmt_3)).scalars().first())
+
+
+def _device_id(owner_id: int, number: int) -> int:
+    return DEVICE_ID_OFFSET + owner_id * DEVICES_PER_OWNER + number
+
+
+async def seed(db_manager: AsyncDatabaseManagerST) -> None:
+    async with db_manager.engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+
+        users = [{"id": owner_id, "username": f"user_{owner_id}", "password": "-"} for owner_id in range(1, OWNERS + 1)]
+        pairs = []
+        for owner_id in range(1, OWNERS + 1):
+            for number in range(DEVICES_PER_OWNER):
+                device_id = _device_id(owner_id, number)
+                users.append({"id": device_id, "username": f"device_{device_id}", "password": "-", "is_device": True})
+                pairs.append({"user_id": owner_id, "device_id": device_id})
+
+        await conn.execute(insert(UserModel), users)
+        await conn.execute(insert(DevicePairModel), pairs)
+
+
+async def set_indexes(db_manager: AsyncDatabaseManagerST, enabled: bool) -> None:
+    async with db_manager.engine.begin() as conn:
+        for index in DevicePairModel.__table__.indexes:
+            if enabled:
+                await conn.run_sync(lambda sync_conn: index.create(sync_conn, checkfirst=True))  # noqa: B023
+            else:
+                await conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+
+def make_checks() -> List[Tuple[int, int]]:
+    rnd = random.Random(0)
+    checks = []
+    for _ in range(CHECKS):
+        owner_id = rnd.randint(1, OWNERS)
+        other_owner_id = rnd.randint(1, OWNERS)
+        checks.append(rnd.choice((
+            (owner_id, _device_id(owner_id, 0)),  # Owner and device
+            (_device_id(owner_id, 1), _device_id(owner_id, 2)),  # Devices of the same owner
+            (_device_id(owner_id, 0), _device_id(other_owner_id, 3)),  # Different networks
+        )))
+    return checks
+
+
+async def measure(db_manager: AsyncDatabaseManagerST, check: NetworkCheck, checks: List[Tuple[int, int]]) -> float:
+    async with db_manager.session() as session:
+        started = time.perf_counter()
+        for user_id_1, user_id_2 in checks:
+            await check(session, user_id_1, user_id_2)
+        return time.perf_counter() - started
+
+
+async def main() -> None:
+    db_manager = await AsyncDatabaseManagerST()
+    await seed(db_manager)
+    checks = make_checks()
+
+    variants = (
+        ("legacy (3 statements)", legacy_is_same_network),
+        ("current (1 statement)", _device_pair_resource._check_same_network),
+    )
+
+    print(f"{OWNERS * DEVICES_PER_OWNER} pairs, {CHECKS} checks")
+    for indexes_enabled in (False, True):
+        await set_indexes(db_manager, indexes_enabled)
+
+        for name, check in variants:
+            elapsed = await measure(db_manager, check, checks)
+            print(f"indexes={'on ' if indexes_enabled else 'off'}  {name:<22} {elapsed:8.3f}s  {elapsed / CHECKS * 1e6:10.1f}us/check")
+
+    await db_manager.engine.dispose()
+    os.remove(_database_path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
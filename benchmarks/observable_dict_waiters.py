@@ -0,0 +1,86 @@
+"""
+Long-poll wakeup benchmark for AsyncObservableDict with many concurrent waiters (one per device).
+
+Compares waiting with `filter_func` (every insert wakes every waiter, which re-filters and re-registers),
+the same with the previous list of global waiters (popped from the front), and waiting on an index key
+(only waiters of the inserted device are woken).
+
+Run from the project root: `python -m benchmarks.observable_dict_waiters`
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Coroutine, Any, Callable, Dict, List, Optional, Tuple
+
+from src.core.utils.collections import AsyncObservableDict
+
+WAITERS = int(os.environ.get("BENCH_WAITERS", 10_000))
+INSERTS = int(os.environ.get("BENCH_INSERTS", 100))
+
+Request = Tuple[int, int]  # Request id, device id
+Wait = Callable[[AsyncObservableDict, int], Coroutine[Any, Any, Request]]
+
+
+class LegacyAsyncObservableDict(AsyncObservableDict):
+    """Global waiters kept in a list and woken by popping from the front, as before"""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._global_pending = []  # type: ignore
+
+    def _register_future(self, future: asyncio.Future, key: Optional[int] = None) -> None:
+        self._global_pending.append(future)  # type: ignore
+
+    def _unregister_future(self, future: asyncio.Future, key: Optional[int] = None) -> None:
+        pass  # Woken futures were left behind before
+
+    def _notify(self, key: int, value: Request) -> None:
+        while self._global_pending:
+            future = self._global_pending.pop(0)  # type: ignore
+            if not future.done():
+                future.set_result(value)
+
+
+async def wait_filtered(requests: AsyncObservableDict, device_id: int) -> Request:
+    return await requests.wait_for(filter_func=lambda request: request[1] == device_id)
+
+
+async def wait_indexed(requests: AsyncObservableDict, device_id: int) -> Request:
+    return await requests.wait_for_index("device_id", device_id)
+
+
+async def measure(requests: AsyncObservableDict, wait: Wait, devices: List[int]) -> float:
+    waiters: Dict[int, asyncio.Task[Request]] = {device_id: asyncio.create_task(wait(requests, device_id)) for device_id in range(WAITERS)}
+    await asyncio.sleep(0)  # Let all waiters register
+
+    started = time.perf_counter()
+    for request_id, device_id in enumerate(devices):
+        requests[request_id] = (request_id, device_id)
+        await waiters[device_id]
+    elapsed = time.perf_counter() - started
+
+    for task in waiters.values():
+        task.cancel()
+    await asyncio.gather(*waiters.values(), return_exceptions=True)
+    return elapsed
+
+
+async def main() -> None:
+    devices = random.Random(0).sample(range(WAITERS), INSERTS)
+
+    variants = (
+        ("filter, list of waiters (legacy)", LegacyAsyncObservableDict, wait_filtered),
+        ("filter, set of waiters", AsyncObservableDict, wait_filtered),
+        ("index", AsyncObservableDict, wait_indexed),
+    )
+
+    print(f"{WAITERS} waiters, {INSERTS} inserts")
+    for name, dict_cls, wait in variants:
+        elapsed = await measure(dict_cls(indexes={"device_id": lambda request: request[1]}), wait, devices)
+        print(f"{name:<34} {elapsed:8.3f}s  {elapsed / INSERTS * 1e3:10.3f}ms/insert")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
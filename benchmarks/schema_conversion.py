@@ -0,0 +1,96 @@
+"""
+ORM-to-schema conversion benchmark (in-memory objects, no database).
+
+Compares the previous `to_schema` (validating `parse_obj` of the whole `__dict__`) with the current cached converters
+for users and device pairs with nested users, and the uncached `sqlalchemy_to_pydantic` with the cached one.
+
+Run from the project root: `python -m benchmarks.schema_conversion`
+"""
+
+import os
+import time
+import warnings
+from datetime import datetime
+from typing import Callable, Any, List, Type, Tuple
+
+from src.core.state import project_settings, PyModuleConfig, JsonFileConfig
+
+project_settings.register_config(PyModuleConfig('src.config'))
+project_settings.register_config(JsonFileConfig(project_settings.STATUS_CODES_CONFIG_PATH))
+
+OBJECTS = int(os.environ.get("BENCH_OBJECTS", 20_000))
+SCHEMA_GENERATIONS = 200
+
+from src.core.db import BaseModel, BaseSchema, sqlalchemy_to_pydantic  # noqa: E402
+from src.core.db.sqlalchemy_to_pydantic import _generated_schemas  # noqa: E402
+from src.main.components.auth.models.user import UserModel, UserInternal  # noqa: E402
+from src.main.components.devices.models.device_pair import DevicePairModel, DevicePair  # noqa: E402
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)  # `parse_obj` of the previous implementation
+
+
+def legacy_to_schema(model_obj: BaseModel, scheme_cls: Type[BaseSchema]) -> BaseSchema:
+    """Conversion used before"""
+    return scheme_cls.parse_obj({**model_obj.__dict__})
+
+
+def legacy_pair_to_schema(pair: DevicePairModel) -> BaseSchema:
+    """Previous conversion of a pair; Its field validators converted nested users with the previous `to_schema` too"""
+    return DevicePair.parse_obj({
+        **pair.__dict__,
+        "user": legacy_to_schema(pair.user, UserInternal),
+        "device": legacy_to_schema(pair.device, UserInternal),
+    })
+
+
+def legacy_sqlalchemy_to_pydantic(db_model: Type[BaseModel]) -> type:
+    """Schema generation used before (a new class on every call)"""
+
+    _generated_schemas.clear()
+    return sqlalchemy_to_pydantic(db_model)
+
+
+def make_user(user_id: int, is_device: bool = False) -> UserModel:
+    return UserModel(id=user_id, username=f"user_{user_id}", password="-", is_device=is_device, created_at=datetime.now())  # type: ignore
+
+
+def make_pair(pair_id: int) -> DevicePairModel:
+    user, device = make_user(pair_id * 2), make_user(pair_id * 2 + 1, is_device=True)
+    return DevicePairModel(id=pair_id, user_id=user.id, device_id=device.id, user=user, device=device, created_at=datetime.now())  # type: ignore
+
+
+def measure(convert: Callable[[Any], Any], objects: List[Any]) -> float:
+    started = time.perf_counter()
+    for obj in objects:
+        convert(obj)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    users = [make_user(user_id) for user_id in range(OBJECTS)]
+    pairs = [make_pair(pair_id) for pair_id in range(OBJECTS)]
+
+    variants = (
+        ("user     legacy", lambda user: legacy_to_schema(user, UserInternal), users),
+        ("user     current", lambda user: user.to_schema(UserInternal), users),
+        ("pair     legacy", legacy_pair_to_schema, pairs),
+        ("pair     current", lambda pair: pair.to_schema(DevicePair), pairs),
+    )
+
+    print(f"{OBJECTS} objects per conversion")
+    for name, convert, objects in variants:
+        elapsed = measure(convert, objects)
+        print(f"{name:<18} {elapsed:8.3f}s  {elapsed / len(objects) * 1e6:8.2f}us/object")
+
+    models = [UserModel] * SCHEMA_GENERATIONS
+    generators: Tuple[Tuple[str, Callable[[Any], Any]], ...] = (
+        ("schema   legacy", legacy_sqlalchemy_to_pydantic),
+        ("schema   current", sqlalchemy_to_pydantic),
+    )
+    for name, generate in generators:
+        elapsed = measure(generate, models)
+        print(f"{name:<18} {elapsed:8.3f}s  {elapsed / len(models) * 1e6:8.2f}us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ import uvicorn
 from setup import (
     setup_loggers,
     setup_database,
+    setup_device_topology_index,
+    setup_access_token_revocations,
     setup_routes,
     setup_error_handlers
 )
@@ -25,6 +27,12 @@ async def _setup(app: fastapi.FastAPI) -> None:
     _logger.info(f"Initializing database")
     await setup_database()
 
+    _logger.info(f"Loading device topology index")
+    await setup_device_topology_index()
+
+    _logger.info(f"Loading access token revocations")
+    await setup_access_token_revocations()
+
     _logger.info(f"Initializing routes")
     await setup_routes(app)
 
@@ -9,6 +9,8 @@ from src.core.loggers import LoggerBuilder
 from src.core.project_state import ProjectState
 from src.core.state import project_settings
 from src.core.utils.errors import supress_exception
+from src.main.components.auth.repository.auth_repository import AuthRepositoryST
+from src.main.components.devices.repository.devices_repository import DevicesRepositoryST
 from src.main.db import AsyncDatabaseManagerST
 from src.main.exceptions.handlers import __handlers__
 from src.main.routes import main_router
@@ -64,6 +66,15 @@ async def setup_database() -> None:
     await setup_database_models(db_manager)
 
 
+async def setup_device_topology_index() -> None:
+    await DevicesRepositoryST().load_topology_index()
+
+
+async def setup_access_token_revocations() -> None:
+    if project_settings.ACCESS_TOKEN_STATELESS:
+        await AuthRepositoryST().load_access_token_revocations()
+
+
 async def setup_database_models(db_manager: 'AsyncDatabaseManagerST') -> None:
     async with db_manager.engine.begin() as conn:
         # if project_settings.STATE != ProjectState.PRODUCTION:
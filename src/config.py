@@ -44,9 +44,34 @@ APPLICATION_LOG_BACKUP_COUNT = 2  # 2 backup files
 HOST = "0.0.0.0"
 PORT = 8000
 
+# Database
+DATABASE_POOL_SIZE = 10
+DATABASE_POOL_MAX_OVERFLOW = 20  # Extra connections opened when pool is exhausted; pool size + overflow must fit MySQL max_connections
+DATABASE_POOL_TIMEOUT = 30  # Seconds to wait for a free connection
+DATABASE_POOL_RECYCLE = 60 * 60  # Seconds; Must be less than MySQL wait_timeout
+DATABASE_POOL_PRE_PING = True  # Ping on every checkout; With a safe recycle it can be disabled to save a round trip
+DATABASE_POOL_STATS_LOG_INTERVAL = 5 * 60  # Seconds; 0 disables logging
+DATABASE_REPLICA_URLS = ()  # Read-only replicas of DATABASE_URL (usually set in secrets); Empty means all reads go to the primary
+DATABASE_REPLICA_HEALTH_CHECK_INTERVAL = 10  # Seconds
+DATABASE_REPLICA_HEALTH_CHECK_TIMEOUT = 3  # Seconds
+DATABASE_READ_YOUR_WRITES_WINDOW = 5  # Seconds user reads from the primary after a write; Must exceed usual replication lag
+DATABASE_READ_YOUR_WRITES_MAX_USERS = 100_000
+
 # Redis
 REDIS_ENCODING = ENCODING
 MAX_STORAGE_CAPACITY = 2000
+STORAGE_QUEUE_BACKEND = "stream"  # "stream" (acknowledged, resumable delivery) or "list"
+STORAGE_QUEUE_OVERFLOW_POLICY = "drop_oldest"  # "drop_oldest", "reject_new" (429 to the sender) or "spill"
+STORAGE_QUEUE_TTL = 7 * 24 * 60 * 60  # 7d; Queues of users that don't connect expire
+STORAGE_QUEUE_SPILL_CAPACITY = 10000  # Max entries in spill list (overflow policy "spill")
+STORAGE_DISPATCHER_BATCH_SIZE = 100  # Max entries taken from Redis per round trip
+STORAGE_SUBSCRIBER_BUFFER_SIZE = 500  # Max entries buffered in memory per websocket
+STORAGE_LOCAL_DELIVERY = True  # Deliver messages to websockets of the same process without Redis
+STORAGE_WS_BATCH_WINDOW = 0.01  # Seconds to collect messages for one frame in batch delivery mode
+STORAGE_WS_BATCH_MAX_SIZE = 100  # Max messages in one frame in batch delivery mode
+STORAGE_RPC_DEFAULT_TIMEOUT = 10  # Seconds to wait for the response in RPC calls
+STORAGE_RPC_MAX_TIMEOUT = 60
+STORAGE_WS_IDLE_TIMEOUT = 0  # Seconds without frames in either direction after which websocket is closed; 0 disables
 
 REDIS_DB_AUTH = 0
 REDIS_DB_DATA = 1
@@ -56,6 +81,26 @@ ACCESS_TOKEN_EXPIRE = 6 * 60 * 60  # 6h
 REFRESH_TOKEN_EXPIRE = 1 * 60 * 60 * 24 * 90  # 90d
 REFRESH_TOKEN_REDIS_TTL = REFRESH_TOKEN_EXPIRE
 ACCESS_TOKEN_REDIS_TTL = ACCESS_TOKEN_EXPIRE
+ACCESS_TOKEN_STATELESS = False  # Verify access tokens by signature, expiration and revocation set (no Redis round trip)
+AUTH_TOKEN_CACHE_TTL = 30  # Seconds a verified access token is trusted without checking Redis and database
+AUTH_TOKEN_CACHE_MAX_SIZE = 10000
+AUTH_BULK_REGISTER_MAX_SIZE = 100  # Max number of devices registered with one request
+# Each device costs one PBKDF2 hash (~0.3-0.4 s of a core at 600k iterations): 100 devices take ~20 s with 2 threads
+AUTH_BULK_REGISTER_HASH_CONCURRENCY = 2  # Crypto executor threads one bulk request may use; The rest stay for logins
+CRYPTO_EXECUTOR_MAX_WORKERS = 4  # Threads for password hashing
+CRYPTO_EXECUTOR_MAX_QUEUED = 64  # Hashes waiting for a thread; Logins and registrations beyond it get 503
+PASSWORD_HASHERS = (  # The first one encodes new passwords; Others verify old ones (rehashed on login)
+    "src.main.components.auth.internal_utils.password_hashers.PBKDF2PasswordHasher",
+    "src.main.components.auth.internal_utils.password_hashers.SHA256PasswordHasher",
+)
+PASSWORD_PBKDF2_ITERATIONS = 600_000
+USER_CACHE_LOCAL_TTL = 10  # Seconds a user is cached in process memory
+USER_CACHE_LOCAL_MAX_SIZE = 10000
+USER_CACHE_REDIS_TTL = 5 * 60
+USER_CACHE_NEGATIVE_TTL = 30  # Seconds an unknown user id stays cached
 
 # Devices
 DEVICE_PAIR_REQUEST_TTL = 20
+DEVICE_PAIR_REQUEST_BACKEND = "redis"  # "redis" (shared by all worker processes) or "local" (single process only)
+DEVICES_PAGE_MAX_SIZE = 500  # Max devices in one page of `/devices/`
+DEVICE_PAIR_CHANGES_PAGE_SIZE = 100  # Max changes in one response of `/devices/changes/`
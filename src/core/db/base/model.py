@@ -4,6 +4,7 @@ from sqlalchemy.ext.declarative import declarative_base, DeclarativeMeta
 
 from src.core.db.base.schema import BaseSchema
 from src.core.db.exceptions import DoesNotExistError
+from src.core.db.schema_converters import get_schema_converter
 from src.core.db.sqlalchemy_to_pydantic import sqlalchemy_to_pydantic
 
 Base = declarative_base()
@@ -40,7 +41,4 @@ class BaseModel(Base, Generic[_schemaBaseT], metaclass=CustomModelMeta):  # type
         )
 
     def to_schema(self, scheme_cls: Type[_schemaBaseT], **fields) -> _schemaBaseT:
-        return scheme_cls.parse_obj({
-            **self.__dict__,
-            **fields
-        })
+        return get_schema_converter(self.__class__, scheme_cls).convert(self, **fields)
@@ -10,7 +10,7 @@ class AbstractAsyncDatabaseManager(ABC):
     def engine(self) -> AsyncEngine: ...
 
     @abstractmethod
-    def session(self) -> AsyncContextManager[AsyncSession]: ...
+    def session(self, read_only: bool = False) -> AsyncContextManager[AsyncSession]: ...
 
     @abstractmethod
     async def initialize(self) -> Self: ...
@@ -0,0 +1,192 @@
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Generic, Optional, Tuple, Type, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel as PydanticModel
+from sqlalchemy import inspect
+
+if TYPE_CHECKING:
+    from .base import BaseModel  # type: ignore
+
+_schemaT = TypeVar('_schemaT', bound=PydanticModel)
+
+_NestedField = Tuple[str, Type[PydanticModel], bool]  # Field name, nested schema class, is sequence
+
+
+def _get_nested_schema(annotation: Any) -> Optional[Tuple[Type[PydanticModel], bool]]:
+    if isinstance(annotation, type) and issubclass(annotation, PydanticModel):
+        return annotation, False
+
+    origin, args = get_origin(annotation), get_args(annotation)
+
+    if origin is Union:  # Optional[Schema]
+        schemas = [nested for arg in args if arg is not type(None) and (nested := _get_nested_schema(arg)) is not None]
+        return schemas[0] if len(schemas) == 1 else None
+
+    if origin in (list, tuple, set, frozenset) and args and isinstance(args[0], type) and issubclass(args[0], PydanticModel):
+        return args[0], True
+
+    return None
+
+
+def _get_value_types(annotation: Any) -> Optional[FrozenSet[type]]:
+    """Returns exact types of values that need no validation or None if only validation can tell (collections, Any)"""
+
+    if isinstance(annotation, type) and get_origin(annotation) is None:
+        return frozenset((annotation,))  # Exact type: subclasses (bool for int) may be coerced by validation
+
+    if get_origin(annotation) is Union:  # Optional[...] and unions of plain types
+        types = [_get_value_types(arg) for arg in get_args(annotation)]  # NoneType is a plain type too
+        if any(arg_types is None for arg_types in types):
+            return None
+        return frozenset().union(*types)  # type: ignore
+
+    return None
+
+
+def _has_validators(schema_cls: Type[PydanticModel]) -> bool:
+    decorators = schema_cls.__pydantic_decorators__
+    return bool(decorators.field_validators or decorators.model_validators or decorators.validators or decorators.root_validators)
+
+
+class ModelToSchemaConverter(Generic[_schemaT]):
+    """
+    Converts ORM objects of one model class to one schema class (see `get_schema_converter`).
+
+    Schemas without validators and constraints are built without validation from the loaded attributes
+    that the schema declares, as long as every value already has exactly the annotated type.
+    Nested ORM objects (relationships) are converted with converters of their own classes. Schemas with validators,
+    values of other types, missing required fields and extra fields go through `model_validate`,
+    so invalid input still raises ValidationError.
+
+    Methods:
+        `convert(model_obj: BaseModel, **fields) -> _schemaT`
+            Converts ORM object to the schema.
+    """
+
+    def __init__(self, model_cls: Type['BaseModel'], schema_cls: Type[_schemaT]) -> None:
+        """
+        Compiles converter.
+
+        :param model_cls: `Type[BaseModel]`
+            The ORM model to convert from.
+
+        :param schema_cls: `Type[_schemaT]`
+            The schema to convert to.
+        """
+
+        mapped_names = inspect(model_cls).attrs.keys()
+
+        self._schema_cls = schema_cls
+        self._field_names: Tuple[str, ...] = tuple(name for name in schema_cls.model_fields.keys() if name in mapped_names)
+        self._required_names: Tuple[str, ...] = tuple(name for name, info in schema_cls.model_fields.items() if info.is_required())
+        self._nested_fields: Tuple[_NestedField, ...] = tuple(
+            (name, *nested)
+            for name, info in schema_cls.model_fields.items()
+            if (nested := _get_nested_schema(info.annotation)) is not None
+        )
+
+        # None if some field is checked only by validation; Then every conversion is validated
+        field_types = {
+            name: None if info.metadata else _get_value_types(info.annotation)  # Constraints (Field(gt=...)) need validation
+            for name, info in schema_cls.model_fields.items()
+        }
+        self._field_types: Optional[Tuple[Tuple[str, FrozenSet[type]], ...]] = (
+            None if _has_validators(schema_cls) or any(types is None for types in field_types.values())
+            else tuple((name, types) for name, types in field_types.items() if name in self._field_names)  # type: ignore
+        )
+
+        # Instance can be assembled directly when every field comes from the object (no defaults to fill)
+        # and the schema has no private attributes or extra fields to initialize; Otherwise `model_construct` is used
+        self._assemble_directly = (
+            len(self._field_names) == len(schema_cls.model_fields)
+            and not schema_cls.__private_attributes__
+            and schema_cls.model_config.get("extra") != "allow"
+        )
+
+    def _convert_nested(self, value: Any, schema_cls: Type[PydanticModel]) -> Any:
+        from .base import BaseModel
+
+        if isinstance(value, BaseModel):
+            return get_schema_converter(type(value), schema_cls).convert(value)
+        return value
+
+    def _get_values(self, model_obj: 'BaseModel') -> Dict[str, Any]:
+        state = model_obj.__dict__  # Only loaded attributes; Unloaded ones must not trigger lazy loading
+        values = {name: state[name] for name in self._field_names if name in state}
+
+        if not self._nested_fields:
+            return values
+
+        for name, schema_cls, is_sequence in self._nested_fields:
+            if (value := values.get(name)) is None:
+                continue
+
+            if is_sequence:
+                values[name] = [self._convert_nested(item, schema_cls) for item in value]
+            else:
+                values[name] = self._convert_nested(value, schema_cls)
+
+        return values
+
+    def _has_valid_types(self, values: Dict[str, Any]) -> bool:
+        if self._field_types is None:
+            return False
+
+        for name, types in self._field_types:
+            if name in values and type(values[name]) not in types:
+                return False
+        return True
+
+    def _assemble(self, values: Dict[str, Any]) -> _schemaT:
+        schema = self._schema_cls.__new__(self._schema_cls)
+        object.__setattr__(schema, "__dict__", values)
+        object.__setattr__(schema, "__pydantic_fields_set__", set(values))
+        object.__setattr__(schema, "__pydantic_extra__", None)
+        object.__setattr__(schema, "__pydantic_private__", None)
+        return schema
+
+    def convert(self, model_obj: 'BaseModel', **fields) -> _schemaT:
+        """
+        Converts ORM object to the schema.
+
+        :param model_obj: `BaseModel`
+            The ORM object loaded from the database.
+
+        :param fields: `Any`
+            Values that override (or complete) the object's attributes; They are always validated.
+
+        :return: `_schemaT`
+            Instance of the schema.
+        """
+
+        values = self._get_values(model_obj)
+
+        if fields or not self._has_valid_types(values) or any(name not in values for name in self._required_names):
+            return self._schema_cls.model_validate({**values, **fields})
+
+        if self._assemble_directly and len(values) == len(self._field_names):
+            return self._assemble(values)  # Fast path: all fields are loaded
+
+        return self._schema_cls.model_construct(**values)
+
+
+_converters: Dict[Tuple[Type['BaseModel'], Type[PydanticModel]], ModelToSchemaConverter] = {}
+
+
+def get_schema_converter(model_cls: Type['BaseModel'], schema_cls: Type[_schemaT]) -> ModelToSchemaConverter[_schemaT]:
+    """
+    Returns converter from the model to the schema; Converters are compiled on first use and cached.
+
+    :param model_cls: `Type[BaseModel]`
+        The ORM model to convert from.
+
+    :param schema_cls: `Type[_schemaT]`
+        The schema to convert to.
+
+    :return: `ModelToSchemaConverter[_schemaT]`
+        Cached converter.
+    """
+
+    if (converter := _converters.get((model_cls, schema_cls))) is None:
+        converter = _converters[(model_cls, schema_cls)] = ModelToSchemaConverter(model_cls, schema_cls)
+
+    return converter
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, Container, Optional, TypeVar, Type, Tuple
+from typing import TYPE_CHECKING, Container, Optional, TypeVar, Type, Tuple, Dict, Hashable
 
 from pydantic import ConfigDict, create_model
 
@@ -9,6 +9,30 @@ if TYPE_CHECKING:
 
 _schemaBaseT = TypeVar('_schemaBaseT', bound='BaseSchema')
 
+_generated_schemas: Dict[Hashable, type] = {}
+
+
+def _get_cache_key(
+        db_model: Type['BaseModel'],
+        exclude: Optional[Container[str]],
+        config: Optional[ConfigDict],
+        bases: Optional[Tuple[type, ...]],
+        model_kwargs: dict
+) -> Optional[Hashable]:
+    key = (
+        db_model,
+        None if exclude is None else frozenset(exclude),  # type: ignore
+        None if config is None else tuple(sorted(config.items())),
+        bases,
+        tuple(sorted(model_kwargs.items()))
+    )
+
+    try:
+        hash(key)
+    except TypeError:  # Unhashable config or field definitions; Such schemas are generated on every call
+        return None
+    return key
+
 
 def sqlalchemy_to_pydantic(
         db_model: Type['BaseModel'],
@@ -18,6 +42,12 @@ def sqlalchemy_to_pydantic(
         bases: Optional[Tuple[Type[_schemaBaseT], ...]] = None,
         **model_kwargs
 ) -> Type[_schemaBaseT]:
+    """Generates pydantic schema with the model's columns; Schemas are cached, so equal calls return the same class"""
+
+    key = _get_cache_key(db_model, exclude, config, bases, model_kwargs)
+    if key is not None and (cached_cls := _generated_schemas.get(key)) is not None:
+        return cached_cls  # type: ignore
+
     table = db_model.metadata.tables[db_model.__tablename__]
     fields = {}
 
@@ -35,10 +65,14 @@ def sqlalchemy_to_pydantic(
 
         fields[column_name] = (python_type, ...) if not column.nullable else (Optional[python_type], None)
 
-    return create_model(  # type: ignore
+    schema_cls: Type[_schemaBaseT] = create_model(  # type: ignore
         db_model.__name__,
         __config__=config,
         __base__=bases,
         **model_kwargs,
         **fields
     )
+
+    if key is not None:
+        _generated_schemas[key] = schema_cls
+    return schema_cls
@@ -0,0 +1,122 @@
+import time
+from collections import OrderedDict
+from typing import Generic, TypeVar, Optional, Tuple
+
+_KT = TypeVar("_KT")
+_VT = TypeVar("_VT")
+
+
+class TTLCache(Generic[_KT, _VT]):
+    """
+    Bounded in-memory cache with per-entry expiration time.
+    When cache is full, the least recently used entry is evicted.
+
+    Methods:
+        `get(key: _KT) -> Optional[_VT]`
+            Returns cached value or None if key is not cached or expired.
+        `set(key: _KT, value: _VT, ttl: float) -> None`
+            Caches value for `ttl` seconds.
+        `pop(key: _KT) -> Optional[_VT]`
+            Removes key from the cache and returns its value.
+        `purge_expired() -> int`
+            Removes expired entries and returns their number.
+        `clear() -> None`
+            Removes all entries.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """
+        Initializes empty cache.
+
+        :param max_size: `int`
+            Max number of entries in the cache.
+        """
+
+        self._max_size = max_size
+        self._entries: OrderedDict[_KT, Tuple[float, _VT]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: _KT) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: _KT) -> Optional[_VT]:
+        """
+        Returns cached value.
+
+        :param key: `_KT`
+            The key to look up.
+
+        :return: `Optional[_VT]`
+            Cached value or None if key is not cached or expired.
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: _KT, value: _VT, ttl: float) -> None:
+        """
+        Caches value.
+
+        :param key: `_KT`
+            The key to cache value for.
+
+        :param value: `_VT`
+            The value to cache.
+
+        :param ttl: `float`
+            Time in seconds the value stays valid. Values with non-positive ttl are not cached.
+        """
+
+        if ttl <= 0:
+            self._entries.pop(key, None)
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: _KT) -> Optional[_VT]:
+        """
+        Removes key from the cache.
+
+        :param key: `_KT`
+            The key to remove.
+
+        :return: `Optional[_VT]`
+            Removed value or None if key was not cached.
+        """
+
+        entry = self._entries.pop(key, None)
+        return None if entry is None else entry[1]
+
+    def purge_expired(self) -> int:
+        """
+        Removes expired entries; Without purging they are removed only when looked up or evicted.
+
+        :return: `int`
+            Number of removed entries.
+        """
+
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+
+        for key in expired:
+            del self._entries[key]
+
+        return len(expired)
+
+    def clear(self) -> None:
+        self._entries.clear()
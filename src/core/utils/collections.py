@@ -1,6 +1,6 @@
 import asyncio
 import json
-from typing import Optional, Callable, Iterable, TypeVar, Dict, Any, Union, List, Generic
+from typing import Optional, Callable, Iterable, TypeVar, Dict, Any, Union, List, Generic, Hashable, Set, Tuple
 
 _T = TypeVar("_T")
 _KT = TypeVar("_KT")
@@ -113,7 +113,11 @@ class DotDict(Dict[str, Any]):
 class AsyncObservableMixin(Generic[_KT, _VT]):
     """
     Mixin class that provides asynchronous waiting for key-value pairs to be added.
-    To use this mixin, parent class must implement `__getitem__` and `__setitem__` methods
+    To use this mixin, parent class must implement `__getitem__`, `__setitem__`, `__delitem__` and `pop` methods
+
+    Values can be indexed by secondary keys (e.g. `lambda request: request.device.id`), which gives O(1) lookups
+    and waiters that are woken only by values with their index key. Index keys are computed when a value is set,
+    so values must not change their index keys while they are in the collection.
 
     Methods:
         `__setitem__(key: _KT, value: _VT) -> None`
@@ -124,15 +128,25 @@ class AsyncObservableMixin(Generic[_KT, _VT]):
             Registers a future to be notified when a value for the given key is available.
         `wait_for(key: Optional[_KT] = None, filter_func: Optional[Callable[[_VT], bool]] = None, timeout: Optional[float] = None) -> _VT`
             Waits for a value to be available in the dictionary for the given key and optionally filters it.
+        `get_by_index(index: str, index_key: Hashable) -> List[_VT]`
+            Returns values with the given index key.
+        `wait_for_index(index: str, index_key: Hashable, timeout: Optional[float] = None) -> _VT`
+            Returns the first value with the given index key or waits for one to be set.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, indexes: Optional[Dict[str, Callable[[_VT], Hashable]]] = None) -> None:
         """
         Initializes an empty AsyncDict with no pending futures.
+
+        :param indexes: `Optional[Dict[str, Callable[[_VT], Hashable]]]`
+            (Optional) Index names and functions that compute index keys of values.
         """
 
-        self._pending: Dict[_KT, asyncio.Future[_VT]] = {}
-        self._global_pending: List[asyncio.Future[_VT]] = []
+        self._pending: Dict[_KT, Set[asyncio.Future[_VT]]] = {}
+        self._global_pending: Set[asyncio.Future[_VT]] = set()
+        self._index_funcs: Dict[str, Callable[[_VT], Hashable]] = dict(indexes or {})
+        self._index_entries: Dict[str, Dict[Hashable, Dict[_KT, None]]] = {name: {} for name in self._index_funcs}  # Ordered key sets
+        self._index_pending: Dict[str, Dict[Hashable, Set[asyncio.Future[_VT]]]] = {name: {} for name in self._index_funcs}
 
     def __contains__(self, item: _KT) -> bool:
         return super().__contains__(item)  # type: ignore
@@ -150,9 +164,46 @@ class AsyncObservableMixin(Generic[_KT, _VT]):
             The value to set for the given key.
         """
 
+        if self._index_funcs and key in self:
+            self._unindex(key, self[key])
+
         super().__setitem__(key, value)  # type: ignore
+        self._index(key, value)
         self._notify(key, value)
 
+    def __delitem__(self, key: _KT) -> None:
+        value = self[key]
+        super().__delitem__(key)  # type: ignore
+        self._unindex(key, value)
+
+    def pop(self, key: _KT, *default: Any) -> Any:
+        if key not in self:
+            return super().pop(key, *default)  # type: ignore
+
+        value = super().pop(key)  # type: ignore
+        self._unindex(key, value)
+        return value
+
+    def _index(self, key: _KT, value: _VT) -> None:
+        for name, index_func in self._index_funcs.items():
+            self._index_entries[name].setdefault(index_func(value), {})[key] = None
+
+    def _unindex(self, key: _KT, value: _VT) -> None:
+        for name, index_func in self._index_funcs.items():
+            entries = self._index_entries[name]
+            index_key = index_func(value)
+
+            if (keys := entries.get(index_key)) is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del entries[index_key]
+
+    @staticmethod
+    def _resolve_futures(futures: Optional[Set[asyncio.Future[_VT]]], value: _VT) -> None:
+        for future in futures or ():
+            if not future.done():
+                future.set_result(value)
+
     def _notify(self, key: _KT, value: _VT) -> None:
         """
         Notifies the waiting futures that the value for the given key is available.
@@ -164,15 +215,14 @@ class AsyncObservableMixin(Generic[_KT, _VT]):
             The new value for the given key.
         """
 
-        if key in self._pending:
-            future = self._pending.pop(key)
-            if not future.done():
-                future.set_result(value)
+        self._resolve_futures(self._pending.pop(key, None), value)
 
-        while self._global_pending:
-            future = self._global_pending.pop(0)
-            if not future.done():
-                future.set_result(value)
+        for name, index_func in self._index_funcs.items():
+            self._resolve_futures(self._index_pending[name].pop(index_func(value), None), value)
+
+        if self._global_pending:
+            futures, self._global_pending = self._global_pending, set()
+            self._resolve_futures(futures, value)
 
     def _register_future(self, future: asyncio.Future, key: Optional[_KT] = None) -> None:
         """
@@ -186,9 +236,17 @@ class AsyncObservableMixin(Generic[_KT, _VT]):
         """
 
         if key is not None:
-            self._pending[key] = future
+            self._pending.setdefault(key, set()).add(future)
         else:
-            self._global_pending.append(future)
+            self._global_pending.add(future)
+
+    def _unregister_future(self, future: asyncio.Future, key: Optional[_KT] = None) -> None:
+        if key is None:
+            self._global_pending.discard(future)
+        elif (futures := self._pending.get(key)) is not None:
+            futures.discard(future)
+            if not futures:
+                del self._pending[key]
 
     async def wait_for(
             self,
@@ -203,7 +261,8 @@ class AsyncObservableMixin(Generic[_KT, _VT]):
             The key to wait for. If None, waits for any key.
 
         :param filter_func: `Optional[Callable[[_VT], bool]]`
-            An optional function to filter the values.
+            An optional function to filter the values. Waiters with filters are woken by every set value,
+            so filtering by an index key should be done with `wait_for_index`.
 
         :param timeout: `Optional[float]`
             The maximum time to wait for the value, in seconds. If None, waits indefinitely.
@@ -223,14 +282,70 @@ class AsyncObservableMixin(Generic[_KT, _VT]):
         future: asyncio.Future[_VT] = asyncio.Future()
         self._register_future(future, key)
 
-        async with asyncio.timeout(timeout):
-            while True:
-                value = await future
-                if filter_func is None or filter_func(value):
-                    return value
+        try:
+            async with asyncio.timeout(timeout):
+                while True:
+                    value = await future
+                    if filter_func is None or filter_func(value):
+                        return value
+
+                    future = asyncio.Future()
+                    self._register_future(future, key)
+        finally:
+            self._unregister_future(future, key)
+
+    def get_by_index(self, index: str, index_key: Hashable) -> List[_VT]:
+        """
+        Returns values with the given index key.
+
+        :param index: `str`
+            The index name.
 
-                future = asyncio.Future()
-                self._register_future(future, key)
+        :param index_key: `Hashable`
+            The index key to look up.
+
+        :return: `List[_VT]`
+            Values in the order of insertion.
+        """
+
+        return [self[key] for key in self._index_entries[index].get(index_key, ())]
+
+    async def wait_for_index(self, index: str, index_key: Hashable, timeout: Optional[float] = None) -> _VT:
+        """
+        Returns the first value with the given index key or waits for one to be set.
+        Only values with this index key wake the waiter.
+
+        :param index: `str`
+            The index name.
+
+        :param index_key: `Hashable`
+            The index key to wait for.
+
+        :param timeout: `Optional[float]`
+            The maximum time to wait for the value, in seconds. If None, waits indefinitely.
+
+        :return: `_VT`
+            The value with the given index key.
+
+        :raises: `asyncio.TimeoutError`
+            If the timeout is reached before the value is available.
+        """
+
+        if values := self.get_by_index(index, index_key):
+            return values[0]
+
+        pending = self._index_pending[index]
+        future: asyncio.Future[_VT] = asyncio.Future()
+        pending.setdefault(index_key, set()).add(future)
+
+        try:
+            async with asyncio.timeout(timeout):
+                return await future
+        finally:
+            if (futures := pending.get(index_key)) is not None:
+                futures.discard(future)
+                if not futures:
+                    del pending[index_key]
 
 
 class AsyncObservableDict(AsyncObservableMixin, Dict[_KT, _VT]):
@@ -238,6 +353,27 @@ class AsyncObservableDict(AsyncObservableMixin, Dict[_KT, _VT]):
     A dictionary class that supports asynchronous observation of key-value pairs.
     """
 
+    def clear(self) -> None:
+        super().clear()
+
+        for entries in self._index_entries.values():
+            entries.clear()
+
+    def popitem(self) -> Tuple[_KT, _VT]:
+        key, value = super().popitem()
+        self._unindex(key, value)
+        return key, value
+
+    def setdefault(self, key: _KT, default: _VT = None) -> _VT:  # type: ignore
+        if key not in self:
+            self[key] = default
+
+        return self[key]
+
+    def update(self, *args, **kwargs) -> None:  # type: ignore
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
 
 def find_in_dict(dict_: Dict[_KT, _VT], key: _KT) -> Optional[_VT]:
     """
@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Any, Dict, Optional
+
+from .async_tools import run_in_executor
+
+
+class ExecutorQueueFull(RuntimeError):
+    """Raised on submit when max_queued jobs are already waiting for a thread"""
+
+
+class MeteredThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    Thread pool executor that counts queued and running jobs and optionally bounds the queue.
+
+    Methods:
+        `run(function: Callable, *args, **kwargs) -> Any`
+            Runs function in the pool and awaits its result.
+        `stats -> Dict[str, int]`
+            Snapshot of queued, running, completed and rejected jobs and the max queue depth seen so far.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = "", max_queued: Optional[int] = None) -> None:
+        """
+        Initializes executor.
+
+        :param max_workers: `int`
+            Max number of threads; Jobs submitted while all threads are busy wait in the queue.
+
+        :param thread_name_prefix: `str`
+            Prefix of thread names.
+
+        :param max_queued: `Optional[int]`
+            Max number of jobs waiting for a thread; Submitting more raises `ExecutorQueueFull`. None - unbounded.
+        """
+
+        super().__init__(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._max_queued = 0
+        self._rejected = 0
+        self._queue_limit = max_queued
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "max_queued": self._max_queued,
+                "rejected": self._rejected
+            }
+
+    def _wrap(self, function: Callable, *args, **kwargs) -> Any:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+
+        try:
+            return function(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    def submit(self, function: Callable, /, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._queue_limit is not None and self._queued >= self._queue_limit:
+                self._rejected += 1
+                raise ExecutorQueueFull(f"{self._queued} jobs are already waiting for a thread")
+
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+
+        try:
+            return super().submit(self._wrap, function, *args, **kwargs)
+        except BaseException as error:
+            with self._lock:
+                self._queued -= 1
+            raise error
+
+    async def run(self, function: Callable, *args, **kwargs) -> Any:
+        """
+        Runs function in the pool without blocking the event loop.
+
+        :param function: `Callable`
+            Function to run.
+
+        :return: `Any`
+            Function result.
+        """
+
+        return await run_in_executor(self, function, *args, **kwargs)
@@ -0,0 +1,233 @@
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+from typing import Callable, Any, List, Tuple, Optional, Set, Dict
+
+from .errors import get_traceback_text
+from .singleton import SingletonMeta
+
+_logger = logging.getLogger(__name__)
+
+
+class ScheduledCall:
+    """
+    Handle of a call registered in `CallScheduler`.
+
+    Methods:
+        `cancel() -> None`
+            Cancels the call if it was not run yet (does not cancel the task started by the call).
+        `cancelled -> bool`
+            True if the call was cancelled.
+    """
+
+    __slots__ = ("when", "_callback", "_args", "_scheduler", "_cancelled", "_done")
+
+    def __init__(self, when: float, callback: Callable[..., Any], args: Tuple[Any, ...], scheduler: 'CallScheduler') -> None:
+        self.when = when
+        self._callback = callback
+        self._args = args
+        self._scheduler = scheduler
+        self._cancelled = False
+        self._done = False  # Taken from the heap to run
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        if not self._cancelled and not self._done:
+            self._cancelled = True
+            self._scheduler._on_cancel(self)
+
+    def _run(self) -> Any:
+        self._done = True
+        return self._callback(*self._args)
+
+
+class PeriodicCall:
+    """Handle of a call repeated by `CallScheduler.call_every`; Cancelling it stops the repetition"""
+
+    def __init__(self, interval: float, callback: Callable[..., Any], args: Tuple[Any, ...], scheduler: 'CallScheduler') -> None:
+        self._interval = interval
+        self._callback = callback
+        self._args = args
+        self._scheduler = scheduler
+        self._call: Optional[ScheduledCall] = None
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def _schedule(self) -> None:
+        if not self._cancelled:
+            self._call = self._scheduler.call_later(self._interval, self._run)
+
+    def _run(self) -> Any:
+        self._schedule()  # Next run is scheduled first, so a failing callback doesn't stop the repetition
+        return self._callback(*self._args)
+
+    def cancel(self) -> None:
+        self._cancelled = True
+        if self._call is not None:
+            self._call.cancel()
+
+
+class IdleTimer:
+    """
+    Calls `on_idle` when `touch` was not called for `timeout` seconds.
+
+    Touching only updates a timestamp; The scheduled call is moved forward when it fires,
+    so frequently touched timers don't churn the scheduler.
+    """
+
+    def __init__(self, timeout: float, on_idle: Callable[[], Any], scheduler: Optional['CallScheduler'] = None) -> None:
+        self._timeout = timeout
+        self._on_idle = on_idle
+        self._scheduler = scheduler if scheduler is not None else CallSchedulerST()
+        self._last_activity = self._scheduler.time()
+        self._call: Optional[ScheduledCall] = self._scheduler.call_later(timeout, self._check)
+
+    def touch(self) -> None:
+        self._last_activity = self._scheduler.time()
+
+    def _check(self) -> Any:
+        idle_until = self._last_activity + self._timeout
+
+        if idle_until > self._scheduler.time():
+            self._call = self._scheduler.call_at(idle_until, self._check)
+            return None
+
+        self._call = None
+        return self._on_idle()
+
+    def cancel(self) -> None:
+        if self._call is not None:
+            self._call.cancel()
+            self._call = None
+
+
+class CallScheduler:
+    """
+    Runs delayed calls of the current event loop from one heap and one loop timer (armed for the earliest call),
+    so waiting calls cost a heap entry instead of a sleeping task each.
+
+    Callbacks may be plain functions or return awaitables; Awaitables are run as tasks when the call is due.
+    Cancelled calls are removed lazily; The heap is compacted when most of it consists of cancelled calls.
+
+    Methods:
+        `call_later(delay: float, callback: Callable, *args) -> ScheduledCall`
+            Runs callback after `delay` seconds.
+        `call_at(when: float, callback: Callable, *args) -> ScheduledCall`
+            Runs callback at `when` (event loop time).
+        `call_every(interval: float, callback: Callable, *args) -> PeriodicCall`
+            Runs callback every `interval` seconds.
+        `stats -> Dict[str, int]`
+            Numbers of scheduled calls and of running tasks started by calls.
+    """
+
+    COMPACT_MIN_CANCELLED: int = 1024
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, ScheduledCall]] = []
+        self._sequence = itertools.count()  # Keeps FIFO order of calls with equal time
+        self._cancelled = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_when: Optional[float] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "scheduled": len(self._heap) - self._cancelled,
+            "running": len(self._tasks)
+        }
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+
+        if loop is not self._loop:  # Calls and timer of a previous (closed) loop can't run anymore
+            self._heap.clear()
+            self._cancelled = 0
+            self._timer = self._timer_when = None
+            self._loop = loop
+
+        return loop
+
+    def time(self) -> float:
+        return self._get_loop().time()
+
+    def call_at(self, when: float, callback: Callable[..., Any], *args: Any) -> ScheduledCall:
+        loop = self._get_loop()
+
+        call = ScheduledCall(when, callback, args, self)
+        heapq.heappush(self._heap, (when, next(self._sequence), call))
+
+        if self._timer_when is None or when < self._timer_when:
+            self._arm(loop)
+
+        return call
+
+    def call_later(self, delay: float, callback: Callable[..., Any], *args: Any) -> ScheduledCall:
+        return self.call_at(self.time() + delay, callback, *args)
+
+    def call_every(self, interval: float, callback: Callable[..., Any], *args: Any) -> PeriodicCall:
+        periodic_call = PeriodicCall(interval, callback, args, self)
+        periodic_call._schedule()
+        return periodic_call
+
+    def _arm(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = self._timer_when = None
+
+        if self._heap:
+            self._timer_when = self._heap[0][0]
+            self._timer = loop.call_at(self._timer_when, self._run_due)
+
+    def _on_cancel(self, call: ScheduledCall) -> None:
+        self._cancelled += 1
+
+        if self._cancelled >= self.COMPACT_MIN_CANCELLED and self._cancelled * 2 > len(self._heap):
+            self._heap = [item for item in self._heap if not item[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def _start_task(self, awaitable: Any) -> None:
+        task = asyncio.ensure_future(awaitable)
+        self._tasks.add(task)
+        task.add_done_callback(self._on_task_done)
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+
+        if not task.cancelled() and (error := task.exception()) is not None:
+            _logger.error(f"Scheduled call failed:\n{get_traceback_text(error)}")
+
+    def _run_due(self) -> None:
+        loop = self._get_loop()
+        self._timer = self._timer_when = None
+
+        while self._heap and self._heap[0][0] <= loop.time():
+            _, _, call = heapq.heappop(self._heap)
+
+            if call.cancelled:
+                self._cancelled -= 1
+                continue
+
+            try:
+                result = call._run()
+                if inspect.isawaitable(result):
+                    self._start_task(result)
+            except Exception as error:
+                _logger.error(f"Scheduled call failed:\n{get_traceback_text(error)}")
+
+        if self._timer is None:  # Callbacks may have armed the timer already
+            self._arm(loop)
+
+
+class CallSchedulerST(CallScheduler, metaclass=SingletonMeta):
+    """Process-wide scheduler shared by all components"""
@@ -9,5 +9,6 @@ from .generics import (
     TokenValidationFailed,
     AuthUserUnknownHTTPException,
     WrongAuthCredentialsHTTPException,
-    AuthUserAlreadyExists
+    AuthUserAlreadyExists,
+    AuthBusyHTTPException
 )
@@ -91,3 +91,12 @@ class WrongAuthCredentialsHTTPException(AuthHTTPException):
             **project_settings.APPLICATION_STATUS_CODES.AUTH.WRONG_AUTH_CREDENTIALS,
             **payload_kwargs
         })
+
+
+class AuthBusyHTTPException(AuthHTTPException):
+    def get_default_response_payload(self, **payload_kwargs) -> ApplicationResponsePayload:
+        return ApplicationResponsePayload(**{
+            "ok": False,
+            **project_settings.APPLICATION_STATUS_CODES.AUTH.AUTH_BUSY,
+            **payload_kwargs
+        })
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.core.state import project_settings
+from src.core.utils.cache import TTLCache
+from src.core.utils.errors import supress_exception
+from src.core.utils.scheduler import CallSchedulerST
+from src.core.utils.singleton import SingletonMeta
+from src.main.redis import RedisPubSubListenerST
+from ..models.access_token_payload import AccessTokenPayload
+from ..models.user import UserInternal
+
+_logger = logging.getLogger(__name__)
+_pubsub_listener = RedisPubSubListenerST()
+_scheduler = CallSchedulerST()
+
+
+class AccessTokenCacheST(metaclass=SingletonMeta):
+    """
+    Users resolved from verified access tokens, keyed by token uuid.
+
+    Entries live until token expiration, but not longer than AUTH_TOKEN_CACHE_TTL.
+    Revoked tokens are announced in the pub/sub channel, so every worker drops them immediately;
+    The whole cache is dropped after pub/sub reconnect, since announcements may be lost.
+    Expired entries are purged periodically, so tokens that are never used again don't hold memory.
+    """
+
+    REVOCATION_CHANNEL: str = "auth:tokens:access:revoked"
+
+    def __init__(self) -> None:
+        self._users: TTLCache[str, UserInternal] = TTLCache(project_settings.AUTH_TOKEN_CACHE_MAX_SIZE)
+        self._revoked: TTLCache[str, bool] = TTLCache(project_settings.AUTH_TOKEN_CACHE_MAX_SIZE)  # Late `set` must not revive them
+        self._subscribed = False
+        self._subscribe_lock = asyncio.Lock()
+
+        _pubsub_listener.add_reconnect_handler(self._users.clear)
+
+    def _on_revoked(self, token_uuid: str) -> None:
+        self._users.pop(token_uuid)
+        self._revoked.set(token_uuid, True, ttl=project_settings.AUTH_TOKEN_CACHE_TTL)
+
+    def _purge_expired(self) -> None:
+        self._users.purge_expired()
+        self._revoked.purge_expired()
+
+    async def _ensure_subscribed(self) -> bool:
+        """Subscribes to revocations once; Returns False if subscription failed (it is retried on the next call)"""
+
+        if self._subscribed:
+            return True
+
+        async with self._subscribe_lock:
+            if self._subscribed:
+                return True
+
+            try:
+                await _pubsub_listener.subscribe(self.REVOCATION_CHANNEL, self._on_revoked)
+            except (RedisError, OSError) as error:
+                _logger.warning(f"Unable to subscribe to access token revocations ({error.__class__.__name__}: {error})")
+                with supress_exception(Exception):
+                    await _pubsub_listener.unsubscribe(self.REVOCATION_CHANNEL, self._on_revoked)
+                return False
+
+            _scheduler.call_every(project_settings.AUTH_TOKEN_CACHE_TTL, self._purge_expired)
+            self._subscribed = True
+            return True
+
+    async def get(self, payload: AccessTokenPayload) -> Optional[UserInternal]:
+        if not await self._ensure_subscribed():  # Until subscribed nothing is cached, so no revocation can be missed
+            return None
+
+        user = self._users.get(payload.uuid)
+        return user if user is not None and user.id == payload.user_id else None
+
+    def set(self, payload: AccessTokenPayload, user: UserInternal) -> None:
+        if not self._subscribed or payload.uuid in self._revoked:
+            return
+
+        ttl = min(project_settings.AUTH_TOKEN_CACHE_TTL, payload.exp.timestamp() - time.time())
+        self._users.set(payload.uuid, user, ttl=ttl)
+
+    async def revoke(self, *token_uuids: str) -> None:
+        if not token_uuids:
+            return
+
+        for token_uuid in token_uuids:
+            self._on_revoked(token_uuid)
+
+        redis = await _pubsub_listener.get_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            for token_uuid in token_uuids:
+                pipe.publish(self.REVOCATION_CHANNEL, token_uuid)
+            await pipe.execute()
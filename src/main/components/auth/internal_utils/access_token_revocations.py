@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, List, Tuple
+
+from redis.exceptions import RedisError
+
+from src.core.state import project_settings
+from src.core.utils.errors import get_traceback_text
+from src.core.utils.singleton import SingletonMeta
+from src.main.redis import RedisClientManager
+
+_logger = logging.getLogger(__name__)
+
+_StreamMessage = Tuple[str, Dict[str, str]]
+
+
+class AccessTokenRevocationsST(RedisClientManager, metaclass=SingletonMeta):
+    """
+    Process-local set of revoked access token uuids, used in stateless access token mode.
+
+    Revocations are appended to a Redis stream trimmed (MINID) to the access token lifetime,
+    since older revocations can only concern expired tokens. Every worker loads the stream on start
+    and then follows it with blocking reads. While Redis is unavailable the local set stays in effect;
+    Revocations made meanwhile stay in the stream and are applied after reconnect.
+    """
+
+    STREAM_KEY: str = "auth:tokens:access:revocations"
+    UUID_FIELD: str = "uuid"
+    READ_COUNT: int = 1000
+    READ_BLOCK: int = 5000  # ms
+    RECONNECT_DELAY: float = 1.0
+
+    def __init__(self) -> None:
+        super().__init__(db=project_settings.REDIS_DB_AUTH)
+        self._revoked: Dict[str, float] = {}  # uuid -> time after which token is expired anyway; Ordered by time
+        self._last_id = "0-0"
+        self._follow_task: Optional[asyncio.Task] = None
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def _min_id(self) -> str:
+        return f"{int((time.time() - project_settings.ACCESS_TOKEN_EXPIRE) * 1000)}-0"
+
+    def _apply(self, messages: List[_StreamMessage]) -> None:
+        for entry_id, fields in messages:
+            token_uuid = fields[self.UUID_FIELD]
+            self._revoked.pop(token_uuid, None)  # Re-inserted at the end to keep the order
+            self._revoked[token_uuid] = int(entry_id.split("-")[0]) / 1000 + project_settings.ACCESS_TOKEN_EXPIRE
+
+        if messages:
+            self._last_id = messages[-1][0]
+
+        now = time.time()
+        while self._revoked and next(iter(self._revoked.values())) < now:
+            del self._revoked[next(iter(self._revoked))]
+
+    async def _follow(self) -> None:
+        while True:
+            try:
+                redis = await self.get_redis()
+                response = await redis.xread({self.STREAM_KEY: self._last_id}, count=self.READ_COUNT, block=self.READ_BLOCK)
+            except (RedisError, OSError) as error:
+                _logger.warning(f"Unable to read access token revocations ({error.__class__.__name__}: {error}); Retrying")
+                await asyncio.sleep(self.RECONNECT_DELAY)
+                continue
+            except Exception as error:
+                _logger.error(f"Access token revocations reader failed:\n{get_traceback_text(error)}")
+                await asyncio.sleep(self.RECONNECT_DELAY)
+                continue
+
+            if response:
+                self._apply(response[0][1])
+
+    async def load(self) -> None:
+        """Reads revocations made during the token lifetime and starts following new ones"""
+
+        redis = await self.get_redis()
+        while messages := await redis.xrange(self.STREAM_KEY, min=f"({self._last_id}", count=self.READ_COUNT):
+            self._apply(messages)
+
+        self._loaded = True
+        _logger.info(f"Access token revocations loaded: {len(self._revoked)} tokens")
+
+        if self._follow_task is None or self._follow_task.done():
+            self._follow_task = asyncio.create_task(self._follow())
+
+    def is_revoked(self, token_uuid: str) -> bool:
+        return token_uuid in self._revoked
+
+    async def revoke(self, *token_uuids: str) -> None:
+        if not token_uuids:
+            return
+
+        redis = await self.get_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            for token_uuid in token_uuids:
+                pipe.xadd(self.STREAM_KEY, {self.UUID_FIELD: token_uuid}, minid=self._min_id(), approximate=True)
+            await pipe.execute()
+
+        for token_uuid in token_uuids:
+            self._revoked.pop(token_uuid, None)
+            self._revoked[token_uuid] = time.time() + project_settings.ACCESS_TOKEN_EXPIRE
@@ -1,10 +1,12 @@
 import logging
 from http import HTTPStatus
-from typing import Tuple
+from typing import Tuple, Sequence, List, Dict, Any, Optional
 
 import jwt
 import pydantic
 
+from src.core.state import project_settings
+from src.core.utils.executors import ExecutorQueueFull
 from src.core.utils.singleton import SingletonMeta
 from src.core.utils.types import JsonDict
 from src.main.components.auth.exceptions import (
@@ -13,13 +15,16 @@ from src.main.components.auth.exceptions import (
     TokenValidationFailed,
     AuthUserUnknownHTTPException,
     WrongAuthCredentialsHTTPException,
-    AuthUserAlreadyExists
+    AuthUserAlreadyExists,
+    AuthBusyHTTPException
 )
 from src.main.components.auth.internal_utils.jwt import decode_jwt_token, create_jwt_token
 from src.main.components.auth.models.access_token_payload import AccessTokenPayload
 from src.main.components.auth.models.refresh_token_payload import RefreshTokenPayload
 from src.main.components.auth.resources.user_resource import UserResourceST
 from src.main.db import UniqueConstraintFailed
+from .access_token_cache import AccessTokenCacheST
+from .access_token_revocations import AccessTokenRevocationsST
 from .session_manager_redis import AuthSessionManagerRedisST
 from ..models.auth_token_pair import AuthTokenPair
 from ..models.auth_token_payload import AuthTokenPayload
@@ -28,6 +33,8 @@ from ..models.user import UserModel, UserInternal
 _logger = logging.getLogger(__name__)
 _user_resource = UserResourceST()
 _session_manager = AuthSessionManagerRedisST()
+_token_cache = AccessTokenCacheST()
+_revocations = AccessTokenRevocationsST()
 
 
 class JWTAuthenticatorST(metaclass=SingletonMeta):
@@ -51,29 +58,37 @@ class JWTAuthenticatorST(metaclass=SingletonMeta):
         except pydantic.ValidationError as error:
             raise TokenInvalidHTTPException(status_code=HTTPStatus.UNAUTHORIZED) from error
 
-    async def _create_access_token(self, *, payload: AccessTokenPayload) -> str:
-        await _session_manager.set_active_access_uuid(payload.user_id, payload.uuid)
-        return create_jwt_token(payload=payload.to_json_dict(exclude='exp'), exp=payload.exp.timestamp())
-
-    async def _create_refresh_token(self, *, payload: RefreshTokenPayload) -> str:
-        await _session_manager.set_active_refresh_uuid(payload.user_id, payload.uuid)
-        return create_jwt_token(payload=payload.to_json_dict(exclude='exp'), exp=payload.exp.timestamp())
+    def _sign_tokens(self, *payloads: AuthTokenPayload) -> List[str]:
+        # HMAC signing takes microseconds; Running it inline is cheaper than a thread hop
+        return [create_jwt_token(payload=payload.to_json_dict(exclude='exp'), exp=payload.exp.timestamp()) for payload in payloads]
 
     async def _get_user_from_token_payload(self, payload: AuthTokenPayload) -> UserInternal:
         try:
-            user_model = await _user_resource.get_by_id(payload.user_id)
-            return user_model.to_schema(scheme_cls=UserInternal)
+            return await _user_resource.get_internal_by_id(payload.user_id)
         except UserModel.DoesNotExist as error:
             raise AuthUserUnknownHTTPException(status_code=HTTPStatus.UNAUTHORIZED) from error
 
-    async def _create_token_pair(self, user: UserInternal) -> AuthTokenPair:
-        access_payload = AccessTokenPayload(user_id=user.id)  # type: ignore
-        refresh_payload = RefreshTokenPayload(user_id=user.id)  # type: ignore
+    async def _create_token_pairs(self, users: Sequence[UserInternal]) -> List[AuthTokenPair]:
+        payloads = [
+            (AccessTokenPayload(user_id=user.id), RefreshTokenPayload(user_id=user.id))  # type: ignore
+            for user in users
+        ]
+
+        # Session keys of all users are written in one round trip
+        replaced_uuids = await _session_manager.set_active_uuids_many([
+            (access_payload.user_id, access_payload.uuid, refresh_payload.uuid)
+            for access_payload, refresh_payload in payloads
+        ])
+        await self._revoke_access_tokens(*(token_uuid for token_uuid in replaced_uuids if token_uuid is not None))
+
+        tokens = self._sign_tokens(*(payload for pair_payloads in payloads for payload in pair_payloads))
+        return [
+            AuthTokenPair(access_token=access_token, refresh_token=refresh_token)
+            for access_token, refresh_token in zip(tokens[::2], tokens[1::2])
+        ]
 
-        return AuthTokenPair(
-            access_token=await self._create_access_token(payload=access_payload),
-            refresh_token=await self._create_refresh_token(payload=refresh_payload)
-        )
+    async def _create_token_pair(self, user: UserInternal) -> AuthTokenPair:
+        return (await self._create_token_pairs([user]))[0]
 
     async def _register_user(self, username: str, password: str, **field) -> UserInternal:
         try:
@@ -81,19 +96,28 @@ class JWTAuthenticatorST(metaclass=SingletonMeta):
             return user_model.to_schema(scheme_cls=UserInternal)
         except UniqueConstraintFailed as error:
             raise AuthUserAlreadyExists(status_code=HTTPStatus.CONFLICT) from error
+        except ExecutorQueueFull as error:
+            raise AuthBusyHTTPException(status_code=HTTPStatus.SERVICE_UNAVAILABLE) from error
 
     async def _login_user(self, username: str, password: str, **fields) -> UserInternal:
         try:
-            user_model = await _user_resource.get_by_username(
-                username=username,
-                password=_user_resource.hash_password(password),
-                **fields
-            )
+            user_model = await _user_resource.get_by_credentials(username, password, **fields)
             return user_model.to_schema(scheme_cls=UserInternal)
         except UserModel.DoesNotExist as error:
             raise WrongAuthCredentialsHTTPException(status_code=HTTPStatus.UNAUTHORIZED) from error
+        except ExecutorQueueFull as error:
+            raise AuthBusyHTTPException(status_code=HTTPStatus.SERVICE_UNAVAILABLE) from error
+
+    async def _revoke_access_tokens(self, *token_uuids: str) -> None:
+        await _token_cache.revoke(*token_uuids)
+
+        if project_settings.ACCESS_TOKEN_STATELESS:
+            await _revocations.revoke(*token_uuids)
 
     async def _validate_access_token(self, payload: AccessTokenPayload) -> None:
+        if _revocations.loaded:  # Stateless mode: signature, expiration and the revocation set are enough
+            return
+
         if not (await _session_manager.is_active_access(payload.user_id, payload.uuid)):
             raise TokenValidationFailed(status_code=HTTPStatus.UNAUTHORIZED)
 
@@ -103,9 +127,24 @@ class JWTAuthenticatorST(metaclass=SingletonMeta):
 
     async def authenticate(self, access_token: str) -> UserInternal:
         payload = self._decode_access_token(access_token)
+        if _revocations.is_revoked(payload.uuid):  # Set is empty unless stateless mode is enabled
+            raise TokenValidationFailed(status_code=HTTPStatus.UNAUTHORIZED)
+
+        if (user := await _token_cache.get(payload)) is not None:
+            return user
+
         await self._validate_access_token(payload)
 
-        return await self._get_user_from_token_payload(payload)
+        user = await self._get_user_from_token_payload(payload)
+        _token_cache.set(payload, user)
+        return user
+
+    async def logout(self, user: UserInternal) -> None:
+        if (access_uuid := await _session_manager.delete_active_uuids(user.id)) is not None:
+            await self._revoke_access_tokens(access_uuid)
+
+    async def load_access_token_revocations(self) -> None:
+        await _revocations.load()
 
     async def refresh(self, refresh_token: str) -> Tuple[UserInternal, AuthTokenPair]:
         payload = self._decode_refresh_token(refresh_token)
@@ -118,6 +157,19 @@ class JWTAuthenticatorST(metaclass=SingletonMeta):
         user = await self._register_user(username, password, **fields)
         return user, await self._create_token_pair(user)
 
+    async def create_users(self, users: Sequence[Dict[str, Any]]) -> List[Optional[UserInternal]]:
+        """Creates users in one batch without tokens (see `issue_token_pairs`); Items with already taken usernames are None"""
+
+        try:
+            models = await _user_resource.create_users(users)
+        except ExecutorQueueFull as error:
+            raise AuthBusyHTTPException(status_code=HTTPStatus.SERVICE_UNAVAILABLE) from error
+        return [None if model is None else model.to_schema(UserInternal) for model in models]
+
     async def login(self, username: str, password: str, **fields) -> Tuple[UserInternal, AuthTokenPair]:
         user = await self._login_user(username, password, **fields)
         return user, await self._create_token_pair(user)
+
+    async def issue_token_pairs(self, users: Sequence[UserInternal]) -> List[AuthTokenPair]:
+        """Issues new token pairs for many users at once (e.g. re-provisioning devices); Previous tokens are revoked"""
+        return await self._create_token_pairs(users)
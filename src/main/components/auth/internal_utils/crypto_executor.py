@@ -0,0 +1,14 @@
+from src.core.state import project_settings
+from src.core.utils.executors import MeteredThreadPoolExecutor
+from src.core.utils.singleton import SingletonMeta
+
+
+class CryptoExecutorST(MeteredThreadPoolExecutor, metaclass=SingletonMeta):
+    """Dedicated threads for password hashing, so a burst of logins cannot stall the event loop; Its queue is bounded"""
+
+    def __init__(self) -> None:
+        super().__init__(
+            max_workers=project_settings.CRYPTO_EXECUTOR_MAX_WORKERS,
+            thread_name_prefix="crypto",
+            max_queued=project_settings.CRYPTO_EXECUTOR_MAX_QUEUED
+        )
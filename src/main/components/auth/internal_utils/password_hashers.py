@@ -0,0 +1,115 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import secrets
+from abc import ABC, abstractmethod
+from typing import Tuple, Dict, List, Sequence
+
+from src.core.state import project_settings
+from src.core.utils.import_tools import import_object
+from src.core.utils.singleton import SingletonMeta
+from .crypto_executor import CryptoExecutorST
+
+_crypto_executor = CryptoExecutorST()
+
+
+class AbstractPasswordHasher(ABC):
+    """Encoded passwords have format `<algorithm>$<hasher specific data>`"""
+
+    @property
+    @abstractmethod
+    def algorithm(self) -> str:
+        ...
+
+    @abstractmethod
+    def encode(self, password: str) -> str:
+        ...
+
+    @abstractmethod
+    def verify(self, password: str, encoded: str) -> bool:
+        ...
+
+    def must_update(self, encoded: str) -> bool:
+        """Whether encoded password uses outdated parameters and must be re-encoded"""
+        return False
+
+
+class PBKDF2PasswordHasher(AbstractPasswordHasher):
+    algorithm = "pbkdf2_sha256"
+    digest = "sha256"
+
+    @property
+    def iterations(self) -> int:
+        return project_settings.PASSWORD_PBKDF2_ITERATIONS
+
+    def _hash(self, password: str, salt: str, iterations: int) -> str:
+        derived = hashlib.pbkdf2_hmac(self.digest, password.encode("utf-8"), salt.encode("utf-8"), iterations)
+        return base64.b64encode(derived).decode("ascii")
+
+    def encode(self, password: str) -> str:
+        salt = secrets.token_hex(16)
+        return f"{self.algorithm}${self.iterations}${salt}${self._hash(password, salt, self.iterations)}"
+
+    def verify(self, password: str, encoded: str) -> bool:
+        _, iterations, salt, password_hash = encoded.split("$", 3)
+        return hmac.compare_digest(self._hash(password, salt, int(iterations)), password_hash)
+
+    def must_update(self, encoded: str) -> bool:
+        return int(encoded.split("$", 2)[1]) != self.iterations
+
+
+class SHA256PasswordHasher(AbstractPasswordHasher):
+    """Unsalted sha256 used before; Its passwords are stored without algorithm prefix. Only for verification of old rows"""
+
+    algorithm = "sha256"
+
+    def encode(self, password: str) -> str:
+        return hashlib.sha256(password.encode("utf-8")).hexdigest()
+
+    def verify(self, password: str, encoded: str) -> bool:
+        return hmac.compare_digest(self.encode(password), encoded)
+
+
+class PasswordHashersST(metaclass=SingletonMeta):
+    """
+    Hashers listed in PASSWORD_HASHERS; The first one encodes new passwords, others only verify old ones.
+    Hashing runs in the crypto executor.
+    """
+
+    def __init__(self) -> None:
+        self._hashers: List[AbstractPasswordHasher] = [import_object(path)() for path in project_settings.PASSWORD_HASHERS]
+        self._by_algorithm: Dict[str, AbstractPasswordHasher] = {hasher.algorithm: hasher for hasher in self._hashers}
+
+    @property
+    def default(self) -> AbstractPasswordHasher:
+        return self._hashers[0]
+
+    def _get_hasher(self, encoded: str) -> AbstractPasswordHasher:
+        algorithm = encoded.split("$", 1)[0] if "$" in encoded else SHA256PasswordHasher.algorithm
+        if (hasher := self._by_algorithm.get(algorithm)) is None:
+            raise ValueError(f"Unknown password hashing algorithm: {algorithm}")
+        return hasher
+
+    def _verify(self, password: str, encoded: str) -> Tuple[bool, bool]:
+        hasher = self._get_hasher(encoded)
+        if not hasher.verify(password, encoded):
+            return False, False
+
+        return True, hasher is not self.default or hasher.must_update(encoded)
+
+    async def encode(self, password: str) -> str:
+        return await _crypto_executor.run(self.default.encode, password)
+
+    async def encode_many(self, passwords: Sequence[str], max_concurrency: int) -> List[str]:
+        """Encodes passwords keeping at most `max_concurrency` of them in the crypto executor, so a batch cannot take all threads"""
+
+        encoded: List[str] = []
+        for start in range(0, len(passwords), max_concurrency):
+            encoded.extend(await asyncio.gather(*map(self.encode, passwords[start:start + max_concurrency])))
+
+        return encoded
+
+    async def verify(self, password: str, encoded: str) -> Tuple[bool, bool]:
+        """Returns (password is correct, encoded password must be replaced with a new one)"""
+        return await _crypto_executor.run(self._verify, password, encoded)
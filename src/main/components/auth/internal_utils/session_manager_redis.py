@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Sequence, Tuple, List
 
 from src.core.state import project_settings
 from src.core.utils.singleton import SingletonMeta
@@ -15,14 +15,31 @@ class AuthSessionManagerRedisST(RedisClientManager, metaclass=SingletonMeta):
     def get_active_refresh_key(self, user_id: int) -> str:
         return f"auth:tokens:user:{user_id}:refresh_token_uuid:active"
 
-    async def set_active_access_uuid(self, user_id: int, token_uuid: str) -> None:
+    async def set_active_access_uuid(self, user_id: int, token_uuid: str) -> Optional[str]:
+        """Returns uuid of the replaced access token"""
         redis = await self.get_redis()
-        await redis.setex(self.get_active_access_key(user_id), project_settings.ACCESS_TOKEN_REDIS_TTL, token_uuid)
+        return await redis.set(self.get_active_access_key(user_id), token_uuid, ex=project_settings.ACCESS_TOKEN_REDIS_TTL, get=True)
 
     async def set_active_refresh_uuid(self, user_id: int, token_uuid: str) -> None:
         redis = await self.get_redis()
         await redis.setex(self.get_active_refresh_key(user_id), project_settings.REFRESH_TOKEN_REDIS_TTL, token_uuid)
 
+    async def set_active_uuids(self, user_id: int, access_uuid: str, refresh_uuid: str) -> Optional[str]:
+        """Activates access and refresh tokens of the user in one round trip; Returns uuid of the replaced access token"""
+        return (await self.set_active_uuids_many([(user_id, access_uuid, refresh_uuid)]))[0]
+
+    async def set_active_uuids_many(self, sessions: Sequence[Tuple[int, str, str]]) -> List[Optional[str]]:
+        """Batch version of `set_active_uuids` for (user_id, access_uuid, refresh_uuid) items; One round trip for all"""
+        redis = await self.get_redis()
+
+        async with redis.pipeline(transaction=False) as pipe:
+            for user_id, access_uuid, refresh_uuid in sessions:
+                pipe.set(self.get_active_access_key(user_id), access_uuid, ex=project_settings.ACCESS_TOKEN_REDIS_TTL, get=True)
+                pipe.setex(self.get_active_refresh_key(user_id), project_settings.REFRESH_TOKEN_REDIS_TTL, refresh_uuid)
+            results = await pipe.execute()
+
+        return results[::2]
+
     async def get_active_access_uuid(self, user_id: int) -> Optional[str]:
         redis = await self.get_redis()
         return await redis.get(self.get_active_access_key(user_id))
@@ -31,6 +48,17 @@ class AuthSessionManagerRedisST(RedisClientManager, metaclass=SingletonMeta):
         redis = await self.get_redis()
         return await redis.get(self.get_active_refresh_key(user_id))
 
+    async def delete_active_uuids(self, user_id: int) -> Optional[str]:
+        """Deactivates both tokens of the user; Returns uuid of the deactivated access token"""
+        redis = await self.get_redis()
+
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.getdel(self.get_active_access_key(user_id))
+            pipe.delete(self.get_active_refresh_key(user_id))
+            access_uuid, _ = await pipe.execute()
+
+        return access_uuid
+
     async def is_active_access(self, user_id: int, token_uuid: str) -> bool:
         return await self.get_active_access_uuid(user_id) == token_uuid
 
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import logging
+from typing import Optional, Callable, Awaitable, Dict, Tuple, Sequence
+
+from redis.exceptions import RedisError
+
+from src.core.state import project_settings
+from src.core.utils.cache import TTLCache
+from src.core.utils.errors import supress_exception
+from src.core.utils.singleton import SingletonMeta
+from src.main.redis import RedisClientManager, RedisPubSubListenerST
+from ..models.user import UserInternal
+
+_logger = logging.getLogger(__name__)
+_pubsub_listener = RedisPubSubListenerST()
+
+UserLoader = Callable[[], Awaitable[Optional[UserInternal]]]
+_CachedUser = Tuple[Optional[UserInternal]]  # (None,) marks unknown user (negative caching)
+
+
+class UserCacheST(RedisClientManager, metaclass=SingletonMeta):
+    """
+    Two-tier read-through cache of users: process-local LRU over per-user Redis hashes.
+
+    Unknown ids are cached too (for USER_CACHE_NEGATIVE_TTL).
+    Writers call `invalidate`; It removes Redis entries and tells all workers to drop local entries.
+    """
+
+    INVALIDATION_CHANNEL: str = "auth:users:invalidated"
+    DATA_FIELD: str = "data"
+
+    def __init__(self) -> None:
+        super().__init__(db=project_settings.REDIS_DB_AUTH)
+        self._users: TTLCache[int, _CachedUser] = TTLCache(project_settings.USER_CACHE_LOCAL_MAX_SIZE)
+        self._user_ids: TTLCache[str, int] = TTLCache(project_settings.USER_CACHE_LOCAL_MAX_SIZE)  # By username
+        self._subscribed = False
+        self._subscribe_lock = asyncio.Lock()
+        self._generation = 0  # Bumped on every invalidation; Loads that overlap one are not cached
+        self._stats: Dict[str, int] = {"local_hits": 0, "redis_hits": 0, "negative_hits": 0, "misses": 0}
+
+        _pubsub_listener.add_reconnect_handler(self._clear_local)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+    def get_user_key(self, user_id: int) -> str:
+        return f"auth:users:{user_id}"
+
+    def get_username_key(self, username: str) -> str:
+        return f"auth:users:username:{username}"
+
+    def _clear_local(self) -> None:
+        self._users.clear()
+        self._user_ids.clear()
+
+    def _on_invalidated(self, data: str) -> None:
+        self._generation += 1
+        for change in json.loads(data):
+            self._users.pop(change["id"])
+            if change.get("username") is not None:
+                self._user_ids.pop(change["username"])
+
+    async def _ensure_subscribed(self) -> bool:
+        """Subscribes to invalidations once; Returns False if subscription failed (it is retried on the next call)"""
+
+        if self._subscribed:
+            return True
+
+        async with self._subscribe_lock:
+            if self._subscribed:
+                return True
+
+            try:
+                await _pubsub_listener.subscribe(self.INVALIDATION_CHANNEL, self._on_invalidated)
+            except (RedisError, OSError) as error:
+                _logger.warning(f"Unable to subscribe to user cache invalidations ({error.__class__.__name__}: {error})")
+                with supress_exception(Exception):
+                    await _pubsub_listener.unsubscribe(self.INVALIDATION_CHANNEL, self._on_invalidated)
+                return False
+
+            self._subscribed = True
+            return True
+
+    def _count(self, cached: _CachedUser, tier: str) -> Optional[UserInternal]:
+        self._stats["negative_hits" if cached[0] is None else tier] += 1
+        return cached[0]
+
+    async def _get_from_redis(self, user_id: int) -> Optional[_CachedUser]:
+        try:
+            redis = await self.get_redis()
+            data = await redis.hget(self.get_user_key(user_id), self.DATA_FIELD)  # type: ignore
+        except (RedisError, OSError) as error:  # Shared tier is optional; Reads fall through to the database
+            _logger.warning(f"Unable to read user {user_id} from Redis cache ({error.__class__.__name__}: {error})")
+            return None
+
+        if data is None:
+            return None
+        return (None,) if data == "" else (UserInternal.model_validate_json(data),)
+
+    async def _store(self, user_id: int, user: Optional[UserInternal]) -> None:
+        ttl = project_settings.USER_CACHE_REDIS_TTL if user is not None else project_settings.USER_CACHE_NEGATIVE_TTL
+        self._users.set(user_id, (user,), ttl=min(ttl, project_settings.USER_CACHE_LOCAL_TTL))
+
+        try:
+            redis = await self.get_redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.hset(self.get_user_key(user_id), self.DATA_FIELD, "" if user is None else user.model_dump_json())
+                pipe.expire(self.get_user_key(user_id), ttl)
+                if user is not None:
+                    pipe.set(self.get_username_key(user.username), user.id, ex=ttl)
+                await pipe.execute()
+        except (RedisError, OSError) as error:
+            _logger.warning(f"Unable to write user {user_id} to Redis cache ({error.__class__.__name__}: {error})")
+
+    async def set(self, user: UserInternal) -> None:
+        if await self._ensure_subscribed():
+            await self._store(user.id, user)
+
+    async def get_by_id(self, user_id: int, load: UserLoader) -> Optional[UserInternal]:
+        """Returns cached user; On miss loads it with `load` (None - user does not exist)"""
+
+        if not await self._ensure_subscribed():  # Until subscribed nothing is cached, so no invalidation can be missed
+            return await load()
+
+        if (cached := self._users.get(user_id)) is not None:
+            return self._count(cached, "local_hits")
+
+        generation = self._generation
+        if (cached := await self._get_from_redis(user_id)) is not None:
+            if generation == self._generation:
+                self._users.set(user_id, cached, ttl=project_settings.USER_CACHE_LOCAL_TTL)
+            return self._count(cached, "redis_hits")
+
+        self._stats["misses"] += 1
+        user = await load()
+        if generation == self._generation:  # Otherwise the loaded user may be older than the invalidation
+            await self._store(user_id, user)
+        return user
+
+    async def get_id_by_username(self, username: str) -> Optional[int]:
+        if not await self._ensure_subscribed():
+            return None
+
+        if (user_id := self._user_ids.get(username)) is not None:
+            return user_id
+
+        generation = self._generation
+        try:
+            redis = await self.get_redis()
+            user_id = await redis.get(self.get_username_key(username))
+        except (RedisError, OSError) as error:
+            _logger.warning(f"Unable to read user {username} from Redis cache ({error.__class__.__name__}: {error})")
+            return None
+
+        if user_id is None:
+            return None
+
+        if generation == self._generation:
+            self._user_ids.set(username, int(user_id), ttl=project_settings.USER_CACHE_LOCAL_TTL)
+        return int(user_id)
+
+    async def invalidate(self, user_id: int, username: Optional[str] = None) -> None:
+        await self.invalidate_many([(user_id, username)])
+
+    async def invalidate_many(self, users: Sequence[Tuple[int, Optional[str]]]) -> None:
+        """Invalidates (user_id, username) items in one round trip; Username is optional"""
+
+        if not users:
+            return
+
+        data = json.dumps([{"id": user_id, "username": username} for user_id, username in users])
+        self._on_invalidated(data)
+
+        redis = await self.get_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            for user_id, username in users:
+                pipe.delete(self.get_user_key(user_id))
+                if username is not None:
+                    pipe.delete(self.get_username_key(username))
+            pipe.publish(self.INVALIDATION_CHANNEL, data)
+            await pipe.execute()
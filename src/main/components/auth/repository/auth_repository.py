@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import Tuple, Sequence, List, Dict, Any, Optional
 
 from src.core.utils.singleton import SingletonMeta
 from src.main.components.auth.internal_utils.authenticator import JWTAuthenticatorST
@@ -20,13 +20,23 @@ class AuthRepositoryST(metaclass=SingletonMeta):
     async def register(self, username: str, password: str, **fields) -> Tuple[UserInternal, AuthTokenPair]:
         return await _authenticator.register(username, password, **fields)
 
+    async def create_users(self, users: Sequence[Dict[str, Any]]) -> List[Optional[UserInternal]]:
+        return await _authenticator.create_users(users)
+
     async def login(self, username: str, password: str, **fields) -> Tuple[UserInternal, AuthTokenPair]:
         return await _authenticator.login(username, password, **fields)
 
+    async def logout(self, user: UserInternal) -> None:
+        await _authenticator.logout(user)
+
+    async def issue_token_pairs(self, users: Sequence[UserInternal]) -> List[AuthTokenPair]:
+        return await _authenticator.issue_token_pairs(users)
+
+    async def load_access_token_revocations(self) -> None:
+        await _authenticator.load_access_token_revocations()
+
     async def get_user_by_id(self, user_id: int) -> UserInternal:
-        user_model = await _user_resource.get_by_id(user_id)
-        return user_model.to_schema(UserInternal)
+        return await _user_resource.get_internal_by_id(user_id)
 
     async def get_user_by_username(self, username: str, **fields) -> UserInternal:
-        user_model = await _user_resource.get_by_username(username, **fields)
-        return user_model.to_schema(UserInternal)
+        return await _user_resource.get_internal_by_username(username, **fields)
@@ -1,21 +1,29 @@
-import hashlib
-from typing import Optional
+from typing import Optional, Sequence, Dict, Any, List, Set
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.main.components.auth.models.user import UserModel
-from src.main.db import AsyncDatabaseManagerST
+from src.core.state import project_settings
+from src.core.utils.errors import supress_exception
+from src.main.components.auth.internal_utils.password_hashers import PasswordHashersST
+from src.main.components.auth.internal_utils.user_cache import UserCacheST
+from src.main.components.auth.models.user import UserModel, UserInternal
+from src.main.db import AsyncDatabaseManagerST, UniqueConstraintFailed
 from src.main.resources import BaseResource, BaseResourceSTMeta
 
 _db_manager: AsyncDatabaseManagerST = AsyncDatabaseManagerST()
+_user_cache = UserCacheST()
+_password_hashers = PasswordHashersST()
 
 
 class UserResourceST(BaseResource[UserModel], metaclass=BaseResourceSTMeta):
     __model_cls__ = UserModel
 
-    def hash_password(self, password: str, encoding: str = "utf-8") -> str:
-        return hashlib.sha256(password.encode(encoding=encoding)).hexdigest()
+    BULK_CHUNK_SIZE: int = 500  # Max number of usernames in one IN (...) clause
+    BULK_CREATE_ATTEMPTS: int = 3
+
+    async def hash_password(self, password: str) -> str:
+        return await _password_hashers.encode(password)
 
     async def _fetch_user_by_credentials(self, session: AsyncSession, username: str, **fields) -> Optional[UserModel]:
         query = select(UserModel).filter(
@@ -33,14 +41,126 @@ class UserResourceST(BaseResource[UserModel], metaclass=BaseResourceSTMeta):
     async def create_user(self, username: str, password: str, **fields) -> UserModel:
         user = UserModel(
             username=username,  # type: ignore
-            password=self.hash_password(password),  # type: ignore
+            password=await self.hash_password(password),  # type: ignore
             **fields  # type: ignore
         )
 
         await self.save(user)
+        await _user_cache.invalidate(int(user.id), str(user.username))  # Drops negative entries cached before creation
         return user
 
+    async def _fetch_taken_usernames(self, session: AsyncSession, usernames: Sequence[str]) -> Set[str]:
+        taken: Set[str] = set()
+        for start in range(0, len(usernames), self.BULK_CHUNK_SIZE):
+            result = await session.execute(
+                select(UserModel.username).where(UserModel.username.in_(usernames[start:start + self.BULK_CHUNK_SIZE]))
+            )
+            taken.update(result.scalars().all())
+
+        return taken
+
+    async def _insert_new_users(self, users: Sequence[Dict[str, Any]], passwords: Sequence[str]) -> List[Optional[UserModel]]:
+        async with _db_manager.session() as session:
+            taken = await self._fetch_taken_usernames(session, [user["username"] for user in users])
+
+        models: List[Optional[UserModel]] = []
+        for user, password in zip(users, passwords):
+            if user["username"] in taken:
+                models.append(None)
+                continue
+
+            taken.add(user["username"])  # Later duplicates in the same batch are conflicts too
+            models.append(UserModel(**{**user, "password": password}))
+
+        await self.save_many([model for model in models if model is not None])
+        return models
+
+    async def create_users(self, users: Sequence[Dict[str, Any]]) -> List[Optional[UserModel]]:
+        """
+        Creates users (dicts with username, password and other fields) in one transaction.
+        Returns models in the order of `users`; None means the username is already taken.
+        Passwords are hashed before the transaction, using at most AUTH_BULK_REGISTER_HASH_CONCURRENCY crypto threads.
+        """
+
+        passwords = await _password_hashers.encode_many(
+            [user["password"] for user in users],
+            project_settings.AUTH_BULK_REGISTER_HASH_CONCURRENCY
+        )
+        models: List[Optional[UserModel]] = []
+
+        for attempt in range(1, self.BULK_CREATE_ATTEMPTS + 1):
+            try:
+                models = await self._insert_new_users(users, passwords)
+                break
+            except UniqueConstraintFailed as error:
+                if attempt == self.BULK_CREATE_ATTEMPTS:
+                    raise error
+                # Some username was taken between the check and the insert; Batch is checked again
+
+        created = [(int(model.id), str(model.username)) for model in models if model is not None]
+        await _db_manager.run_after_commit(lambda: _user_cache.invalidate_many(created))  # Drops negative entries
+        return models
+
     async def get_by_username(self, username: str, **fields) -> UserModel:
         if (user := await self._get_by_username(username, **fields)) is not None:
             return user
         raise UserModel.DoesNotExist("User not found")
+
+    async def get_by_credentials(self, username: str, password: str, **fields) -> UserModel:
+        """Returns user if password is correct; Passwords encoded with outdated hashers are re-encoded"""
+
+        if (user := await self._get_by_username(username, **fields)) is None:
+            await self.hash_password(password)  # Unknown username takes as long as a wrong password
+            raise UserModel.DoesNotExist("User not found")
+
+        is_correct, must_update = await _password_hashers.verify(password, str(user.password))
+        if not is_correct:
+            raise UserModel.DoesNotExist("User not found")
+
+        if must_update:
+            await self.update(user, password=await self.hash_password(password))
+
+        return user
+
+    async def _load_internal_by_id(self, user_id: int) -> Optional[UserInternal]:
+        async with _db_manager.session() as session:
+            user = await self._fetch_by_id(session, user_id)
+            return None if user is None else user.to_schema(UserInternal)
+
+    async def get_internal_by_id(self, user_id: int) -> UserInternal:
+        """Cached version of `get_by_id`"""
+
+        if (user := await _user_cache.get_by_id(user_id, lambda: self._load_internal_by_id(user_id))) is not None:
+            return user
+        raise UserModel.DoesNotExist(f"Not found UserModel with id={user_id}")
+
+    async def get_internal_by_username(self, username: str, **fields) -> UserInternal:
+        """Cached version of `get_by_username`; Lookups with extra fields always go to database"""
+
+        if not fields and (user_id := await _user_cache.get_id_by_username(username)) is not None:
+            with supress_exception(UserModel.DoesNotExist):
+                if (user := await self.get_internal_by_id(user_id)).username == username:  # Username may have been changed
+                    return user
+
+        user = (await self.get_by_username(username, **fields)).to_schema(UserInternal)
+        await _user_cache.set(user)
+        return user
+
+    async def update(self, model_obj: UserModel, **fields) -> UserModel:
+        user_id, username = int(model_obj.id), str(model_obj.username)
+        updated = await super().update(model_obj, **fields)
+        await _user_cache.invalidate(user_id, username)
+        return updated
+
+    async def update_by_id(self, object_id: int, **fields) -> None:
+        await super().update_by_id(object_id, **fields)
+        await _user_cache.invalidate(object_id)
+
+    async def delete(self, model_obj: UserModel) -> None:
+        user_id, username = int(model_obj.id), str(model_obj.username)
+        await super().delete(model_obj)
+        await _user_cache.invalidate(user_id, username)
+
+    async def delete_by_id(self, object_id: int) -> None:
+        await super().delete_by_id(object_id)
+        await _user_cache.invalidate(object_id)
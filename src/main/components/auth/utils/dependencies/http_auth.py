@@ -3,8 +3,10 @@ from starlette.requests import Request
 from src.main.components.auth.models.user import UserInternal
 from src.main.components.auth.repository import AuthRepositoryST
 from src.main.components.auth.utils.bearer_auth_mixin import BearerAuthMixin
+from src.main.db import AsyncDatabaseManagerST
 
 _auth_repository = AuthRepositoryST()
+_db_manager = AsyncDatabaseManagerST()
 
 
 class HTTPJWTBearerAuthDependency(BearerAuthMixin):
@@ -12,4 +14,6 @@ class HTTPJWTBearerAuthDependency(BearerAuthMixin):
         authorization = request.headers.get("Authorization")
 
         access_token = await self.extract_token(authorization)
-        return await _auth_repository.authenticate(access_token)
+        user = await _auth_repository.authenticate(access_token)
+        _db_manager.bind_user(user.id)
+        return user
@@ -7,8 +7,10 @@ from src.main.components.auth.exceptions import AuthHTTPException
 from src.main.components.auth.models.user import UserInternal
 from src.main.components.auth.repository import AuthRepositoryST
 from src.main.components.auth.utils.bearer_auth_mixin import BearerAuthMixin
+from src.main.db import AsyncDatabaseManagerST
 
 _auth_repository = AuthRepositoryST()
+_db_manager = AsyncDatabaseManagerST()
 _logger = logging.getLogger(__name__)
 
 
@@ -18,7 +20,9 @@ class WSJWTBearerAuthDependency(BearerAuthMixin):
 
         try:
             access_token = await self.extract_token(authorization)
-            return await _auth_repository.authenticate(access_token)
+            user = await _auth_repository.authenticate(access_token)
+            _db_manager.bind_user(user.id)
+            return user
         except AuthHTTPException as error:
             await websocket.close(
                 code=error.payload.application_status_code,
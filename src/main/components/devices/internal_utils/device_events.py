@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Callable, Sequence, Tuple
+
+from src.core.utils.errors import supress_exception
+from src.core.utils.singleton import SingletonMeta
+from src.main.components.devices.models.device_event import DeviceEvent
+from src.main.redis import RedisPubSubListenerST
+
+_logger = logging.getLogger(__name__)
+_pubsub_listener = RedisPubSubListenerST()
+
+
+class DeviceEventsSubscriber:
+    def __init__(self, user_id: int) -> None:
+        self.user_id = user_id
+        self._events: asyncio.Queue[Optional[DeviceEvent]] = asyncio.Queue()
+
+    def put(self, event: Optional[DeviceEvent]) -> None:
+        self._events.put_nowait(event)
+
+    async def get(self) -> Optional[DeviceEvent]:
+        """Returns next event; None means that events may have been lost and the state must be resent"""
+        return await self._events.get()
+
+
+class DeviceEventsST(metaclass=SingletonMeta):
+    """
+    Per-user pair events for persistent connections (see `/devices/me/events/` websocket).
+
+    Events are published in the user's pub/sub channel, so they reach connections on any worker.
+    Subscribers of one user in this process share one channel subscription. Pub/sub doesn't keep messages,
+    so after reconnect subscribers get None and must resend the current state.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[int, List[DeviceEventsSubscriber]] = {}
+        self._handlers: Dict[int, Callable[[str], None]] = {}
+
+        _pubsub_listener.add_reconnect_handler(self._on_reconnect)
+
+    def get_user_events_channel(self, user_id: int) -> str:
+        return f"devices:events:user:{user_id}"
+
+    def _on_reconnect(self) -> None:
+        for subscribers in self._subscribers.values():
+            for subscriber in subscribers:
+                subscriber.put(None)
+
+    def _dispatch(self, user_id: int, data: str) -> None:
+        event = DeviceEvent.model_validate_json(data)
+
+        for subscriber in self._subscribers.get(user_id, ()):
+            subscriber.put(event)
+
+    async def publish(self, events: Sequence[Tuple[int, DeviceEvent]]) -> None:
+        """Publishes (user_id, event) pairs in one round trip"""
+
+        if not events:
+            return
+
+        redis = await _pubsub_listener.get_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            for user_id, event in events:
+                pipe.publish(self.get_user_events_channel(user_id), event.model_dump_json())
+            await pipe.execute()
+
+    async def subscribe(self, user_id: int) -> DeviceEventsSubscriber:
+        subscriber = DeviceEventsSubscriber(user_id)
+        subscribers = self._subscribers.setdefault(user_id, [])
+        subscribers.append(subscriber)
+
+        if len(subscribers) == 1:
+            handler = self._handlers[user_id] = lambda data: self._dispatch(user_id, data)
+
+            try:
+                await _pubsub_listener.subscribe(self.get_user_events_channel(user_id), handler)
+            except Exception as error:
+                with supress_exception(Exception):
+                    await self.unsubscribe(subscriber)
+                raise error
+
+        return subscriber
+
+    async def unsubscribe(self, subscriber: DeviceEventsSubscriber) -> None:
+        user_id = subscriber.user_id
+        subscribers = self._subscribers.get(user_id, [])
+
+        if subscriber in subscribers:
+            subscribers.remove(subscriber)
+
+        if subscribers:
+            return
+
+        self._subscribers.pop(user_id, None)
+
+        if (handler := self._handlers.pop(user_id, None)) is not None:
+            await _pubsub_listener.unsubscribe(self.get_user_events_channel(user_id), handler)
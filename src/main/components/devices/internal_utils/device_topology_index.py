@@ -0,0 +1,154 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Set, Optional, Iterable, Tuple, Callable, Awaitable, List, Sequence
+
+from src.core.utils.errors import get_traceback_text
+from src.core.utils.singleton import SingletonMeta
+from src.main.redis import RedisPubSubListenerST
+
+_logger = logging.getLogger(__name__)
+_pubsub_listener = RedisPubSubListenerST()
+
+DevicePairIds = Tuple[int, int]  # (user_id, device_id)
+PairsFetcher = Callable[[], Awaitable[Iterable[DevicePairIds]]]
+
+
+class DeviceTopologyIndexST(metaclass=SingletonMeta):
+    """
+    Process-local index of device ownership (owner -> devices and device -> owner).
+
+    Changes are applied locally and announced to other workers through pub/sub.
+    Index is rebuilt from the database after pub/sub reconnects, since announcements may be lost;
+    While it is not loaded, `is_same_network` returns None and callers must ask the database.
+    """
+
+    CHANNEL: str = "devices:topology"
+
+    def __init__(self) -> None:
+        self._device_owner: Dict[int, int] = {}
+        self._owner_devices: Dict[int, Set[int]] = {}
+        self._fetch_pairs: Optional[PairsFetcher] = None
+        self._loaded = False
+        self._reload_task: Optional[asyncio.Task] = None
+        self._changes_during_reload: Optional[List[str]] = None
+
+        _pubsub_listener.add_reconnect_handler(self._schedule_reload)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def _add_pair(self, user_id: int, device_id: int) -> None:
+        self._remove_device(device_id)
+        self._device_owner[device_id] = user_id
+        self._owner_devices.setdefault(user_id, set()).add(device_id)
+
+    def _remove_device(self, device_id: int) -> None:
+        if (owner_id := self._device_owner.pop(device_id, None)) is None:
+            return
+
+        devices = self._owner_devices.get(owner_id, set())
+        devices.discard(device_id)
+        if not devices:
+            self._owner_devices.pop(owner_id, None)
+
+    def _apply_change(self, data: str) -> None:
+        change = json.loads(data)
+
+        if change["action"] == "pair":
+            self._add_pair(change["user_id"], change["device_id"])
+        elif change["action"] == "pair_many":
+            for device_id in change["device_ids"]:
+                self._add_pair(change["user_id"], device_id)
+        elif change["action"] == "unpair":
+            self._remove_device(change["device_id"])
+
+    def _on_change(self, data: str) -> None:
+        if self._changes_during_reload is not None:
+            self._changes_during_reload.append(data)  # Applied on top of the loaded snapshot
+
+        self._apply_change(data)
+
+    def _schedule_reload(self) -> None:
+        if self._fetch_pairs is None or (self._reload_task is not None and not self._reload_task.done()):
+            return
+
+        self._loaded = False
+        self._reload_task = asyncio.create_task(self._reload_logged())
+
+    async def _reload_logged(self) -> None:
+        try:
+            await self._reload()
+        except Exception as error:
+            _logger.error(f"Unable to reload device topology index:\n{get_traceback_text(error)}")
+
+    async def _reload(self) -> None:
+        self._loaded = False
+        self._changes_during_reload = []
+
+        try:
+            pairs = await self._fetch_pairs()  # type: ignore
+
+            self._device_owner.clear()
+            self._owner_devices.clear()
+            for user_id, device_id in pairs:
+                self._add_pair(user_id, device_id)
+
+            for change in self._changes_during_reload:
+                self._apply_change(change)
+        finally:
+            self._changes_during_reload = None
+
+        self._loaded = True
+        _logger.info(f"Device topology index loaded: {len(self._device_owner)} devices")
+
+    async def _publish(self, **change) -> None:
+        redis = await _pubsub_listener.get_redis()
+        await redis.publish(self.CHANNEL, json.dumps(change))
+
+    async def load(self, fetch_pairs: PairsFetcher) -> None:
+        """Subscribes to changes of other workers and loads the index with pairs returned by `fetch_pairs`"""
+
+        if self._fetch_pairs is None:
+            await _pubsub_listener.subscribe(self.CHANNEL, self._on_change)
+
+        self._fetch_pairs = fetch_pairs
+        await self._reload()
+
+    def get_owner_id(self, device_id: int) -> Optional[int]:
+        return self._device_owner.get(device_id)
+
+    def is_same_network(self, user_id_1: int, user_id_2: int) -> Optional[bool]:
+        """Returns None if index is not loaded"""
+
+        if not self._loaded:
+            return None
+
+        owner_1 = self._device_owner.get(user_id_1)
+        owner_2 = self._device_owner.get(user_id_2)
+        return owner_1 == user_id_2 or owner_2 == user_id_1 or (owner_1 is not None and owner_1 == owner_2 and user_id_1 != user_id_2)
+
+    def sync_users(self, user_ids: Iterable[int], pairs: Iterable[DevicePairIds]) -> None:
+        """Replaces indexed pairs of `user_ids` (as owners and as devices) with `pairs` loaded from the database"""
+
+        for user_id in user_ids:
+            self._remove_device(user_id)
+            for device_id in tuple(self._owner_devices.get(user_id, ())):
+                self._remove_device(device_id)
+
+        for user_id, device_id in pairs:
+            self._add_pair(user_id, device_id)
+
+    async def add_pair(self, user_id: int, device_id: int) -> None:
+        self._add_pair(user_id, device_id)
+        await self._publish(action="pair", user_id=user_id, device_id=device_id)
+
+    async def add_pairs(self, user_id: int, device_ids: Sequence[int]) -> None:
+        for device_id in device_ids:
+            self._add_pair(user_id, device_id)
+        await self._publish(action="pair_many", user_id=user_id, device_ids=list(device_ids))
+
+    async def remove_device(self, device_id: int) -> None:
+        self._remove_device(device_id)
+        await self._publish(action="unpair", device_id=device_id)
@@ -1,47 +1,84 @@
 import asyncio
 import logging
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 
+from src.core.exceptions import ConfigurationError
 from src.core.state import project_settings
-from src.core.utils.async_tools import call_after
-from src.core.utils.collections import AsyncObservableDict
 from src.core.utils.errors import supress_exception
+from src.core.utils.scheduler import CallSchedulerST, ScheduledCall
 from src.core.utils.singleton import SingletonMeta
+from src.main.components.devices.internal_utils.device_events import DeviceEventsST, DeviceEventsSubscriber
+from src.main.components.devices.internal_utils.pair_request_store import AbstractPairRequestStore, LocalPairRequestStore
+from src.main.components.devices.internal_utils.pair_request_store_redis import RedisPairRequestStore
+from src.main.components.devices.models.device_event import DeviceEvent, DeviceEventType
 from src.main.components.devices.models.device_pair_request import DevicePairRequest, DevicePairReqeustState
 from src.main.components.devices.resources import DevicePairResourceST
 from src.main.exceptions import NotFoundHTTPException
 
 _logger = logging.getLogger(__name__)
 _device_pair_resource = DevicePairResourceST()
+_scheduler = CallSchedulerST()
+_device_events = DeviceEventsST()
 
 
 class DevicePairRequestManagerST(metaclass=SingletonMeta):
     def __init__(self) -> None:
-        self._pending_requests: AsyncObservableDict[str, DevicePairRequest] = AsyncObservableDict()
+        self._store: AbstractPairRequestStore = self._create_store()
+        self._expiration_calls: Dict[str, ScheduledCall] = {}  # Auto-rejections of requests sent from this process
 
-    def _change_request_state(self, request: DevicePairRequest, new_state: DevicePairReqeustState) -> None:
-        request.state = new_state
-        self._pending_requests.pop(request.uuid, None)
+    def _create_store(self) -> AbstractPairRequestStore:
+        backend = project_settings.DEVICE_PAIR_REQUEST_BACKEND
 
-    async def _reject_request(self, request: DevicePairRequest):
-        if request.state != DevicePairReqeustState.PENDING:
-            return
+        if backend == "local":
+            return LocalPairRequestStore()
+        elif backend == "redis":
+            return RedisPairRequestStore()
 
-        self._change_request_state(request, DevicePairReqeustState.REJECTED)
+        raise ConfigurationError(f"Unknown device pair request backend: {backend}")
 
-    async def _accept_request(self, request: DevicePairRequest) -> None:
-        if request.state != DevicePairReqeustState.PENDING:
-            return
+    def _cancel_expiration(self, request: DevicePairRequest) -> None:
+        if (call := self._expiration_calls.pop(request.uuid, None)) is not None:
+            call.cancel()
+
+    async def _publish_events(self, *events: Tuple[int, DeviceEvent]) -> None:
+        # Events only notify connected clients; The store stays the source of truth, so failures are not propagated
+        try:
+            await _device_events.publish(events)
+        except Exception as error:
+            _logger.warning(f"Unable to publish device events ({error.__class__.__name__}: {error})")
+
+    async def _resolve_request(self, request: DevicePairRequest, state: DevicePairReqeustState) -> bool:
+        self._cancel_expiration(request)  # Requests sent from other processes expire there
 
-        self._change_request_state(request, DevicePairReqeustState.ACCEPTED)
+        if not await self._store.resolve(request, state):
+            return False
 
-        await _device_pair_resource.create_device_pair(request.user, request.device)
+        event = DeviceEvent(
+            event_type=DeviceEventType.PAIR_REQUEST_STATE_CHANGED,
+            data={"uuid": request.uuid, "state": state.value}
+        )
+        await self._publish_events((request.user.id, event), (request.device.id, event))
+        return True
 
-    async def _auto_reject_after(self, request: DevicePairRequest, *, after: float) -> None:
-        await call_after(self._reject_request(request), after=after)
+    async def _reject_request(self, request: DevicePairRequest):
+        await self._resolve_request(request, DevicePairReqeustState.REJECTED)
+
+    async def _accept_request(self, request: DevicePairRequest) -> None:
+        # Pair is created first, so waiters are never told that the request is accepted while there is no pair
+        try:
+            device_pair = await _device_pair_resource.create_device_pair(request.user, request.device)
+        except Exception as error:
+            await self._reject_request(request)
+            raise error
 
-    def get_request_by_uuid(self, request_uuid: str) -> DevicePairRequest:
-        request = self._pending_requests.get(request_uuid)
+        if not await self._resolve_request(request, DevicePairReqeustState.ACCEPTED):  # Rejected or expired meanwhile
+            await _device_pair_resource.delete_by_id(device_pair.id)  # type: ignore
+
+    def _auto_reject_after(self, request: DevicePairRequest, *, after: float) -> None:
+        self._expiration_calls[request.uuid] = _scheduler.call_later(after, self._reject_request, request)
+
+    async def get_request_by_uuid(self, request_uuid: str) -> DevicePairRequest:
+        request = await self._store.get(request_uuid)
 
         if request is None:
             raise NotFoundHTTPException(message=f"Request {request_uuid} was not found")
@@ -49,28 +86,37 @@ class DevicePairRequestManagerST(metaclass=SingletonMeta):
         return request
 
     async def get_pair_requests(self, device_id: int, timeout: Optional[int] = None) -> List[DevicePairRequest]:
-        requests = [request for request in self._pending_requests.values() if request.device.id == device_id]
+        requests = await self._store.get_device_requests(device_id)
 
         if requests:
             return requests
 
         with supress_exception(asyncio.TimeoutError):
-            requests.append(
-                await self._pending_requests.wait_for(
-                    filter_func=lambda x: x.device.id == device_id,
-                    timeout=timeout
-                )
-            )
+            requests.append(await self._store.wait_for_device_request(device_id, timeout=timeout))
         return requests
 
+    async def get_pending_requests(self, device_id: int) -> List[DevicePairRequest]:
+        return await self._store.get_device_requests(device_id)
+
     async def send_pair_request(self, request: DevicePairRequest) -> None:
-        self._pending_requests[request.uuid] = request
-        await self._auto_reject_after(request, after=project_settings.DEVICE_PAIR_REQUEST_TTL)
+        await self._store.add(request, project_settings.DEVICE_PAIR_REQUEST_TTL)
+        self._auto_reject_after(request, after=project_settings.DEVICE_PAIR_REQUEST_TTL)
+        await self._publish_events((request.device.id, DeviceEvent(event_type=DeviceEventType.PAIR_REQUEST_CREATED, data=request.serialize())))
+
+    async def subscribe_to_events(self, user_id: int) -> DeviceEventsSubscriber:
+        return await _device_events.subscribe(user_id)
+
+    async def unsubscribe_from_events(self, subscriber: DeviceEventsSubscriber) -> None:
+        await _device_events.unsubscribe(subscriber)
+
+    async def wait_for_state_change(self, request: DevicePairRequest, timeout: Optional[float] = None) -> DevicePairReqeustState:
+        """Waits until the request is accepted or rejected (on any worker); Raises asyncio.TimeoutError"""
+        return await self._store.wait_for_state_change(request, timeout=timeout)
 
     async def accept_pair_request(self, request_uuid: str) -> None:
-        request = self.get_request_by_uuid(request_uuid)
+        request = await self.get_request_by_uuid(request_uuid)
         await self._accept_request(request)
 
     async def reject_pair_request(self, request_uuid: str) -> None:
-        request = self.get_request_by_uuid(request_uuid)
+        request = await self.get_request_by_uuid(request_uuid)
         await self._reject_request(request)
@@ -0,0 +1,71 @@
+from abc import ABC, abstractmethod
+from typing import Optional, List
+
+from src.core.utils.collections import AsyncObservableDict
+from src.main.components.devices.models.device_pair_request import DevicePairRequest, DevicePairReqeustState
+
+
+class AbstractPairRequestStore(ABC):
+    """Storage of pending pair requests; Resolved and expired requests are not returned by lookups"""
+
+    @abstractmethod
+    async def add(self, request: DevicePairRequest, ttl: float) -> None:
+        """Stores pending request and wakes devices waiting for requests (see `wait_for_device_request`)"""
+
+    @abstractmethod
+    async def get(self, request_uuid: str) -> Optional[DevicePairRequest]:
+        """Returns pending request or None"""
+
+    @abstractmethod
+    async def get_device_requests(self, device_id: int) -> List[DevicePairRequest]:
+        """Returns pending requests sent to the device"""
+
+    @abstractmethod
+    async def wait_for_device_request(self, device_id: int, timeout: Optional[float] = None) -> DevicePairRequest:
+        """Waits for a pending request sent to the device; Raises asyncio.TimeoutError"""
+
+    @abstractmethod
+    async def resolve(self, request: DevicePairRequest, state: DevicePairReqeustState) -> bool:
+        """
+        Changes state of the pending request (also on the given object) and wakes its waiters.
+        Returns False if the request was already resolved or expired; Only one of concurrent calls succeeds.
+        """
+
+    @abstractmethod
+    async def wait_for_state_change(self, request: DevicePairRequest, timeout: Optional[float] = None) -> DevicePairReqeustState:
+        """Waits until the request is resolved, updates its state and returns it; Raises asyncio.TimeoutError"""
+
+
+class LocalPairRequestStore(AbstractPairRequestStore):
+    """Keeps requests in process memory; Works only when the server runs in one process"""
+
+    def __init__(self) -> None:
+        self._pending_requests: AsyncObservableDict[str, DevicePairRequest] = AsyncObservableDict(
+            indexes={"device_id": lambda request: request.device.id}
+        )
+
+    async def add(self, request: DevicePairRequest, ttl: float) -> None:
+        self._pending_requests[request.uuid] = request  # Expired requests are rejected by the manager
+
+    async def get(self, request_uuid: str) -> Optional[DevicePairRequest]:
+        return self._pending_requests.get(request_uuid)
+
+    async def get_device_requests(self, device_id: int) -> List[DevicePairRequest]:
+        return self._pending_requests.get_by_index("device_id", device_id)
+
+    async def wait_for_device_request(self, device_id: int, timeout: Optional[float] = None) -> DevicePairRequest:
+        return await self._pending_requests.wait_for_index("device_id", device_id, timeout=timeout)
+
+    async def resolve(self, request: DevicePairRequest, state: DevicePairReqeustState) -> bool:
+        if request.state != DevicePairReqeustState.PENDING:
+            return False
+
+        request.state = state
+        self._pending_requests.pop(request.uuid, None)
+        return True
+
+    async def wait_for_state_change(self, request: DevicePairRequest, timeout: Optional[float] = None) -> DevicePairReqeustState:
+        if request.state == DevicePairReqeustState.PENDING:
+            await request.wait_for_state_change(timeout=timeout)
+
+        return request.state
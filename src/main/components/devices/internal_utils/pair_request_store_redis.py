@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, List, Dict, Callable, AsyncGenerator
+
+from src.core.state import project_settings
+from src.main.components.devices.internal_utils.pair_request_store import AbstractPairRequestStore
+from src.main.components.devices.models.device_pair_request import DevicePairRequest, DevicePairReqeustState
+from src.main.redis import RedisClientManager, RedisPubSubListenerST
+
+_pubsub_listener = RedisPubSubListenerST()
+
+
+class RedisPairRequestStore(RedisClientManager, AbstractPairRequestStore):
+    """
+    Keeps requests in Redis, so they are shared by all worker processes.
+
+    Every request is a hash (data, state, expiration time) and every device has a sorted set of its request uuids
+    scored by expiration time. New requests are announced in the device's pub/sub channel and state changes
+    in the request's channel, so long polls and waiting senders are woken on any worker.
+    Resolved requests are kept for `RESOLVED_TTL` seconds, so late waiters still get the result.
+    """
+
+    RESOLVED_TTL: int = 60
+
+    # Changes state only if request is still pending; KEYS = [request key, device index], ARGV = [state, uuid, channel, ttl]
+    RESOLVE_SCRIPT: str = """
+        if redis.call('HGET', KEYS[1], 'state') ~= 'pending' then
+            return 0
+        end
+
+        redis.call('HSET', KEYS[1], 'state', ARGV[1])
+        redis.call('EXPIRE', KEYS[1], ARGV[4])
+        redis.call('ZREM', KEYS[2], ARGV[2])
+        redis.call('PUBLISH', ARGV[3], ARGV[1])
+        return 1
+    """
+
+    def __init__(self) -> None:
+        super().__init__(db=project_settings.REDIS_DB_DATA)
+
+    def get_request_key(self, request_uuid: str) -> str:
+        return f"devices:pair_requests:{request_uuid}"
+
+    def get_request_state_channel(self, request_uuid: str) -> str:
+        return f"devices:pair_requests:{request_uuid}:state"
+
+    def get_device_requests_key(self, device_id: int) -> str:
+        return f"devices:pair_requests:device:{device_id}"
+
+    def get_device_requests_channel(self, device_id: int) -> str:
+        return f"devices:pair_requests:device:{device_id}:notify"
+
+    @asynccontextmanager
+    async def _listen(self, channel: str) -> AsyncGenerator['asyncio.Queue[str]', None]:
+        messages: asyncio.Queue[str] = asyncio.Queue()
+        handler: Callable[[str], None] = messages.put_nowait
+
+        await _pubsub_listener.subscribe(channel, handler)
+        try:
+            yield messages
+        finally:
+            await _pubsub_listener.unsubscribe(channel, handler)
+
+    def _to_request(self, fields: Dict[str, Optional[str]]) -> Optional[DevicePairRequest]:
+        data, state, expires_at = fields.get("data"), fields.get("state"), fields.get("expires_at")
+
+        if data is None or state != DevicePairReqeustState.PENDING.value or float(expires_at or 0) <= time.time():
+            return None
+
+        return DevicePairRequest.from_json_dict(json.loads(data))
+
+    async def _get_many(self, request_uuids: List[str]) -> List[DevicePairRequest]:
+        if not request_uuids:
+            return []
+
+        redis = await self.get_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            for request_uuid in request_uuids:
+                pipe.hgetall(self.get_request_key(request_uuid))
+            results = await pipe.execute()
+
+        return [request for fields in results if (request := self._to_request(fields)) is not None]
+
+    async def add(self, request: DevicePairRequest, ttl: float) -> None:
+        redis = await self.get_redis()
+        expires_at = time.time() + ttl
+        key_ttl = int(ttl) + self.RESOLVED_TTL  # Expired request can still be resolved (auto-reject) and read by waiters
+        index_key = self.get_device_requests_key(request.device.id)
+
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.get_request_key(request.uuid), mapping={
+                "data": json.dumps(request.to_json_dict()),
+                "state": request.state.value,
+                "expires_at": expires_at
+            })
+            pipe.expire(self.get_request_key(request.uuid), key_ttl)
+            pipe.zremrangebyscore(index_key, "-inf", time.time())
+            pipe.zadd(index_key, {request.uuid: expires_at})
+            pipe.expire(index_key, key_ttl)
+            pipe.publish(self.get_device_requests_channel(request.device.id), request.uuid)
+            await pipe.execute()
+
+    async def get(self, request_uuid: str) -> Optional[DevicePairRequest]:
+        return next(iter(await self._get_many([request_uuid])), None)
+
+    async def get_device_requests(self, device_id: int) -> List[DevicePairRequest]:
+        redis = await self.get_redis()
+        request_uuids = await redis.zrangebyscore(self.get_device_requests_key(device_id), f"({time.time()}", "+inf")
+        return await self._get_many(request_uuids)
+
+    async def wait_for_device_request(self, device_id: int, timeout: Optional[float] = None) -> DevicePairRequest:
+        async with asyncio.timeout(timeout), self._listen(self.get_device_requests_channel(device_id)) as messages:
+            if requests := await self.get_device_requests(device_id):  # Sent before subscription
+                return requests[0]
+
+            while True:
+                if (request := await self.get(await messages.get())) is not None:
+                    return request
+
+    async def resolve(self, request: DevicePairRequest, state: DevicePairReqeustState) -> bool:
+        resolve_script = await self.get_script(self.RESOLVE_SCRIPT)
+        resolved = await resolve_script(
+            keys=[self.get_request_key(request.uuid), self.get_device_requests_key(request.device.id)],
+            args=[state.value, request.uuid, self.get_request_state_channel(request.uuid), self.RESOLVED_TTL]
+        )
+
+        if resolved:
+            request.state = state
+        return bool(resolved)
+
+    async def wait_for_state_change(self, request: DevicePairRequest, timeout: Optional[float] = None) -> DevicePairReqeustState:
+        async with asyncio.timeout(timeout), self._listen(self.get_request_state_channel(request.uuid)) as messages:
+            redis = await self.get_redis()
+            state = await redis.hget(self.get_request_key(request.uuid), "state")  # type: ignore  # Resolved before subscription
+
+            if state is None:  # Expired without resolution
+                state = DevicePairReqeustState.REJECTED.value
+            elif state == DevicePairReqeustState.PENDING.value:
+                state = await messages.get()
+
+        request.state = DevicePairReqeustState(state)
+        return request.state
@@ -0,0 +1,19 @@
+from datetime import datetime
+from enum import Enum
+
+from pydantic import Field
+
+from src.core.db import BaseSchema
+from src.core.utils.types import JsonDict
+
+
+class DeviceEventType(Enum):
+    PAIR_REQUESTS = "pair_requests"  # All pending requests of the device; Sent on connect and after missed events
+    PAIR_REQUEST_CREATED = "pair_request_created"
+    PAIR_REQUEST_STATE_CHANGED = "pair_request_state_changed"
+
+
+class DeviceEvent(BaseSchema):
+    event_type: DeviceEventType
+    created_at: datetime = Field(default_factory=datetime.now)
+    data: JsonDict
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 
 from src.core.db import BaseModel
@@ -8,6 +8,10 @@ from src.core.db import BaseModel
 
 class DevicePairModel(BaseModel):  # TODO: Validators
     __tablename__ = 'device_pairs'
+    __table_args__ = (
+        Index('ix_device_pairs_device_id', 'device_id', unique=True),  # Device can have only one owner
+        Index('ix_device_pairs_user_id_device_id', 'user_id', 'device_id'),
+    )
 
     id = Column(Integer, primary_key=True)
 
@@ -0,0 +1,2 @@
+from .model import DevicePairChangeModel, DevicePairChangeAction
+from .schema import DevicePairChange
@@ -0,0 +1,44 @@
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, Enum as SqlEnum
+from sqlalchemy.orm import relationship
+
+from src.core.db import BaseModel
+
+
+class DevicePairChangeAction(Enum):
+    PAIRED = "paired"
+    UNPAIRED = "unpaired"
+
+
+class DevicePairChangeModel(BaseModel):
+    """
+    Log of pairs created and removed (device owner changes); Written in the same transaction as the pair.
+
+    Each change has a version per owner (`user_version`) and per device (`device_version`), assigned in that transaction
+    while rows of both users are locked, so versions of one user are committed in order and clients may fetch changes
+    after the last version they have seen without missing any. Unique indexes reject a version taken concurrently
+    where the database has no row locks (sqlite).
+    """
+
+    __tablename__ = 'device_pair_changes'
+    __table_args__ = (
+        Index('ix_device_pair_changes_user_id_user_version', 'user_id', 'user_version', unique=True),
+        Index('ix_device_pair_changes_device_id_device_version', 'device_id', 'device_version', unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    device_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    user_version = Column(Integer, nullable=False)
+    device_version = Column(Integer, nullable=False)
+    action: Column[DevicePairChangeAction] = Column(
+        SqlEnum(DevicePairChangeAction, native_enum=False, length=16, values_callable=lambda actions: [action.value for action in actions]),
+        nullable=False
+    )
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    user = relationship("UserModel", foreign_keys=[user_id])
+    device = relationship("UserModel", foreign_keys=[device_id])
@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from src.core.db import BaseSchema
+from src.main.components.auth.models.user import UserPublic
+from .model import DevicePairChangeAction
+
+
+class DevicePairChange(BaseSchema):
+    version: int  # Version among changes of the user who receives them (owner or device)
+    action: DevicePairChangeAction
+    user: UserPublic
+    device: UserPublic
+    created_at: datetime
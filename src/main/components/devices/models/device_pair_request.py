@@ -58,6 +58,28 @@ class DevicePairRequest:
     async def wait_for_state_change(self, timeout: Optional[float]) -> None:
         await asyncio.wait_for(self._state_changed_event.wait(), timeout=timeout)
 
+    def to_json_dict(self) -> JsonDict:
+        """Full representation (with internal user data) for storing the request; See `from_json_dict`"""
+
+        return {
+            "uuid": self.uuid,
+            "user": self.user.to_json_dict(),
+            "device": self.device.to_json_dict(),
+            "created_at": self.created_at.timestamp(),
+            "state": self.state.value
+        }
+
+    @classmethod
+    def from_json_dict(cls, data: JsonDict) -> 'DevicePairRequest':
+        request = cls(
+            user=UserInternal.model_validate(data["user"]),
+            device=UserInternal.model_validate(data["device"])
+        )
+        request.uuid = data["uuid"]
+        request.created_at = datetime.fromtimestamp(data["created_at"])
+        request._state = DevicePairReqeustState(data["state"])
+        return request
+
     def serialize(self) -> JsonDict:
         return {
             "uuid": self.uuid,
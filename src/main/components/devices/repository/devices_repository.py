@@ -1,15 +1,21 @@
+import logging
 from http import HTTPStatus
-from typing import Optional, List
+from typing import Optional, List, Sequence, Tuple
 
 from src.core.utils.singleton import SingletonMeta
-from src.main.components.auth.models.user import UserInternal
+from src.main.components.auth.models.user import UserInternal, UserPublic
 from src.main.components.devices.exceptions import DeviceAlreadyHasOwnerHTTPException
+from src.main.components.devices.internal_utils.device_events import DeviceEventsSubscriber
+from src.main.components.devices.internal_utils.device_topology_index import DeviceTopologyIndexST
 from src.main.components.devices.internal_utils.pair_request_manager import DevicePairRequestManagerST
-from src.main.components.devices.models.device_pair_request import DevicePairRequest
+from src.main.components.devices.models.device_pair_request import DevicePairRequest, DevicePairReqeustState
 from src.main.components.devices.models.device_pair import DevicePair
+from src.main.components.devices.models.device_pair_change import DevicePairChange
 from src.main.components.devices.resources.device_part_resource import DevicePairResourceST
 
+_logger = logging.getLogger(__name__)
 _pair_manager = DevicePairRequestManagerST()
+_topology_index = DeviceTopologyIndexST()
 _device_pair_resource = DevicePairResourceST()
 
 
@@ -21,7 +27,10 @@ class DevicesRepositoryST(metaclass=SingletonMeta):
         await _pair_manager.send_pair_request(request)
 
     async def get_pair_request(self, request_uuid: str) -> DevicePairRequest:
-        return _pair_manager.get_request_by_uuid(request_uuid=request_uuid)
+        return await _pair_manager.get_request_by_uuid(request_uuid=request_uuid)
+
+    async def wait_for_pair_request_state(self, request: DevicePairRequest, timeout: Optional[float] = None) -> DevicePairReqeustState:
+        return await _pair_manager.wait_for_state_change(request, timeout=timeout)
 
     async def accept_pair_request(self, request: DevicePairRequest) -> None:
         await _pair_manager.accept_pair_request(request.uuid)
@@ -32,6 +41,15 @@ class DevicesRepositoryST(metaclass=SingletonMeta):
     async def get_pair_requests(self, *, device_id: int, timeout: Optional[int] = None) -> List[DevicePairRequest]:
         return await _pair_manager.get_pair_requests(device_id, timeout)
 
+    async def get_pending_pair_requests(self, device_id: int) -> List[DevicePairRequest]:
+        return await _pair_manager.get_pending_requests(device_id)
+
+    async def subscribe_to_events(self, user_id: int) -> DeviceEventsSubscriber:
+        return await _pair_manager.subscribe_to_events(user_id)
+
+    async def unsubscribe_from_events(self, subscriber: DeviceEventsSubscriber) -> None:
+        await _pair_manager.unsubscribe_from_events(subscriber)
+
     async def get_device_owner(self, device_id: int) -> Optional[UserInternal]:
         user_model = await _device_pair_resource.get_owner(device_id=device_id)
         return None if user_model is None else user_model.to_schema(UserInternal)
@@ -43,12 +61,45 @@ class DevicesRepositoryST(metaclass=SingletonMeta):
         models = await _device_pair_resource.get_user_devices(user.id)
         return list(map(lambda x: x.to_schema(UserInternal), models))
 
+    async def get_devices_page(self, user: UserInternal, after_id: int = 0, limit: Optional[int] = None) -> Tuple[List[UserPublic], int]:
+        """Returns devices of the user ordered by id and version of the user's pair changes (see `get_pair_changes`)"""
+
+        if user.is_device:
+            return [], 0
+
+        models, version = await _device_pair_resource.get_user_devices_page(user.id, after_id, limit)
+        return [model.to_schema(UserPublic) for model in models], version
+
+    async def get_pair_changes(self, user: UserInternal, since: int, limit: int) -> List[DevicePairChange]:
+        models = await _device_pair_resource.get_changes(user, since, limit)
+        return [
+            model.to_schema(DevicePairChange, version=model.device_version if user.is_device else model.user_version)
+            for model in models
+        ]
+
     async def get_pair_by_ids(self, user_id: int, device_id: int) -> DevicePair:
         model = await _device_pair_resource.get_pair_by_ids(user_id, device_id)
         return model.to_schema(DevicePair)
 
+    async def pair_devices(self, user: UserInternal, devices: Sequence[UserInternal]) -> None:
+        await _device_pair_resource.create_device_pairs(user, devices)
+
     async def unpair(self, device_pair: DevicePair) -> None:
         await _device_pair_resource.delete_by_id(device_pair.id)
 
+    async def load_topology_index(self) -> None:
+        await _topology_index.load(_device_pair_resource.get_pair_ids)
+
     async def is_same_network(self, user_id_1: int, user_id_2: int) -> bool:
-        return await _device_pair_resource.is_same_network(user_id_1, user_id_2)
+        if _topology_index.is_same_network(user_id_1, user_id_2):
+            return True
+
+        # Index is not loaded or missed a change: the database is the source of truth
+        if not await _device_pair_resource.is_same_network(user_id_1, user_id_2):
+            return False
+
+        if _topology_index.loaded:
+            _logger.warning(f"Device topology index missed network of users {user_id_1} and {user_id_2}; Syncing")
+            _topology_index.sync_users((user_id_1, user_id_2), await _device_pair_resource.get_pair_ids(user_id_1, user_id_2))
+
+        return True
@@ -1,26 +1,54 @@
 from http import HTTPStatus
-from typing import Optional, List
+from typing import Optional, List, Sequence, Tuple, Dict, Any
 
-from sqlalchemy import select, func, delete
+from sqlalchemy import select, delete, or_, bindparam, Select, func, BindParameter, Integer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, aliased
 
 from src.main.components.auth.models.user import UserInternal, UserModel
 from src.main.components.devices.exceptions.generics import (
     InvalidUserOrDeviceHTTPException,
     DeviceAlreadyHasOwnerHTTPException
 )
+from src.main.components.devices.internal_utils.device_topology_index import DeviceTopologyIndexST, DevicePairIds
 from src.main.components.devices.models.device_pair import DevicePairModel
-from src.main.db import AsyncDatabaseManagerST
+from src.main.components.devices.models.device_pair_change import DevicePairChangeModel, DevicePairChangeAction
+from src.main.db import AsyncDatabaseManagerST, UniqueConstraintFailed
 from src.main.resources import BaseResource, BaseResourceSTMeta
 
 _db_manager = AsyncDatabaseManagerST()
+_topology_index = DeviceTopologyIndexST()
+
+
+def _build_same_network_stmt() -> Select:
+    # Built once: constructing statements with aliases costs more than executing them
+    user_id_1: BindParameter[int] = bindparam("user_id_1", type_=Integer)
+    user_id_2: BindParameter[int] = bindparam("user_id_2", type_=Integer)
+
+    paired = select(DevicePairModel.id).where(
+        ((DevicePairModel.user_id == user_id_1) & (DevicePairModel.device_id == user_id_2)) |
+        ((DevicePairModel.user_id == user_id_2) & (DevicePairModel.device_id == user_id_1))
+    )
+
+    pair_1, pair_2 = aliased(DevicePairModel), aliased(DevicePairModel)
+    same_owner = (
+        select(pair_1.id)
+        .join(pair_2, pair_1.user_id == pair_2.user_id)
+        .where(pair_1.device_id == user_id_1, pair_2.device_id == user_id_2, pair_1.id != pair_2.id)
+    )
+
+    return select(or_(paired.exists(), same_owner.exists()))
+
+
+_same_network_stmt = _build_same_network_stmt()
 
 
 # TODO: override update methods for safety
 class DevicePairResourceST(BaseResource[DevicePairModel], metaclass=BaseResourceSTMeta):
     __model_cls__ = DevicePairModel
 
+    BULK_CHUNK_SIZE: int = 500  # Max number of ids in one IN (...) clause
+
     async def _fetch_by_id(self, session: AsyncSession, pair_id: int) -> Optional[DevicePairModel]:
         query = (
             select(DevicePairModel)
@@ -31,14 +59,20 @@ class DevicePairResourceST(BaseResource[DevicePairModel], metaclass=BaseResource
         return result.scalar()
 
     async def _fetch_device_owner(self, session: AsyncSession, device_id: int) -> Optional[UserModel]:
-        subquery = select(DevicePairModel.user_id).where(DevicePairModel.device_id == device_id).scalar_subquery()
-        stmt = select(UserModel).where(UserModel.id == subquery)
+        stmt = (
+            select(UserModel)
+            .join(DevicePairModel, DevicePairModel.user_id == UserModel.id)
+            .where(DevicePairModel.device_id == device_id)
+        )
         result = await session.execute(stmt)
         return result.scalars().first()
 
     async def _fetch_user_devices(self, session: AsyncSession, user_id: int) -> List[UserModel]:
-        subquery = select(DevicePairModel.device_id).where(DevicePairModel.user_id == user_id)
-        stmt = select(UserModel).where(UserModel.id.in_(subquery))
+        stmt = (
+            select(UserModel)
+            .join(DevicePairModel, DevicePairModel.device_id == UserModel.id)
+            .where(DevicePairModel.user_id == user_id)
+        )
         result = await session.execute(stmt)
         return list(result.scalars().all())
 
@@ -51,23 +85,93 @@ class DevicePairResourceST(BaseResource[DevicePairModel], metaclass=BaseResource
         result = await session.execute(stmt)
         return result.scalar()
 
-    async def _delete_pair_by_device_id(self, session: AsyncSession, device_id: int) -> None:
-        stmt = delete(DevicePairModel).where(DevicePairModel.device_id == device_id)
-        await session.execute(stmt)
+    async def _lock_users(self, session: AsyncSession, user_ids: Sequence[int]) -> None:
+        # Rows are locked in order of ids, so transactions locking the same users wait for each other instead of deadlocking
+        for start in range(0, len(user_ids), self.BULK_CHUNK_SIZE):
+            stmt = (
+                select(UserModel.id)
+                .where(UserModel.id.in_(user_ids[start:start + self.BULK_CHUNK_SIZE]))
+                .order_by(UserModel.id)
+                .with_for_update()
+            )
+            await session.execute(stmt)
+
+    async def _fetch_last_versions(self, session: AsyncSession, column: Any, version_column: Any, user_ids: Sequence[int]) -> Dict[int, int]:
+        versions: Dict[int, int] = {}
+        for start in range(0, len(user_ids), self.BULK_CHUNK_SIZE):
+            stmt = (
+                select(column, func.max(version_column))
+                .where(column.in_(user_ids[start:start + self.BULK_CHUNK_SIZE]))
+                .group_by(column)
+            )
+            versions.update({user_id: version for user_id, version in (await session.execute(stmt)).all()})
+
+        return versions
+
+    async def _add_changes(self, session: AsyncSession, action: DevicePairChangeAction, pair_ids: Sequence[DevicePairIds]) -> None:
+        """Records the changes with the next versions of their owners and devices; Users stay locked until the transaction ends"""
+
+        if not pair_ids:
+            return
+
+        user_ids = sorted({user_id for user_id, _ in pair_ids})
+        device_ids = sorted({device_id for _, device_id in pair_ids})
+        await self._lock_users(session, sorted({*user_ids, *device_ids}))
+
+        user_versions = await self._fetch_last_versions(
+            session, DevicePairChangeModel.user_id, DevicePairChangeModel.user_version, user_ids)
+        device_versions = await self._fetch_last_versions(
+            session, DevicePairChangeModel.device_id, DevicePairChangeModel.device_version, device_ids)
+
+        changes = []
+        for user_id, device_id in pair_ids:
+            user_versions[user_id] = user_versions.get(user_id, 0) + 1
+            device_versions[device_id] = device_versions.get(device_id, 0) + 1
+            changes.append(DevicePairChangeModel(  # type: ignore
+                user_id=user_id, device_id=device_id, action=action,
+                user_version=user_versions[user_id], device_version=device_versions[device_id]
+            ))
+
+        session.add_all(changes)
+
+    async def _delete_pairs(self, session: AsyncSession, *where) -> List[DevicePairIds]:
+        """Deletes pairs and records the changes; Returns (user_id, device_id) of deleted pairs"""
+
+        stmt = delete(DevicePairModel).where(*where).returning(DevicePairModel.user_id, DevicePairModel.device_id)
+        pair_ids = [(user_id, device_id) for user_id, device_id in (await session.execute(stmt)).all()]
+
+        await self._add_changes(session, DevicePairChangeAction.UNPAIRED, pair_ids)
         await session.commit()
+        return pair_ids
 
-    async def get_pair_by_ids(self, user_id: int, device_id: int) -> DevicePairModel:
+    async def _delete_pair_by_device_id(self, session: AsyncSession, device_id: int) -> None:
+        await self._delete_pairs(session, DevicePairModel.device_id == device_id)
+
+    async def _fetch_pair_ids(self, session: AsyncSession, *user_ids: int) -> List[DevicePairIds]:
+        stmt = select(DevicePairModel.user_id, DevicePairModel.device_id)
+        if user_ids:
+            stmt = stmt.where(DevicePairModel.user_id.in_(user_ids) | DevicePairModel.device_id.in_(user_ids))
+
+        result = await session.execute(stmt)
+        return [(user_id, device_id) for user_id, device_id in result.all()]
+
+    async def get_pair_ids(self, *user_ids: int) -> List[DevicePairIds]:
+        """Returns (user_id, device_id) of all pairs or of pairs where any of `user_ids` is owner or device"""
         async with _db_manager.session() as session:
+            return await self._fetch_pair_ids(session, *user_ids)
+
+    async def get_pair_by_ids(self, user_id: int, device_id: int) -> DevicePairModel:
+        async with _db_manager.session(read_only=True) as session:
             if (pair := await self._fetch_pair_by_ids(session, user_id, device_id)) is not None:
                 return pair
             raise DevicePairModel.DoesNotExist(f"DevicePairModel with {user_id=}; {device_id=} does not exist")
 
     async def get_user_devices(self, user_id: int) -> List[UserModel]:
-        async with _db_manager.session() as session:
+        async with _db_manager.session(read_only=True) as session:
             return await self._fetch_user_devices(session, user_id)
 
     async def get_owner(self, device_id: int) -> Optional[UserModel]:
-        async with _db_manager.session() as session:
+        async with _db_manager.session(read_only=True) as session:
             return await self._fetch_device_owner(session, device_id)
 
     async def create_device_pair(self, user: UserInternal, device: UserInternal) -> DevicePairModel:
@@ -75,18 +179,139 @@ class DevicePairResourceST(BaseResource[DevicePairModel], metaclass=BaseResource
             raise InvalidUserOrDeviceHTTPException(status_code=HTTPStatus.BAD_REQUEST,
                 message="Unable to pair devices: Invalid user or device specified")
 
-        if await self.get_owner(device_id=device.id):
+        if (device_pairs := await self._insert_pairs(user.id, [device.id])) is None:
             raise DeviceAlreadyHasOwnerHTTPException(status_code=HTTPStatus.BAD_REQUEST,
                 message="This device already has owner, so is cannot be paired with any other user")
 
-        device_pair = DevicePairModel(user_id=user.id, device_id=device.id)  # type: ignore
-        await self.save(device_pair)
-        return device_pair
+        await _topology_index.add_pair(user.id, device.id)
+        return device_pairs[0]
+
+    async def _has_owned_devices(self, session: AsyncSession, device_ids: Sequence[int]) -> bool:
+        for start in range(0, len(device_ids), self.BULK_CHUNK_SIZE):
+            stmt = select(DevicePairModel.id).where(DevicePairModel.device_id.in_(device_ids[start:start + self.BULK_CHUNK_SIZE])).limit(1)
+            if (await session.execute(stmt)).scalar() is not None:
+                return True
+
+        return False
+
+    async def _insert_pairs(self, user_id: int, device_ids: Sequence[int]) -> Optional[List[DevicePairModel]]:
+        """Inserts pairs with their changes; Returns None (nothing is inserted) if some device already has owner"""
+
+        device_pairs = [DevicePairModel(user_id=user_id, device_id=device_id) for device_id in device_ids]  # type: ignore
+        try:
+            async with _db_manager.session() as session:
+                await self._add_changes(session, DevicePairChangeAction.PAIRED, [(user_id, device_id) for device_id in device_ids])
+                # Owners are checked while the users are locked, so concurrent pairings of a device cannot both pass the check
+                if await self._has_owned_devices(session, device_ids):
+                    return None
+
+                session.add_all(device_pairs)
+                await session.commit()
+        except UniqueConstraintFailed as error:  # Concurrent pairing on databases without row locks
+            async with _db_manager.session() as session:
+                if not await self._has_owned_devices(session, device_ids):
+                    raise error
+            return None
+
+        return device_pairs
+
+    async def create_device_pairs(self, user: UserInternal, devices: Sequence[UserInternal]) -> List[DevicePairModel]:
+        """Pairs all devices with the user in one transaction"""
+
+        if user.is_device or not all(device.is_device for device in devices):
+            raise InvalidUserOrDeviceHTTPException(status_code=HTTPStatus.BAD_REQUEST,
+                message="Unable to pair devices: Invalid user or device specified")
+
+        if not devices:
+            return []
+
+        if (device_pairs := await self._insert_pairs(user.id, [device.id for device in devices])) is None:
+            raise DeviceAlreadyHasOwnerHTTPException(status_code=HTTPStatus.BAD_REQUEST,
+                message="Some of devices already have owner, so they cannot be paired with any other user")
+
+        device_ids = [device.id for device in devices]
+        await _db_manager.run_after_commit(lambda: _topology_index.add_pairs(user.id, device_ids))
+        return device_pairs
 
     async def unpair_device(self, device_id: int) -> None:
         async with _db_manager.session() as session:
             await self._delete_pair_by_device_id(session, device_id)
 
+        await _topology_index.remove_device(device_id)
+
+    async def delete(self, model_obj: DevicePairModel) -> None:
+        await self.delete_by_id(model_obj.id)  # type: ignore
+
+    async def delete_by_id(self, object_id: int) -> None:
+        async with _db_manager.session() as session:
+            pair_ids = await self._delete_pairs(session, DevicePairModel.id == object_id)
+
+        for _, device_id in pair_ids:
+            await _topology_index.remove_device(device_id)
+
+    async def _fetch_user_devices_page(self, session: AsyncSession, user_id: int, after_id: int, limit: Optional[int]) -> List[UserModel]:
+        stmt = (
+            select(UserModel)
+            .join(DevicePairModel, DevicePairModel.device_id == UserModel.id)
+            .where(DevicePairModel.user_id == user_id, UserModel.id > after_id)
+            .order_by(UserModel.id)
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def _fetch_changes_version(self, session: AsyncSession, user_id: int) -> int:
+        result = await session.execute(select(func.max(DevicePairChangeModel.user_version)).where(DevicePairChangeModel.user_id == user_id))
+        return result.scalar() or 0
+
+    async def _fetch_changes(self, session: AsyncSession, user: UserInternal, since: int, limit: int) -> List[DevicePairChangeModel]:
+        # Owners get changes of their devices; Devices get changes of their owner
+        if user.is_device:
+            column, version_column = DevicePairChangeModel.device_id, DevicePairChangeModel.device_version
+        else:
+            column, version_column = DevicePairChangeModel.user_id, DevicePairChangeModel.user_version
+
+        stmt = (
+            select(DevicePairChangeModel)
+            .options(joinedload(DevicePairChangeModel.user), joinedload(DevicePairChangeModel.device))
+            .where(column == user.id, version_column > since)
+            .order_by(version_column)
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_user_devices_page(self, user_id: int, after_id: int = 0, limit: Optional[int] = None) -> Tuple[List[UserModel], int]:
+        """
+        Returns devices of the user ordered by id (all of them if `limit` is None) and current version of the user's pair changes.
+
+        :param user_id: `int`
+            The ID of the user (owner).
+
+        :param after_id: `int`
+            Only devices with greater ID are returned; ID of the last device of the previous page.
+
+        :param limit: `Optional[int]`
+            Max number of devices.
+
+        :return: `Tuple[List[UserModel], int]`
+            Devices and version to pass to `get_changes` to receive later changes.
+        """
+
+        async with _db_manager.session(read_only=True) as session:
+            # Version is read first: changes committed in between are returned by `get_changes` once more, but not lost
+            version = await self._fetch_changes_version(session, user_id)
+            return await self._fetch_user_devices_page(session, user_id, after_id, limit), version
+
+    async def get_changes(self, user: UserInternal, since: int, limit: int) -> List[DevicePairChangeModel]:
+        """Returns pair changes of the user (or ownership changes of the device) with version greater than `since`"""
+        async with _db_manager.session(read_only=True) as session:
+            return await self._fetch_changes(session, user, since, limit)
+
+    async def _check_same_network(self, session: AsyncSession, user_id_1: int, user_id_2: int) -> bool:
+        result = await session.execute(_same_network_stmt, {"user_id_1": user_id_1, "user_id_2": user_id_2})
+        return bool(result.scalar())
+
     async def is_same_network(self, user_id_1: int, user_id_2: int) -> bool:
         """
         Check if the two user IDs (can be user and device) are in the same network.
@@ -105,27 +330,5 @@ class DevicePairResourceST(BaseResource[DevicePairModel], metaclass=BaseResource
             Returns `True` if the two IDs are in the same network, otherwise `False`.
         """
 
-        async with _db_manager.session() as session:
-            stmt_1 = select(DevicePairModel).where(
-                (DevicePairModel.user_id == user_id_1) & (DevicePairModel.device_id == user_id_2)
-            )
-            stmt_2 = select(DevicePairModel).where(
-                (DevicePairModel.user_id == user_id_2) & (DevicePairModel.device_id == user_id_1)
-            )
-
-            result_1 = await session.execute(stmt_1)
-            result_2 = await session.execute(stmt_2)
-
-            if result_1.scalars().first() or result_2.scalars().first():
-                return True
-
-            # Check if both user_id_1 and user_id_2 are associated with the same user via DevicePair
-            stmt_3 = select(DevicePairModel.user_id).where(
-                (DevicePairModel.device_id == user_id_1) | (DevicePairModel.device_id == user_id_2)
-            ).group_by(DevicePairModel.user_id).having(func.count(DevicePairModel.user_id) == 2)
-
-            result_3 = await session.execute(stmt_3)
-            if result_3.scalars().first():
-                return True
-
-            return False
+        async with _db_manager.session(read_only=True) as session:
+            return await self._check_same_network(session, user_id_1, user_id_2)
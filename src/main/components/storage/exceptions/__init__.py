@@ -0,0 +1,2 @@
+from .base import StorageHTTPException
+from .generics import StorageQueueOverflowHTTPException
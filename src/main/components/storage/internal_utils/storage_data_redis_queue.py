@@ -1,7 +1,40 @@
-from src.main.redis.collections import RedisQueue
+import json
+
 from src.main.components.storage.models.storage_data_message import StorageDataMessage
+from src.main.redis.collections import RedisQueue, RedisStreamQueue
+
+# Entries are stored as client-facing JSON, so websockets can forward them without decoding.
+# The target user is known from the queue itself, so it is not stored.
+_CLIENT_EXCLUDED_FIELDS = {"target_user_id"}
+
+
+def _encode_storage_data_message(schema: StorageDataMessage, **kwargs) -> str:
+    return schema.model_dump_json(**{"exclude": _CLIENT_EXCLUDED_FIELDS, **kwargs})
+
+
+def _decode_storage_data_message(data: str, target_user_id: int) -> StorageDataMessage:
+    return StorageDataMessage.model_validate({**json.loads(data), "target_user_id": target_user_id})
 
 
 class StorageDataRedisQueue(RedisQueue[StorageDataMessage]):
-    def __init__(self, **kwargs) -> None:
+    def __init__(self, *, user_id: int, **kwargs) -> None:
         super().__init__(schema_cls=StorageDataMessage, **kwargs)
+        self._user_id = user_id
+
+    def _encode_schema(self, schema: StorageDataMessage, **kwargs) -> str:
+        return _encode_storage_data_message(schema, **kwargs)
+
+    def _decode_schema(self, data: str) -> StorageDataMessage:
+        return _decode_storage_data_message(data, self._user_id)
+
+
+class StorageDataRedisStreamQueue(RedisStreamQueue[StorageDataMessage]):
+    def __init__(self, *, user_id: int, **kwargs) -> None:
+        super().__init__(schema_cls=StorageDataMessage, **kwargs)
+        self._user_id = user_id
+
+    def _encode_schema(self, schema: StorageDataMessage, **kwargs) -> str:
+        return _encode_storage_data_message(schema, **kwargs)
+
+    def _decode_schema(self, data: str) -> StorageDataMessage:
+        return _decode_storage_data_message(data, self._user_id)
@@ -0,0 +1,249 @@
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Callable, Set, Optional, Iterator
+
+from src.core.state import project_settings
+from src.core.utils.errors import get_traceback_text, supress_exception
+from src.core.utils.singleton import SingletonMeta
+from src.main.components.storage.internal_utils.storage_manager_redis import StorageManagerRedisST
+from src.main.components.storage.models.storage_data_message import StorageDataMessage
+from src.main.redis import RedisPubSubListenerST
+from src.main.redis.collections import RedisQueueEntry
+
+_logger = logging.getLogger(__name__)
+_storage_manager = StorageManagerRedisST()
+_pubsub_listener = RedisPubSubListenerST()
+
+StorageEntry = RedisQueueEntry[StorageDataMessage]
+
+
+class StorageSubscriber:
+    def __init__(self, user_id: int, on_empty: Callable[['StorageSubscriber'], None]) -> None:
+        self.user_id = user_id
+        self._entries: asyncio.Queue[StorageEntry] = asyncio.Queue()
+        self._on_empty = on_empty
+        self.ready = False  # Set after recovered entries are queued; Until then local delivery could break the order
+
+    @property
+    def backlog(self) -> int:
+        return self._entries.qsize()
+
+    def put(self, entry: StorageEntry) -> None:
+        self._entries.put_nowait(entry)
+
+    async def get(self) -> StorageEntry:
+        entry = await self._entries.get()
+
+        if self._entries.empty():
+            self._on_empty(self)
+
+        return entry
+
+    async def get_batch(self, max_count: int, window: float) -> List[StorageEntry]:
+        """Waits for an entry, then collects entries that arrive within `window` seconds (up to `max_count`)"""
+
+        entries = [await self._entries.get()]
+        deadline = asyncio.get_running_loop().time() + window
+
+        while len(entries) < max_count:
+            if self._entries.empty():
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+
+                try:
+                    entries.append(await asyncio.wait_for(self._entries.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                except asyncio.CancelledError as error:
+                    for entry in (*entries, *self.take_all()):  # Collected entries are returned in the original order
+                        self.put(entry)
+                    raise error
+                continue
+
+            entries.append(self._entries.get_nowait())
+
+        if self._entries.empty():
+            self._on_empty(self)
+
+        return entries
+
+    def take_all(self) -> List[StorageEntry]:
+        entries = []
+        while not self._entries.empty():
+            entries.append(self._entries.get_nowait())
+        return entries
+
+
+class StorageDispatcherST(metaclass=SingletonMeta):
+    """
+    Delivers storage messages to the websockets connected to this worker process.
+
+    Writers announce new entries in a per-user pub/sub channel; The dispatcher listens to the channels
+    of locally connected users (all of them share one pub/sub connection) and moves entries from Redis
+    to the subscribers' in-memory queues with batched non-blocking pops.
+    Each entry is handed to exactly one subscriber of the user (the least loaded one).
+
+    Messages are delivered locally (without Redis) only while the user's queue is known to be empty:
+    the last drain found no entries, no notification came since and no write of this process was in flight.
+    Writes of other processes are seen only when their notifications arrive.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[int, List[StorageSubscriber]] = {}
+        self._notification_handlers: Dict[int, Callable[[str], None]] = {}
+        self._drain_tasks: Dict[int, asyncio.Task] = {}
+        self._drain_requested: Set[int] = set()
+        self._backlogged: Set[int] = set()
+        self._queue_empty: Set[int] = set()  # Users whose queues were found empty by the last drain
+        self._pending_writes: Dict[int, int] = {}  # Numbers of writes to users' queues made by this process and not finished yet
+        self._write_epochs: Dict[int, int] = {}  # Numbers of writes started for locally connected users
+
+        _pubsub_listener.add_reconnect_handler(self._drain_all)
+
+    def _least_loaded(self, subscribers: List[StorageSubscriber]) -> StorageSubscriber:
+        return min(subscribers, key=lambda subscriber: subscriber.backlog)
+
+    def _on_subscriber_empty(self, subscriber: StorageSubscriber) -> None:
+        if subscriber.user_id in self._backlogged:
+            self._backlogged.discard(subscriber.user_id)
+            self._schedule_drain(subscriber.user_id)
+
+    def _drain_all(self) -> None:
+        for user_id in tuple(self._subscribers.keys()):
+            self._schedule_drain(user_id)
+
+    def _schedule_drain(self, user_id: int) -> None:
+        self._queue_empty.discard(user_id)  # New entries may have been written
+
+        if user_id not in self._subscribers:
+            return
+
+        task = self._drain_tasks.get(user_id)
+        if task is not None and not task.done():
+            self._drain_requested.add(user_id)  # Running drain will make one more round
+            return
+
+        self._drain_tasks[user_id] = asyncio.create_task(self._drain(user_id))
+
+    async def _drain(self, user_id: int) -> None:
+        queue = _storage_manager.get_user_data_queue(user_id)
+        batch_size = project_settings.STORAGE_DISPATCHER_BATCH_SIZE
+
+        try:
+            while (subscribers := self._subscribers.get(user_id)) is not None:
+                self._drain_requested.discard(user_id)
+
+                if self._least_loaded(subscribers).backlog >= project_settings.STORAGE_SUBSCRIBER_BUFFER_SIZE:
+                    self._backlogged.add(user_id)  # Leave entries in Redis until websockets catch up
+                    return
+
+                # Empty result proves the queue empty only if no write of this process was in flight or started meanwhile
+                write_epoch = self._write_epochs.get(user_id, 0)
+                no_pending_writes = user_id not in self._pending_writes
+
+                entries = await queue.pop_entries(batch_size)
+
+                if (subscribers := self._subscribers.get(user_id)) is None:
+                    await queue.requeue(entries)
+                    return
+
+                for entry in entries:
+                    self._least_loaded(subscribers).put(entry)
+
+                if len(entries) < batch_size and user_id not in self._drain_requested:
+                    if no_pending_writes and self._write_epochs.get(user_id, 0) == write_epoch:
+                        self._queue_empty.add(user_id)
+                    return
+        except Exception as error:
+            _logger.error(f"Unable to dispatch storage messages of user {user_id}:\n{get_traceback_text(error)}")
+        finally:
+            if self._drain_tasks.get(user_id) is asyncio.current_task():
+                del self._drain_tasks[user_id]
+
+    async def subscribe(self, user_id: int, last_id: Optional[str] = None) -> StorageSubscriber:
+        subscriber = StorageSubscriber(user_id, self._on_subscriber_empty)
+        subscribers = self._subscribers.setdefault(user_id, [])
+        subscribers.append(subscriber)
+        is_first = len(subscribers) == 1  # Others may connect while subscribing
+
+        try:
+            if is_first:
+                handler = self._notification_handlers[user_id] = lambda _: self._schedule_drain(user_id)
+                await _pubsub_listener.subscribe(_storage_manager.get_user_storage_notify_channel(user_id), handler)
+
+            # Pending entries of this process belong to other local websockets of the user while they are connected
+            if is_first:
+                queue = _storage_manager.get_user_data_queue(user_id)
+                for entry in await queue.recover_entries(last_id):
+                    subscriber.put(entry)
+        except Exception as error:
+            with supress_exception(Exception):
+                await self.unsubscribe(subscriber)
+            raise error
+
+        subscriber.ready = True
+        self._schedule_drain(user_id)
+        return subscriber
+
+    def deliver_local(self, user_id: int, entry: StorageEntry) -> bool:
+        """
+        Hands entry directly to a websocket of the user connected to this process, skipping Redis.
+        Returns False (entry must be written with `redis_write`) if user has no ready local subscribers,
+        or if there may be entries in Redis that must be delivered first.
+        """
+
+        subscribers = [subscriber for subscriber in self._subscribers.get(user_id, ()) if subscriber.ready]
+        if not subscribers or user_id not in self._queue_empty or user_id in self._backlogged or user_id in self._drain_tasks:
+            return False
+
+        subscriber = self._least_loaded(subscribers)
+        if subscriber.backlog >= project_settings.STORAGE_SUBSCRIBER_BUFFER_SIZE:
+            return False
+
+        subscriber.put(entry)
+        return True
+
+    @contextmanager
+    def redis_write(self, user_id: int) -> Iterator[None]:
+        """Wraps write to the user's queue; Local delivery stays off until a drain takes the written entry"""
+
+        self._queue_empty.discard(user_id)
+        self._pending_writes[user_id] = self._pending_writes.get(user_id, 0) + 1
+        if user_id in self._subscribers:
+            self._write_epochs[user_id] = self._write_epochs.get(user_id, 0) + 1
+
+        try:
+            yield
+        finally:
+            if (pending := self._pending_writes[user_id] - 1) > 0:
+                self._pending_writes[user_id] = pending
+            else:
+                del self._pending_writes[user_id]
+
+    async def unsubscribe(self, subscriber: StorageSubscriber, *undelivered: StorageEntry) -> None:
+        """Removes the subscriber; Its undelivered entries (`undelivered` first) go to other subscribers or back to Redis"""
+
+        user_id = subscriber.user_id
+        subscribers = self._subscribers.get(user_id, [])
+
+        if subscriber in subscribers:
+            subscribers.remove(subscriber)
+
+        undelivered = (*undelivered, *subscriber.take_all())
+
+        if subscribers:
+            for entry in undelivered:
+                self._least_loaded(subscribers).put(entry)
+            return
+
+        self._subscribers.pop(user_id, None)
+        self._backlogged.discard(user_id)
+        self._queue_empty.discard(user_id)
+        self._write_epochs.pop(user_id, None)
+
+        if (handler := self._notification_handlers.pop(user_id, None)) is not None:
+            await _pubsub_listener.unsubscribe(_storage_manager.get_user_storage_notify_channel(user_id), handler)
+
+        await _storage_manager.get_user_data_queue(user_id).requeue(undelivered)
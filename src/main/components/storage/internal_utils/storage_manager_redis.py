@@ -1,18 +1,69 @@
+import os
+import socket
+from typing import Union, Dict, Any
+
+from src.core.exceptions import ConfigurationError
 from src.core.state import project_settings
 from src.core.utils.singleton import SingletonMeta
-from src.main.components.storage.internal_utils.storage_data_redis_queue import StorageDataRedisQueue
+from src.main.components.storage.internal_utils.storage_data_redis_queue import (
+    StorageDataRedisQueue,
+    StorageDataRedisStreamQueue
+)
 from src.main.redis import RedisClientManager
+from src.main.redis.collections import QueueOverflowPolicy
+
+StorageDataQueue = Union[StorageDataRedisQueue, StorageDataRedisStreamQueue]
 
 
 class StorageManagerRedisST(RedisClientManager, metaclass=SingletonMeta):
+    STREAM_GROUP: str = "storage"
+
     def __init__(self) -> None:
         super().__init__(db=project_settings.REDIS_DB_DATA)
 
+    @property
+    def stream_consumer(self) -> str:
+        # One consumer per worker process: entries pending in a dead worker become idle and are claimed by others
+        return f"{socket.gethostname()}:{os.getpid()}"
+
     def get_user_storage_queue_key(self, user_id: int) -> str:
         return f"storage:data:user:{user_id}:queue"
 
-    def get_user_data_queue(self, user_id: int) -> StorageDataRedisQueue:
-        return StorageDataRedisQueue(
-            key=self.get_user_storage_queue_key(user_id),
-            client_manager=self
-        )
+    def get_user_storage_stream_key(self, user_id: int) -> str:
+        return f"storage:data:user:{user_id}:stream"
+
+    def get_user_storage_notify_channel(self, user_id: int) -> str:
+        return f"storage:data:user:{user_id}:notify"
+
+    def get_user_storage_spill_key(self, user_id: int) -> str:
+        return f"storage:data:user:{user_id}:spill"
+
+    def _get_queue_kwargs(self, user_id: int) -> Dict[str, Any]:
+        return {
+            "user_id": user_id,
+            "client_manager": self,
+            "max_size": project_settings.MAX_STORAGE_CAPACITY,
+            "notify_channel": self.get_user_storage_notify_channel(user_id),
+            "overflow_policy": QueueOverflowPolicy(project_settings.STORAGE_QUEUE_OVERFLOW_POLICY),
+            "ttl": project_settings.STORAGE_QUEUE_TTL,
+            "spill_key": self.get_user_storage_spill_key(user_id),
+            "spill_max_size": project_settings.STORAGE_QUEUE_SPILL_CAPACITY
+        }
+
+    def get_user_data_queue(self, user_id: int) -> StorageDataQueue:
+        backend = project_settings.STORAGE_QUEUE_BACKEND
+
+        if backend == "list":
+            return StorageDataRedisQueue(
+                key=self.get_user_storage_queue_key(user_id),
+                **self._get_queue_kwargs(user_id)
+            )
+        elif backend == "stream":
+            return StorageDataRedisStreamQueue(
+                key=self.get_user_storage_stream_key(user_id),
+                group=self.STREAM_GROUP,
+                consumer=self.stream_consumer,
+                **self._get_queue_kwargs(user_id)
+            )
+
+        raise ConfigurationError(f"Unknown storage queue backend: {backend}")
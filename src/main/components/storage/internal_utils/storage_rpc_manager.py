@@ -0,0 +1,77 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict, AsyncIterator, Tuple
+
+from src.core.utils.singleton import SingletonMeta
+from src.main.components.storage.internal_utils.storage_manager_redis import StorageManagerRedisST
+from src.main.components.storage.models.storage_data_message import StorageDataMessage
+from src.main.redis import RedisPubSubListenerST
+
+_storage_manager = StorageManagerRedisST()
+_pubsub_listener = RedisPubSubListenerST()
+
+_WaiterKey = Tuple[int, str]  # (caller user id, request uuid)
+
+
+class StorageRpcManagerST(metaclass=SingletonMeta):
+    """
+    Matches RESPONSE messages with RPC calls waiting for them.
+
+    Calls made in this process are resolved directly; Calls waiting in other processes
+    are reached through a per-call pub/sub channel, so responses never go through the queues.
+    Calls use request uuids with `CALL_UUID_PREFIX`, so responses to plain requests are not published.
+    """
+
+    CALL_UUID_PREFIX: str = "rpc-"
+
+    def __init__(self) -> None:
+        self._waiters: Dict[_WaiterKey, asyncio.Future[StorageDataMessage]] = {}
+
+    def get_rpc_channel(self, user_id: int, request_uuid: str) -> str:
+        return f"storage:rpc:user:{user_id}:{request_uuid}"
+
+    def new_call_uuid(self) -> str:
+        return f"{self.CALL_UUID_PREFIX}{uuid.uuid4()}"
+
+    def is_call_uuid(self, request_uuid: str) -> bool:
+        return request_uuid.startswith(self.CALL_UUID_PREFIX)
+
+    def _resolve(self, message: StorageDataMessage) -> bool:
+        future = self._waiters.get((message.target_user_id, message.request_uuid))
+        if future is None or future.done():
+            return False
+
+        future.set_result(message)
+        return True
+
+    @asynccontextmanager
+    async def expect_response(self, user_id: int, request_uuid: str) -> AsyncIterator[asyncio.Future[StorageDataMessage]]:
+        """Yields future that is resolved with the response to `request_uuid` sent to `user_id`"""
+
+        key = (user_id, request_uuid)
+        channel = self.get_rpc_channel(user_id, request_uuid)
+
+        def handler(data: str) -> None:
+            self._resolve(StorageDataMessage.model_validate_json(data))
+
+        self._waiters[key] = asyncio.get_running_loop().create_future()
+        try:
+            await _pubsub_listener.subscribe(channel, handler)
+            yield self._waiters[key]
+        finally:
+            self._waiters.pop(key, None)
+            await _pubsub_listener.unsubscribe(channel, handler)
+
+    async def deliver_response(self, message: StorageDataMessage) -> bool:
+        """Returns True if the response was consumed by a waiting RPC call"""
+
+        if self._resolve(message):
+            return True
+
+        if not self.is_call_uuid(message.request_uuid):  # Response to a plain request: nobody waits for it
+            return False
+
+        redis = await _storage_manager.get_redis()
+        receivers = await redis.publish(self.get_rpc_channel(message.target_user_id, message.request_uuid), message.model_dump_json())
+        return receivers > 0
@@ -1,29 +1,97 @@
-from typing import AsyncGenerator, Optional
+import asyncio
+import uuid
+from typing import Optional
 
+from src.core.state import project_settings
 from src.core.utils.singleton import SingletonMeta
+from src.core.utils.types import JsonDict
 from src.main.components.auth.repository import AuthRepositoryST
 from src.main.components.devices.exceptions import CrossNetworkRequestHTTPException
 from src.main.components.devices.repository.devices_repository import DevicesRepositoryST
+from src.main.components.storage.exceptions import StorageQueueOverflowHTTPException
+from src.main.components.storage.internal_utils.storage_dispatcher import StorageDispatcherST, StorageSubscriber
 from src.main.components.storage.internal_utils.storage_manager_redis import StorageManagerRedisST
-from src.main.components.storage.models.storage_data_message import StorageDataMessage
-from src.main.exceptions import fetch_or_404
+from src.main.components.storage.internal_utils.storage_rpc_manager import StorageRpcManagerST
+from src.main.components.storage.models.storage_data_message import StorageDataMessage, DataMessageType
+from src.main.exceptions import fetch_or_404, TimeOutHTTPException
+from src.main.redis.collections import RedisQueueEntry, QueueOverflowError
 
 _storage_manager = StorageManagerRedisST()
+_storage_dispatcher = StorageDispatcherST()
+_storage_rpc_manager = StorageRpcManagerST()
 _auth_repository = AuthRepositoryST()
 _devices_repository = DevicesRepositoryST()
 
 
 class StorageRepositoryST(metaclass=SingletonMeta):
     async def send_data_message(self, data_message: StorageDataMessage) -> None:
-        with fetch_or_404(message="Unable to send data message: target user unknown"):
-            await _auth_repository.get_user_by_id(data_message.target_user_id)
-
+        # Users of the same network always exist, so the target is looked up only to tell 404 from 403
         if not await _devices_repository.is_same_network(data_message.sender_user_id, data_message.target_user_id):
+            with fetch_or_404(message="Unable to send data message: target user unknown"):
+                await _auth_repository.get_user_by_id(data_message.target_user_id)
+
             raise CrossNetworkRequestHTTPException(message="Cross-Network storage requests are not allowed")
 
+        if data_message.data_type == DataMessageType.RESPONSE and await _storage_rpc_manager.deliver_response(data_message):
+            return
+
         queue = _storage_manager.get_user_data_queue(data_message.target_user_id)
-        await queue.write_schema(data_message)
 
-    def wait_for_data_message(self, user_id: int, **kwargs) -> AsyncGenerator[Optional[StorageDataMessage], None]:
+        # Target websocket lives in this process: no need to go through Redis
+        if project_settings.STORAGE_LOCAL_DELIVERY and _storage_dispatcher.deliver_local(
+                data_message.target_user_id,
+                queue.make_entry(data_message)
+        ):
+            return
+
+        try:
+            with _storage_dispatcher.redis_write(data_message.target_user_id):
+                await queue.write_schema(data_message)
+        except QueueOverflowError as error:
+            raise StorageQueueOverflowHTTPException(message="Unable to send data message: target storage queue is full") from error
+
+    async def send_request(self, sender_user_id: int, target_user_id: int, data: JsonDict, request_uuid: Optional[str] = None) -> str:
+        request_uuid = str(uuid.uuid4()) if request_uuid is None else request_uuid
+        await self.send_data_message(
+            StorageDataMessage(
+                data_type=DataMessageType.REQUEST,
+                request_uuid=request_uuid,
+                target_user_id=target_user_id,
+                sender_user_id=sender_user_id,
+                data=data
+            )
+        )
+        return request_uuid
+
+    async def send_response(self, sender_user_id: int, target_user_id: int, response_to_request_uuid: str, data: JsonDict) -> None:
+        await self.send_data_message(
+            StorageDataMessage(
+                data_type=DataMessageType.RESPONSE,
+                request_uuid=response_to_request_uuid,
+                target_user_id=target_user_id,
+                sender_user_id=sender_user_id,
+                data=data
+            )
+        )
+
+    async def call(self, sender_user_id: int, target_user_id: int, data: JsonDict, timeout: float) -> StorageDataMessage:
+        """Sends request and waits for the response to it"""
+
+        request_uuid = _storage_rpc_manager.new_call_uuid()
+        async with _storage_rpc_manager.expect_response(sender_user_id, request_uuid) as response:
+            await self.send_request(sender_user_id, target_user_id, data, request_uuid=request_uuid)
+
+            try:
+                return await asyncio.wait_for(response, timeout)
+            except asyncio.TimeoutError as error:
+                raise TimeOutHTTPException(message=f"Target user did not respond to request {request_uuid} in {timeout}s") from error
+
+    async def subscribe(self, user_id: int, last_id: Optional[str] = None) -> StorageSubscriber:
+        return await _storage_dispatcher.subscribe(user_id, last_id)
+
+    async def unsubscribe(self, subscriber: StorageSubscriber, *undelivered: RedisQueueEntry[StorageDataMessage]) -> None:
+        await _storage_dispatcher.unsubscribe(subscriber, *undelivered)
+
+    async def ack_data_entries(self, user_id: int, *entry_ids: str) -> None:
         queue = _storage_manager.get_user_data_queue(user_id)
-        return queue.read_schema(**kwargs)
+        await queue.ack(*entry_ids)
@@ -7,3 +7,4 @@ from .exceptions import (
     error_mapping
 )
 from .manager import AsyncDatabaseManagerST
+from .dependencies import scoped_session_dependency
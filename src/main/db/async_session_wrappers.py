@@ -13,7 +13,9 @@ _logger = getLogger(__name__)
 
 @asynccontextmanager
 async def async_session_autorollback_wrapper(
-        context_manager: AsyncContextManager[AsyncSession]
+        context_manager: AsyncContextManager[AsyncSession],
+        *,
+        close_session: bool = True
 ) -> AsyncGenerator[AsyncSession, None]:
     async with context_manager as session:
         try:
@@ -23,12 +25,15 @@ async def async_session_autorollback_wrapper(
             await session.rollback()
             raise error
         finally:
-            await session.close()
+            if close_session:  # Shared (request-scoped) sessions are closed by their owner
+                await session.close()
 
 
 @asynccontextmanager
 async def async_session_error_convert_wrapper(
-        context_manager: AsyncContextManager[AsyncSession]
+        context_manager: AsyncContextManager[AsyncSession],
+        *,
+        close_session: bool = True
 ) -> AsyncGenerator[AsyncSession, None]:
     async with context_manager as session:
         try:
@@ -52,4 +57,5 @@ async def async_session_error_convert_wrapper(
             _logger.debug(f"Unknown error during db session:\n{get_traceback_text(error)}")
             raise error
         finally:
-            await session.close()
+            if close_session:  # Shared (request-scoped) sessions are closed by their owner
+                await session.close()
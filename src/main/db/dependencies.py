@@ -0,0 +1,14 @@
+from typing import AsyncGenerator
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .manager import AsyncDatabaseManagerST
+
+_db_manager = AsyncDatabaseManagerST()
+
+
+async def scoped_session_dependency() -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency: all resource calls made while handling the request share one database session"""
+
+    async with _db_manager.scoped_session() as session:
+        yield session
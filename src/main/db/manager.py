@@ -1,20 +1,80 @@
+import asyncio
 from abc import ABCMeta
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
 from logging import getLogger
-from typing import Optional, Callable, AsyncContextManager, Generator, Any, Self
+from typing import Optional, Callable, AsyncContextManager, Generator, Any, Self, AsyncGenerator, Dict, List, Awaitable
 
-from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import make_url, event
+from sqlalchemy.exc import OperationalError, InterfaceError
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, AsyncConnection, create_async_engine
+from sqlalchemy.orm import sessionmaker, Session, ORMExecuteState
 
 from src.core.db import AbstractAsyncDatabaseManager
 from src.core.exceptions import InitializationError
 from src.core.state import project_settings
+from src.core.utils.errors import get_traceback_text
 from src.core.utils.singleton import SingletonMeta
 from .async_session_wrappers import (
     async_session_error_convert_wrapper,
     async_session_autorollback_wrapper
 )
+from .pool import MeteredAsyncAdaptedQueuePool, DatabasePoolStatsST
+from .primary_pins import PrimaryPinsST
+from .replicas import DatabaseReplica
 
 _logger = getLogger(__name__)
+_primary_pins = PrimaryPinsST()
+_scoped_session: ContextVar[Optional[AsyncSession]] = ContextVar("scoped_session", default=None)
+_current_user_id: ContextVar[Optional[int]] = ContextVar("current_user_id", default=None)
+_transaction: ContextVar[Optional["_Transaction"]] = ContextVar("transaction", default=None)
+
+
+class _PrimarySession(Session):
+    """Session of the primary database; Committed writes pin the current user to the primary (see `session`)"""
+
+
+@event.listens_for(_PrimarySession, "after_flush")
+def _on_primary_flush(session: Session, _) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(_PrimarySession, "do_orm_execute")
+def _on_primary_execute(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["has_writes"] = True
+
+
+@event.listens_for(_PrimarySession, "after_commit")
+def _on_primary_commit(session: Session) -> None:
+    if session.info.pop("has_writes", False):
+        AsyncDatabaseManagerST().pin_to_primary()
+
+
+@event.listens_for(_PrimarySession, "after_rollback")
+def _on_primary_rollback(session: Session) -> None:
+    session.info.pop("has_writes", None)
+
+
+def _enable_sqlite_savepoints(engine: AsyncEngine) -> None:
+    """pysqlite starts transactions on its own and breaks SAVEPOINT; SQLAlchemy emits BEGIN instead (see its sqlite docs)"""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection: Any, _) -> None:
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _on_begin(connection: Any) -> None:
+        connection.exec_driver_sql("BEGIN")
+
+
+class _Transaction:
+    """State of `AsyncDatabaseManagerST.transaction`; Connection is checked out by the first session"""
+
+    def __init__(self) -> None:
+        self.connection: Optional[AsyncConnection] = None
+        self.session: Optional[AsyncSession] = None
+        self.after_commit: List[Callable[[], Awaitable[None]]] = []
 
 
 class _AsyncDatabaseManagerSTMeta(ABCMeta, SingletonMeta):
@@ -26,6 +86,13 @@ class AsyncDatabaseManagerST(AbstractAsyncDatabaseManager, metaclass=_AsyncDatab
         self._database_url: str = project_settings.DATABASE_URL
         self._engine: Optional[AsyncEngine] = None
         self._session_factory: Optional[Callable[[], AsyncSession]] = None
+        self._stats_task: Optional[asyncio.Task] = None
+        self._replicas: List[DatabaseReplica] = [
+            DatabaseReplica(url, self._get_engine_kwargs(url))
+            for url in project_settings.DATABASE_REPLICA_URLS
+        ]
+        self._next_replica = 0
+        self._replica_check_task: Optional[asyncio.Task] = None
 
     def __await__(self) -> Generator[Any, None, Self]:
         return self.initialize().__await__()
@@ -37,17 +104,115 @@ class AsyncDatabaseManagerST(AbstractAsyncDatabaseManager, metaclass=_AsyncDatab
 
         return self._engine
 
+    @property
+    def pool_stats(self) -> Dict[str, Any]:
+        """Current pool state (for queue pools) and checkout counters"""
+
+        pool = self.engine.pool
+        state = {
+            name: getattr(pool, name)()
+            for name in ("size", "checkedout", "checkedin", "overflow")
+            if hasattr(pool, name)
+        }
+        return {**state, **DatabasePoolStatsST().get_stats()}
+
+    @property
+    def replicas(self) -> List[DatabaseReplica]:
+        return self._replicas
+
+    def _get_engine_kwargs(self, url: str) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"pool_pre_ping": project_settings.DATABASE_POOL_PRE_PING}
+
+        if make_url(url).get_backend_name() == "sqlite":
+            return kwargs  # SQLite uses its own pool classes without size limits
+
+        return {
+            **kwargs,
+            "poolclass": MeteredAsyncAdaptedQueuePool,
+            "pool_size": project_settings.DATABASE_POOL_SIZE,
+            "max_overflow": project_settings.DATABASE_POOL_MAX_OVERFLOW,
+            "pool_timeout": project_settings.DATABASE_POOL_TIMEOUT,
+            "pool_recycle": project_settings.DATABASE_POOL_RECYCLE,
+        }
+
+    async def _log_pool_stats(self) -> None:
+        while True:
+            await asyncio.sleep(project_settings.DATABASE_POOL_STATS_LOG_INTERVAL)
+            try:
+                _logger.info(f"Database pool stats: {self.pool_stats}")
+            except Exception as error:
+                _logger.error(f"Unable to get database pool stats:\n{get_traceback_text(error)}")
+
+    async def _check_replicas(self) -> None:
+        while True:
+            try:
+                await asyncio.gather(*(
+                    replica.check(project_settings.DATABASE_REPLICA_HEALTH_CHECK_TIMEOUT)
+                    for replica in self._replicas
+                ))
+            except Exception as error:
+                _logger.error(f"Unable to check database replicas:\n{get_traceback_text(error)}")
+            await asyncio.sleep(project_settings.DATABASE_REPLICA_HEALTH_CHECK_INTERVAL)
+
     async def initialize(self) -> Self:
-        self._engine = create_async_engine(self._database_url, pool_pre_ping=True)
+        self._engine = create_async_engine(self._database_url, **self._get_engine_kwargs(self._database_url))
+        url = make_url(self._database_url)
+        if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+            # Transactions rely on savepoints; In-memory database has one shared connection, so it keeps driver defaults
+            _enable_sqlite_savepoints(self._engine)
         self._session_factory = sessionmaker(  # type: ignore
             self.engine,
             class_=AsyncSession,
+            sync_session_class=_PrimarySession,
             expire_on_commit=False
         )
 
+        for replica in self._replicas:
+            replica.initialize()
+
+        if project_settings.DATABASE_POOL_STATS_LOG_INTERVAL > 0 and self._stats_task is None:
+            self._stats_task = asyncio.create_task(self._log_pool_stats())
+
+        if self._replicas and self._replica_check_task is None:
+            self._replica_check_task = asyncio.create_task(self._check_replicas())
+
         return self
 
-    def session(self) -> AsyncContextManager[AsyncSession]:
+    def bind_user(self, user_id: int) -> None:
+        """Sets the user on whose behalf the current context (e.g. request) works; Their committed writes pin them to the primary"""
+        _current_user_id.set(user_id)
+
+    def pin_to_primary(self, user_id: Optional[int] = None) -> None:
+        """Sends read-only sessions of the user (current user by default) to the primary for the read-your-writes window"""
+
+        if not self._replicas or (user_id is None and (user_id := _current_user_id.get()) is None):
+            return
+
+        _primary_pins.pin(user_id)  # Shared by all workers: the next request of the user may go to any of them
+
+    async def _choose_replica(self) -> Optional[DatabaseReplica]:
+        if (user_id := _current_user_id.get()) is not None and await _primary_pins.is_pinned(user_id):
+            return None
+
+        for _ in range(len(self._replicas)):  # Round robin over healthy replicas
+            replica = self._replicas[self._next_replica % len(self._replicas)]
+            self._next_replica = (self._next_replica + 1) % len(self._replicas)
+
+            if replica.healthy:
+                return replica
+
+        return None
+
+    @asynccontextmanager
+    async def _new_replica_session(self, replica: DatabaseReplica) -> AsyncGenerator[AsyncSession, None]:
+        async with async_session_autorollback_wrapper(replica.new_session()) as session:
+            try:
+                yield session
+            except (OperationalError, InterfaceError) as error:  # Connection problems; Replica is skipped until health check passes
+                replica.set_healthy(False)
+                raise error
+
+    def _new_session(self) -> AsyncContextManager[AsyncSession]:
         if self._session_factory is None:
             raise InitializationError(f"Unable to get session: {self.__class__.__name__} is not initialized yet")
 
@@ -56,3 +221,114 @@ class AsyncDatabaseManagerST(AbstractAsyncDatabaseManager, metaclass=_AsyncDatab
                 self._session_factory()
             )
         )
+
+    @asynccontextmanager
+    async def _transaction_session(self, transaction: _Transaction) -> AsyncGenerator[AsyncSession, None]:
+        if transaction.session is None:
+            transaction.connection = await self.engine.connect()
+            await transaction.connection.begin()
+            transaction.session = AsyncSession(
+                bind=transaction.connection,
+                sync_session_class=_PrimarySession,
+                expire_on_commit=False,
+                join_transaction_mode="create_savepoint"  # Commits and rollbacks of resources only touch savepoints
+            )
+
+        async with async_session_error_convert_wrapper(
+            async_session_autorollback_wrapper(nullcontext(transaction.session), close_session=False),  # type: ignore
+            close_session=False
+        ) as session:
+            yield session
+
+    @asynccontextmanager
+    async def _read_only_session(self) -> AsyncGenerator[AsyncSession, None]:
+        replica = await self._choose_replica()
+        async with (self._primary_session() if replica is None else self._new_replica_session(replica)) as session:
+            yield session
+
+    def _primary_session(self) -> AsyncContextManager[AsyncSession]:
+        if (transaction := _transaction.get()) is not None:
+            return self._transaction_session(transaction)
+
+        if (session := _scoped_session.get()) is None:
+            return self._new_session()
+
+        # Failed operation is rolled back as in own session, but the session stays open for the rest of the scope
+        return async_session_error_convert_wrapper(
+            async_session_autorollback_wrapper(nullcontext(session), close_session=False),  # type: ignore
+            close_session=False
+        )
+
+    def session(self, read_only: bool = False) -> AsyncContextManager[AsyncSession]:
+        """
+        Returns session of the current transaction (see `transaction`) or scoped session if there is one
+        in the current context (see `scoped_session`), otherwise new session.
+
+        Read-only sessions are balanced between healthy replicas (if configured) and never join the scope.
+        They go to the primary when all replicas are unhealthy or when the current user (see `bind_user`)
+        has committed writes within the read-your-writes window on any worker, so the user always sees own changes.
+        Replicas may lag behind, so reads that decide on writes or fill caches must use the primary.
+        """
+
+        if read_only and self._replicas:
+            return self._read_only_session()
+
+        return self._primary_session()
+
+    @asynccontextmanager
+    async def scoped_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Shares one session (and one connection checkout) between all `session()` calls in the current context, e.g. request.
+        Explicit commits inside the scope still commit immediately; Uncommitted changes are committed when scope exits
+        without errors and rolled back otherwise.
+        Scope holds its connection until it exits, so it must not wrap long waits (long polling, websockets).
+        """
+
+        if (session := _scoped_session.get()) is not None:  # Nested scope joins the outer one
+            yield session
+            return
+
+        async with self._new_session() as session:
+            token = _scoped_session.set(session)
+            try:
+                yield session
+                await session.commit()
+            finally:
+                _scoped_session.reset(token)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncGenerator[None, None]:
+        """
+        Runs all `session()` calls in the current context in one transaction: it commits when the block exits
+        without errors and rolls back otherwise, so changes of several resources are applied together or not at all.
+        Commits inside the block only release savepoints.
+        Connection is checked out by the first session, so slow work before it (e.g. password hashing) does not hold one.
+        """
+
+        if _transaction.get() is not None:  # Nested transaction joins the outer one
+            yield
+            return
+
+        transaction = _Transaction()
+        token = _transaction.set(transaction)
+        try:
+            yield
+            if transaction.connection is not None:
+                await transaction.connection.commit()
+        finally:
+            _transaction.reset(token)
+            if transaction.session is not None:
+                await transaction.session.close()
+            if transaction.connection is not None:
+                await transaction.connection.close()  # Rolls back if not committed
+
+        for callback in transaction.after_commit:
+            await callback()
+
+    async def run_after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Runs callback after the current transaction (see `transaction`) commits; Outside of a transaction runs it now"""
+
+        if (transaction := _transaction.get()) is None:
+            await callback()
+        else:
+            transaction.after_commit.append(callback)
@@ -0,0 +1,79 @@
+import bisect
+import threading
+import time
+from typing import Dict, List, Any, Set
+
+from greenlet import getcurrent, greenlet
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from src.core.utils.singleton import SingletonMeta
+
+
+class DatabasePoolStatsST(metaclass=SingletonMeta):
+    """Connection pool counters; Shared by all pools, so they survive pool recreation"""
+
+    WAIT_BUCKETS: List[float] = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]  # Seconds; Upper bounds of histogram buckets
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._wait_counts = [0] * (len(self.WAIT_BUCKETS) + 1)  # The last bucket is +inf
+        self._wait_total = 0.0
+        self._checkouts = 0
+        self._overflow_events = 0
+        self._timeouts = 0
+
+    def record_checkout(self, wait: float, overflow: bool) -> None:
+        with self._lock:
+            self._wait_counts[bisect.bisect_left(self.WAIT_BUCKETS, wait)] += 1
+            self._wait_total += wait
+            self._checkouts += 1
+            self._overflow_events += overflow
+
+    def record_timeout(self, wait: float) -> None:
+        with self._lock:
+            self._wait_counts[-1] += 1
+            self._wait_total += wait
+            self._timeouts += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self._checkouts,
+                "overflow_events": self._overflow_events,
+                "timeouts": self._timeouts,
+                "wait_total": self._wait_total,
+                "wait_histogram": {
+                    **{f"le_{bound}": count for bound, count in zip(self.WAIT_BUCKETS, self._wait_counts)},
+                    "le_inf": self._wait_counts[-1]
+                }
+            }
+
+
+class MeteredAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout wait time, overflow connections and checkout timeouts"""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._metered: Set[greenlet] = set()  # Checkouts in progress; QueuePool._do_get retries by calling itself
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        current = getcurrent()
+        if current in self._metered:
+            return super()._do_get()
+
+        self._metered.add(current)
+        overflow_before = self._overflow
+        started = time.perf_counter()
+
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError as error:
+            DatabasePoolStatsST().record_timeout(time.perf_counter() - started)
+            raise error
+        finally:
+            self._metered.discard(current)
+
+        # Counter grows when a new connection is opened; Positive value means it is above pool_size
+        DatabasePoolStatsST().record_checkout(time.perf_counter() - started, self._overflow > max(overflow_before, 0))
+        return entry
@@ -0,0 +1,56 @@
+import asyncio
+from logging import getLogger
+from typing import Set
+
+from redis.exceptions import RedisError
+
+from src.core.state import project_settings
+from src.core.utils.cache import TTLCache
+from src.core.utils.singleton import SingletonMeta
+from src.main.redis import RedisClientManager
+
+_logger = getLogger(__name__)
+
+
+class PrimaryPinsST(RedisClientManager, metaclass=SingletonMeta):
+    """
+    Users whose reads go to the primary for the read-your-writes window after their committed writes.
+
+    Pins are Redis keys with TTL, so a write handled by one worker pins the user on every worker.
+    Local copy answers the worker that made the write without a round trip.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(db=project_settings.REDIS_DB_AUTH)
+        self._local: TTLCache[int, bool] = TTLCache(project_settings.DATABASE_READ_YOUR_WRITES_MAX_USERS)
+        self._store_tasks: Set[asyncio.Task] = set()
+
+    def get_key(self, user_id: int) -> str:
+        return f"db:primary_pins:{user_id}"
+
+    async def _store(self, user_id: int) -> None:
+        try:
+            redis = await self.get_redis()
+            await redis.set(self.get_key(user_id), 1, px=int(project_settings.DATABASE_READ_YOUR_WRITES_WINDOW * 1000))
+        except (RedisError, OSError) as error:
+            _logger.warning(f"Unable to pin user {user_id} to the primary in Redis ({error.__class__.__name__}: {error})")
+
+    def pin(self, user_id: int) -> None:
+        """Pins the user locally at once; Redis key is written in background (called from sync commit events)"""
+
+        self._local.set(user_id, True, project_settings.DATABASE_READ_YOUR_WRITES_WINDOW)
+
+        task = asyncio.get_running_loop().create_task(self._store(user_id))
+        self._store_tasks.add(task)
+        task.add_done_callback(self._store_tasks.discard)
+
+    async def is_pinned(self, user_id: int) -> bool:
+        if user_id in self._local:
+            return True
+
+        try:
+            redis = await self.get_redis()
+            return bool(await redis.exists(self.get_key(user_id)))
+        except (RedisError, OSError) as error:  # Reads go to the primary, so own writes are never missed
+            _logger.warning(f"Unable to check primary pin of user {user_id} in Redis ({error.__class__.__name__}: {error})")
+            return True
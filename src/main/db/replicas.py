@@ -0,0 +1,65 @@
+import asyncio
+from logging import getLogger
+from typing import Optional, Callable, Any, Dict
+
+from sqlalchemy import text, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.exceptions import InitializationError
+
+_logger = getLogger(__name__)
+
+
+class DatabaseReplica:
+    """Read-only copy of the primary database; Marked unhealthy when health check or connection fails"""
+
+    def __init__(self, url: str, engine_kwargs: Dict[str, Any]) -> None:
+        self._url = url
+        self._engine_kwargs = engine_kwargs
+        self._engine: Optional[AsyncEngine] = None
+        self._session_factory: Optional[Callable[[], AsyncSession]] = None
+        self.healthy = True
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {make_url(self._url).render_as_string(hide_password=True)}>"
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            raise InitializationError(f"Unable to get async_engine: {self!r} is not initialized yet")
+
+        return self._engine
+
+    def initialize(self) -> None:
+        self._engine = create_async_engine(self._url, **self._engine_kwargs)
+        self._session_factory = sessionmaker(  # type: ignore
+            self._engine,
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+
+    def new_session(self) -> AsyncSession:
+        if self._session_factory is None:
+            raise InitializationError(f"Unable to get session: {self!r} is not initialized yet")
+
+        return self._session_factory()
+
+    def set_healthy(self, healthy: bool) -> None:
+        if healthy != self.healthy:
+            _logger.warning(f"Database replica {self!r} is {'healthy again' if healthy else 'unhealthy'}")
+
+        self.healthy = healthy
+
+    async def check(self, timeout: float) -> bool:
+        try:
+            async with asyncio.timeout(timeout):
+                async with self.engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+        except Exception as error:
+            _logger.debug(f"Health check of database replica {self!r} failed: {error.__class__.__name__}: {error}")
+            self.set_healthy(False)
+        else:
+            self.set_healthy(True)
+
+        return self.healthy
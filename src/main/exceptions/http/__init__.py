@@ -5,5 +5,6 @@ from .generics import (
     NotFoundHTTPException,
     BadRequestHTTPException,
     ForbiddenHTTPException,
+    TimeOutHTTPException,
     SchemaValidationHTTPException
 )
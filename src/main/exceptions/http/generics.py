@@ -54,6 +54,18 @@ class UnprocessableEntityHTTPException(GenericApplicationHTTPException):
         })
 
 
+class TimeOutHTTPException(GenericApplicationHTTPException):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs, status_code=HTTPStatus.GATEWAY_TIMEOUT)
+
+    def get_default_response_payload(self, **payload_kwargs) -> ApplicationResponsePayload:
+        return ApplicationResponsePayload(**{
+            "ok": False,
+            **project_settings.APPLICATION_STATUS_CODES.GENERIC_ERRORS.TIME_OUT,
+            **payload_kwargs
+        })
+
+
 class SchemaValidationHTTPException(UnprocessableEntityHTTPException):
     def __init__(self, validation_error: Optional[Exception] = None, **kwargs) -> None:  # TODO: Better typing
         self._validation_error: Optional[Exception] = validation_error
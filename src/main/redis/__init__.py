@@ -1,2 +1,3 @@
 from .collections import *
 from .redis_client_manager import RedisClientManager
+from .pubsub_listener import RedisPubSubListenerST
@@ -1 +1,5 @@
+from .abc import AbstractRedisQueue
+from .entry import RedisQueueEntry
+from .overflow import QueueOverflowPolicy, QueueOverflowError
 from .redis_queue import RedisQueue
+from .redis_stream_queue import RedisStreamQueue, parse_entry_id
@@ -0,0 +1,120 @@
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional, TypeVar, Type, Generic, List, Sequence, Any
+
+from redis import asyncio as aioredis
+
+from src.core.db import BaseSchema
+from src.main.redis.redis_client_manager import RedisClientManager
+from .entry import RedisQueueEntry
+from .overflow import QueueOverflowPolicy
+
+_logger = logging.getLogger(__name__)
+_schemaT = TypeVar('_schemaT', bound=BaseSchema)
+
+
+class AbstractRedisQueue(ABC, Generic[_schemaT]):
+    def __init__(
+            self,
+            client_manager: RedisClientManager,
+            schema_cls: Type[_schemaT],
+            key: str,
+            max_size: int = 5000,
+            notify_channel: Optional[str] = None,
+            overflow_policy: QueueOverflowPolicy = QueueOverflowPolicy.DROP_OLDEST,
+            ttl: Optional[int] = None,
+            spill_key: Optional[str] = None,
+            spill_max_size: int = 10000
+    ) -> None:
+        self._client_manager: RedisClientManager = client_manager
+        self._schema_cls: Type[_schemaT] = schema_cls
+        self._max_size = max_size
+        self._key = key
+        self._notify_channel = notify_channel  # If set, every write is announced in this pub/sub channel
+        self._overflow_policy = overflow_policy
+        self._ttl = ttl  # Seconds; Refreshed on every write
+        self._spill_key = f"{key}:spill" if spill_key is None else spill_key
+        self._spill_max_size = spill_max_size
+
+    @property
+    def key(self) -> str:
+        return self._key
+
+    async def _get_redis(self) -> aioredis.client.Redis:
+        return await self._client_manager.get_redis()
+
+    def _encode_schema(self, schema: _schemaT, **kwargs) -> str:
+        return schema.model_dump_json(**kwargs)
+
+    def _decode_schema(self, data: str) -> _schemaT:
+        return self._schema_cls.model_validate(json.loads(data))
+
+    def _to_entry(self, entry_id: Optional[str], data: str) -> RedisQueueEntry[_schemaT]:
+        return RedisQueueEntry(entry_id, data, self._decode_schema)
+
+    async def _run_write_script(self, script: str, data: str, *args: str) -> Any:
+        """
+        Runs write script with KEYS = [key, spill_key]
+        and ARGV = [data, max_size, overflow_policy, ttl, spill_max_size, notify_channel, *args]
+        """
+
+        registered_script = await self._client_manager.get_script(script)
+        return await registered_script(
+            keys=[self._key, self._spill_key],
+            args=[
+                data,
+                self._max_size,
+                self._overflow_policy.value,
+                self._ttl or 0,
+                self._spill_max_size,
+                self._notify_channel or "",
+                *args
+            ]
+        )
+
+    async def _pop_spilled(self, count: int) -> List[RedisQueueEntry[_schemaT]]:
+        if self._overflow_policy != QueueOverflowPolicy.SPILL:
+            return []
+
+        redis = await self._get_redis()
+        data = await redis.lpop(self._spill_key, count)  # type: ignore
+        return [self._to_entry(None, item) for item in data or ()]
+
+    @abstractmethod
+    async def _write_data(self, data: str) -> Optional[str]:
+        """
+        Writes serialized data to the queue and returns id of the created entry (if queue supports ids)
+        Raises QueueOverflowError if queue is full and overflow policy is REJECT_NEW
+        """
+
+    @abstractmethod
+    async def pop_entries(self, count: int) -> List[RedisQueueEntry[_schemaT]]:
+        """Takes up to `count` new entries from the queue without blocking"""
+
+    async def recover_entries(self, last_id: Optional[str] = None) -> List[RedisQueueEntry[_schemaT]]:
+        """
+        Returns entries that were taken earlier but never acknowledged (entries up to `last_id` are acknowledged first)
+        and entries moved to the spill list on overflow.
+        Must not be called while entries taken by this consumer are still being processed, as they would be returned again.
+        """
+        return await self._pop_spilled(self._spill_max_size)
+
+    async def requeue(self, entries: Sequence[RedisQueueEntry[_schemaT]]) -> None:
+        """Returns taken but undelivered entries back to the queue"""
+
+    async def ack(self, *entry_ids: str) -> None:
+        """Marks entries as processed. Queues without delivery tracking ignore acknowledgements"""
+
+    def _check_schema(self, schema: _schemaT) -> None:
+        if not isinstance(schema, self._schema_cls):
+            raise TypeError(f"{self.__class__.__name__} can only contain objects of type {self._schema_cls.__name__}")
+
+    def make_entry(self, schema: _schemaT, **kwargs) -> RedisQueueEntry[_schemaT]:
+        """Creates entry without writing it to Redis; Such entry can be written later with `requeue`"""
+        self._check_schema(schema)
+        return RedisQueueEntry(None, self._encode_schema(schema, **kwargs), self._decode_schema, schema=schema)
+
+    async def write_schema(self, schema: _schemaT, **kwargs) -> Optional[str]:
+        self._check_schema(schema)
+        return await self._write_data(self._encode_schema(schema, **kwargs))
@@ -0,0 +1,30 @@
+from typing import Callable, Generic, Optional, TypeVar
+
+from src.core.db import BaseSchema
+
+_schemaT = TypeVar('_schemaT', bound=BaseSchema)
+
+
+class RedisQueueEntry(Generic[_schemaT]):
+    """
+    Queue entry as it is stored in Redis. `raw` is the serialized entry;
+    It is decoded only when `schema` is accessed for the first time.
+    """
+
+    def __init__(
+            self,
+            entry_id: Optional[str],
+            raw: str,
+            decoder: Callable[[str], _schemaT],
+            schema: Optional[_schemaT] = None
+    ) -> None:
+        self.id: Optional[str] = entry_id  # None for list-based queues and entries that were never stored in Redis
+        self.raw: str = raw
+        self._decoder = decoder
+        self._schema: Optional[_schemaT] = schema
+
+    @property
+    def schema(self) -> _schemaT:
+        if self._schema is None:
+            self._schema = self._decoder(self.raw)
+        return self._schema
@@ -0,0 +1,13 @@
+from enum import Enum
+
+from src.core.exceptions import BaseApplicationError
+
+
+class QueueOverflowPolicy(Enum):
+    DROP_OLDEST = "drop_oldest"  # Oldest entries are removed to keep the queue at its capacity
+    REJECT_NEW = "reject_new"  # Writes to a full queue raise QueueOverflowError
+    SPILL = "spill"  # Oldest entries are moved to a secondary (spill) list with its own capacity
+
+
+class QueueOverflowError(BaseApplicationError):
+    pass
@@ -1,62 +1,59 @@
-import json
 import logging
-from typing import AsyncGenerator, Optional, TypeVar, Type, Generic
-
-from redis import asyncio as aioredis
+from typing import TypeVar, List, Sequence
 
 from src.core.db import BaseSchema
-from src.core.utils.types import JsonDict
-from src.main.redis.redis_client_manager import RedisClientManager
+from .abc import AbstractRedisQueue
+from .entry import RedisQueueEntry
+from .overflow import QueueOverflowError
 
 _logger = logging.getLogger(__name__)
 _schemaT = TypeVar('_schemaT', bound=BaseSchema)
 
 
-class RedisQueue(Generic[_schemaT]):
-    def __init__(
-            self,
-            client_manager: RedisClientManager,
-            schema_cls: Type[_schemaT],
-            key: str,
-            max_size: int = 5000,
-            overflow_buffer: int = 100
-    ) -> None:
-        self._client_manager: RedisClientManager = client_manager
-        self._schema_cls: Type[_schemaT] = schema_cls
-        self._overflow_buffer = overflow_buffer
-        self._max_size = max_size
-        self._key = key
-
-    async def _get_redis(self) -> aioredis.client.Redis:
-        return await self._client_manager.get_redis()
+class RedisQueue(AbstractRedisQueue[_schemaT]):
+    # Push, overflow handling, TTL refresh and notification in one round trip
+    WRITE_SCRIPT: str = """
+        local max_size = tonumber(ARGV[2])
+        local policy = ARGV[3]
+        local ttl = tonumber(ARGV[4])
 
-    async def _write_data(self, data: str) -> None:
-        redis = await self._get_redis()
+        if policy == 'reject_new' and redis.call('LLEN', KEYS[1]) >= max_size then
+            return -1
+        end
 
-        new_size = await redis.rpush(self._key, data)  # type: ignore
-        if new_size > self._max_size:
-            await redis.ltrim(self._key, self._max_size - self._overflow_buffer, -1)  # type: ignore
+        local size = redis.call('RPUSH', KEYS[1], ARGV[1])
+        local overflow = size - max_size
 
-    async def _write_json(self, data: JsonDict) -> None:
-        await self._write_data(json.dumps(data))
+        if overflow > 0 then
+            if policy == 'spill' then
+                redis.call('RPUSH', KEYS[2], unpack(redis.call('LRANGE', KEYS[1], 0, overflow - 1)))
+                redis.call('LTRIM', KEYS[2], -tonumber(ARGV[5]), -1)
+                if ttl > 0 then redis.call('EXPIRE', KEYS[2], ttl) end
+            end
 
-    async def _read_data(self, *, timeout: int = 0) -> AsyncGenerator[Optional[str], None]:
-        redis = await self._get_redis()
+            redis.call('LTRIM', KEYS[1], overflow, -1)
+            size = max_size
+        end
 
-        while True:
-            data = await redis.blpop([self._key], timeout=timeout)  # type: ignore
-            yield None if data is None else data[1]
+        if ttl > 0 then redis.call('EXPIRE', KEYS[1], ttl) end
+        if ARGV[6] ~= '' then redis.call('PUBLISH', ARGV[6], KEYS[1]) end
 
-    async def _read_json(self, **kwargs) -> AsyncGenerator[Optional[JsonDict], None]:
-        async for data in self._read_data(**kwargs):  # type: ignore
-            yield None if data is None else json.loads(data)
+        return size
+    """
 
-    async def write_schema(self, schema: _schemaT, **kwargs) -> None:
-        if not isinstance(schema, self._schema_cls):
-            raise TypeError(f"{self.__class__.__name__} can only contain objects of type {self._schema_cls.__name__}")
+    async def _write_data(self, data: str) -> None:
+        if await self._run_write_script(self.WRITE_SCRIPT, data) < 0:
+            raise QueueOverflowError(f"Queue {self._key} is full ({self._max_size} entries)")
+
+    async def pop_entries(self, count: int) -> List[RedisQueueEntry[_schemaT]]:
+        redis = await self._get_redis()
+        data = await redis.lpop(self._key, count)  # type: ignore
+        return [self._to_entry(None, item) for item in data or ()]
 
-        await self._write_data(schema.model_dump_json(**kwargs))
+    async def requeue(self, entries: Sequence[RedisQueueEntry[_schemaT]]) -> None:
+        if not entries:
+            return
 
-    async def read_schema(self, **kwargs) -> AsyncGenerator[Optional[_schemaT], None]:
-        async for data in self._read_json(**kwargs):
-            yield None if data is None else self._schema_cls.model_validate(data)
+        # LPUSH inserts elements one by one, so reversed order keeps the original order at the head of the list
+        redis = await self._get_redis()
+        await redis.lpush(self._key, *(entry.raw for entry in reversed(entries)))  # type: ignore
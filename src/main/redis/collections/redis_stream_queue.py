@@ -0,0 +1,234 @@
+import logging
+import re
+from typing import AsyncGenerator, Optional, TypeVar, List, Tuple, Dict, Sequence, Callable, Awaitable
+
+from redis import asyncio as aioredis
+from redis.exceptions import ResponseError
+
+from src.core.db import BaseSchema
+from .abc import AbstractRedisQueue
+from .entry import RedisQueueEntry
+from .overflow import QueueOverflowError
+
+_logger = logging.getLogger(__name__)
+_schemaT = TypeVar('_schemaT', bound=BaseSchema)
+_resultT = TypeVar('_resultT')
+_StreamMessage = Tuple[str, Optional[Dict[str, str]]]
+
+_ENTRY_ID_PATTERN = re.compile(r"^(\d+)-(\d+)$")
+
+
+def parse_entry_id(entry_id: str) -> Tuple[int, int]:
+    """Parses stream entry id (`<ms>-<seq>`) into comparable tuple; Raises ValueError if id is malformed"""
+
+    if (match := _ENTRY_ID_PATTERN.match(entry_id)) is None:
+        raise ValueError(f"Invalid stream entry id: {entry_id!r}")
+
+    return int(match.group(1)), int(match.group(2))
+
+
+class RedisStreamQueue(AbstractRedisQueue[_schemaT]):
+    """
+    Queue backed by a Redis stream and a consumer group.
+
+    Entries stay in the consumer group's pending list until they are acknowledged with `ack`,
+    so entries read by a consumer that died before processing them are delivered again
+    on the next read (own pending entries) or reclaimed from other consumers after `claim_min_idle_time`.
+    Every reading process must use its own consumer name; Otherwise live consumers' entries can't be told
+    from abandoned ones.
+    """
+
+    DATA_FIELD: str = "data"
+
+    # Add, overflow handling, TTL refresh and notification in one round trip; ARGV[7] = data field, ARGV[8] = group.
+    # Acknowledged entries are deleted (see `ack`), so the length counts only unread and unacknowledged entries.
+    WRITE_SCRIPT: str = """
+        local max_size = tonumber(ARGV[2])
+        local policy = ARGV[3]
+        local ttl = tonumber(ARGV[4])
+
+        if policy == 'reject_new' and redis.call('XLEN', KEYS[1]) >= max_size then
+            return false
+        end
+
+        local entry_id = redis.call('XADD', KEYS[1], '*', ARGV[7], ARGV[1])
+
+        if redis.call('XLEN', KEYS[1]) > max_size then
+            if policy == 'spill' then
+                -- Only entries never read by the group are spilled; Read ones are pending in a consumer
+                local last_delivered_id = '0-0'
+                for _, group in ipairs(redis.call('XINFO', 'GROUPS', KEYS[1])) do
+                    local fields = {}
+                    for i = 1, #group, 2 do fields[group[i]] = group[i + 1] end
+                    if fields['name'] == ARGV[8] then last_delivered_id = fields['last-delivered-id'] end
+                end
+
+                local overflow = redis.call('XLEN', KEYS[1]) - max_size
+                local spilled = {}
+                for _, entry in ipairs(redis.call('XRANGE', KEYS[1], '(' .. last_delivered_id, '+', 'COUNT', overflow)) do
+                    redis.call('RPUSH', KEYS[2], entry[2][2])  -- Entries have only one field (ARGV[7])
+                    table.insert(spilled, entry[1])
+                end
+
+                if #spilled > 0 then
+                    redis.call('XDEL', KEYS[1], unpack(spilled))
+                    redis.call('LTRIM', KEYS[2], -tonumber(ARGV[5]), -1)
+                    if ttl > 0 then redis.call('EXPIRE', KEYS[2], ttl) end
+                end
+            end
+
+            redis.call('XTRIM', KEYS[1], 'MAXLEN', max_size)  -- Oldest pending entries are dropped if all others are pending
+        end
+
+        if ttl > 0 then redis.call('EXPIRE', KEYS[1], ttl) end
+        if ARGV[6] ~= '' then redis.call('PUBLISH', ARGV[6], KEYS[1]) end
+
+        return entry_id
+    """
+
+    def __init__(
+            self,
+            *,
+            group: str = "default",
+            consumer: str = "default",
+            read_count: int = 100,
+            claim_min_idle_time: int = 60_000,
+            **kwargs
+    ) -> None:
+        super().__init__(**kwargs)
+        self._group = group
+        self._consumer = consumer
+        self._read_count = read_count
+        self._claim_min_idle_time = claim_min_idle_time  # ms
+
+    async def _create_group(self, redis: aioredis.client.Redis) -> None:
+        try:
+            await redis.xgroup_create(self._key, self._group, id="0", mkstream=True)
+        except ResponseError as error:
+            if "BUSYGROUP" not in str(error):  # Created concurrently
+                raise error
+
+    async def _with_group(self, redis: aioredis.client.Redis, operation: Callable[[], Awaitable[_resultT]]) -> _resultT:
+        """Runs group operation; The group is created only when Redis reports it missing (new or expired stream)"""
+
+        try:
+            return await operation()
+        except ResponseError as error:
+            if "NOGROUP" not in str(error):
+                raise error
+
+        await self._create_group(redis)
+        return await operation()
+
+    async def _write_data(self, data: str) -> str:
+        entry_id = await self._run_write_script(self.WRITE_SCRIPT, data, self.DATA_FIELD, self._group)
+        if entry_id is None:
+            raise QueueOverflowError(f"Queue {self._key} is full ({self._max_size} entries)")
+
+        return entry_id
+
+    async def _read_group(self, redis: aioredis.client.Redis, stream_id: str, count: Optional[int] = None) -> List[_StreamMessage]:
+        response = await redis.xreadgroup(
+            self._group,
+            self._consumer,
+            {self._key: stream_id},
+            count=self._read_count if count is None else count
+        )
+        return response[0][1] if response else []
+
+    async def _ack(self, redis: aioredis.client.Redis, *entry_ids: str) -> None:
+        # Acknowledged entries are deleted, so they neither count towards the capacity nor get spilled
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self._key, self._group, *entry_ids)
+            pipe.xdel(self._key, *entry_ids)
+            await pipe.execute()
+
+    async def _ack_until(self, redis: aioredis.client.Redis, last_id: str) -> None:
+        while pending := await redis.xpending_range(
+                self._key,
+                self._group,
+                min="-",
+                max=last_id,
+                count=self._read_count,
+                consumername=self._consumer
+        ):
+            await self._ack(redis, *(item["message_id"] for item in pending))
+
+    async def _read_pending(self, redis: aioredis.client.Redis) -> AsyncGenerator[_StreamMessage, None]:
+        stream_id = "0"
+        while messages := await self._read_group(redis, stream_id):
+            for message in messages:
+                yield message
+            stream_id = messages[-1][0]
+
+    async def _claim_stale(self, redis: aioredis.client.Redis) -> AsyncGenerator[_StreamMessage, None]:
+        start_id = "0-0"
+        while True:
+            next_id, messages, *_ = await redis.xautoclaim(
+                self._key,
+                self._group,
+                self._consumer,
+                min_idle_time=self._claim_min_idle_time,
+                start_id=start_id,
+                count=self._read_count
+            )
+            for message in messages:
+                yield message
+
+            if next_id in ("0-0", b"0-0"):
+                return
+            start_id = next_id
+
+    async def _message_to_entry(self, redis: aioredis.client.Redis, message: _StreamMessage) -> Optional[RedisQueueEntry[_schemaT]]:
+        entry_id, fields = message
+
+        if not fields or self.DATA_FIELD not in fields:  # Entry was trimmed while being pending
+            await self._ack(redis, entry_id)
+            return None
+
+        return self._to_entry(entry_id, fields[self.DATA_FIELD])
+
+    async def _to_entries(self, redis: aioredis.client.Redis, messages: List[_StreamMessage]) -> List[RedisQueueEntry[_schemaT]]:
+        entries = []
+        for message in messages:
+            if (entry := await self._message_to_entry(redis, message)) is not None:
+                entries.append(entry)
+        return entries
+
+    async def recover_entries(self, last_id: Optional[str] = None) -> List[RedisQueueEntry[_schemaT]]:
+        redis = await self._get_redis()
+        return await self._with_group(redis, lambda: self._recover_entries(redis, last_id))
+
+    async def _recover_entries(self, redis: aioredis.client.Redis, last_id: Optional[str]) -> List[RedisQueueEntry[_schemaT]]:
+        if last_id is not None:
+            await self._ack_until(redis, last_id)
+
+        # Own pending entries go first, then entries abandoned by other consumers, then spilled entries
+        messages = [message async for message in self._read_pending(redis)]
+        claimed = [message async for message in self._claim_stale(redis)]
+
+        if last_id is not None:  # Abandoned entries up to `last_id` were delivered by a consumer that died before acknowledging them
+            last_key = parse_entry_id(last_id)
+            if delivered := [entry_id for entry_id, _ in claimed if parse_entry_id(entry_id) <= last_key]:
+                await self._ack(redis, *delivered)
+                claimed = [message for message in claimed if parse_entry_id(message[0]) > last_key]
+
+        return [*await self._to_entries(redis, [*messages, *claimed]), *await super().recover_entries()]
+
+    async def pop_entries(self, count: int) -> List[RedisQueueEntry[_schemaT]]:
+        redis = await self._get_redis()
+        messages = await self._with_group(redis, lambda: self._read_group(redis, ">", count=count))
+        return await self._to_entries(redis, messages)
+
+    async def requeue(self, entries: Sequence[RedisQueueEntry[_schemaT]]) -> None:
+        # Entries with ids stay in the pending list until acknowledged; Only entries that were never stored are written
+        for entry in entries:
+            if entry.id is None:
+                await self._write_data(entry.raw)
+
+    async def ack(self, *entry_ids: str) -> None:
+        if not entry_ids:
+            return
+
+        redis = await self._get_redis()
+        await self._ack(redis, *entry_ids)
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+
+from redis.asyncio.client import PubSub
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+from src.core.utils.errors import supress_exception, get_traceback_text
+from src.core.utils.singleton import SingletonMeta
+from .redis_client_manager import RedisClientManager
+
+_logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str], None]
+ReconnectHandler = Callable[[], None]
+
+
+class RedisPubSubListenerST(RedisClientManager, metaclass=SingletonMeta):
+    """
+    Process-wide pub/sub listener. All channels share one Redis connection and one reader task,
+    so the number of pub/sub connections depends only on the number of worker processes.
+
+    Handlers are called from the reader task, so they must be fast and must not block.
+    Messages published while the connection is down are lost; Reconnect handlers are called
+    after resubscribing, so the owners of the channels can resynchronize their state.
+    """
+
+    RECONNECT_DELAY: float = 1.0
+
+    def __init__(self) -> None:
+        super().__init__()  # Pub/sub channels are not bound to a database
+        self._handlers: Dict[str, List[MessageHandler]] = {}
+        self._reconnect_handlers: List[ReconnectHandler] = []
+        self._pubsub: Optional[PubSub] = None
+        self._listen_task: Optional[asyncio.Task] = None
+
+    async def _get_pubsub(self) -> PubSub:
+        if self._pubsub is None:
+            redis = await self.get_redis()
+            self._pubsub = redis.pubsub(ignore_subscribe_messages=True)
+
+        return self._pubsub
+
+    def _is_reconnecting(self) -> bool:
+        # Listener resubscribes to all registered channels once the connection is restored
+        return self._pubsub is None and self._listen_task is not None and not self._listen_task.done()
+
+    def _ensure_listening(self) -> None:
+        if self._listen_task is None or self._listen_task.done():
+            self._listen_task = asyncio.create_task(self._listen())
+
+    def _dispatch(self, channel: str, data: str) -> None:
+        for handler in tuple(self._handlers.get(channel, ())):
+            try:
+                handler(data)
+            except Exception as error:
+                _logger.error(f"Pub/sub handler for channel {channel} failed:\n{get_traceback_text(error)}")
+
+    async def _close_pubsub(self) -> None:
+        if self._pubsub is not None:
+            with supress_exception(Exception):
+                await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def _resubscribe(self) -> PubSub:
+        pubsub = await self._get_pubsub()
+        if self._handlers:
+            await pubsub.subscribe(*self._handlers.keys())
+
+        for handler in tuple(self._reconnect_handlers):
+            handler()
+
+        return pubsub
+
+    async def _listen(self) -> None:
+        while self._handlers or self._pubsub is not None:
+            try:
+                pubsub = self._pubsub if self._pubsub is not None else await self._resubscribe()
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+            except (RedisConnectionError, RedisTimeoutError, OSError) as error:
+                _logger.warning(f"Pub/sub connection lost ({error.__class__.__name__}: {error}); Reconnecting")
+                await self._close_pubsub()
+                await asyncio.sleep(self.RECONNECT_DELAY)
+                continue
+
+            if message is not None and message["type"] == "message":
+                self._dispatch(message["channel"], message["data"])
+
+    def add_reconnect_handler(self, handler: ReconnectHandler) -> None:
+        self._reconnect_handlers.append(handler)
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        handlers = self._handlers.setdefault(channel, [])
+        handlers.append(handler)
+
+        if len(handlers) == 1 and not self._is_reconnecting():
+            pubsub = await self._get_pubsub()
+            await pubsub.subscribe(channel)
+
+        self._ensure_listening()
+
+    async def unsubscribe(self, channel: str, handler: MessageHandler) -> None:
+        handlers = self._handlers.get(channel)
+        if handlers is None:
+            return
+
+        with supress_exception(ValueError):
+            handlers.remove(handler)
+
+        if not handlers:
+            del self._handlers[channel]
+
+            if self._pubsub is not None:
+                await self._pubsub.unsubscribe(channel)
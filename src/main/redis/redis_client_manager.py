@@ -1,7 +1,8 @@
 import logging
-from typing import Optional, Self, Generator, Any
+from typing import Optional, Self, Generator, Any, Dict
 
 from redis import asyncio as aioredis
+from redis.commands.core import AsyncScript
 
 from src.core.state import project_settings
 
@@ -12,6 +13,7 @@ class RedisClientManager:
     def __init__(self, db: int = 0) -> None:
         self._db: int = db
         self._redis: Optional[aioredis.client.Redis] = None
+        self._scripts: Dict[str, AsyncScript] = {}  # By script source
 
     def __await__(self) -> Generator[Any, None, Self]:
         return self.initialize().__await__()
@@ -32,3 +34,12 @@ class RedisClientManager:
             self._redis = await self._create_redis()
 
         return self._redis
+
+    async def get_script(self, script: str) -> AsyncScript:
+        """Returns Lua script registered on the client; Registered once, so calls don't rebuild it (and its SHA)"""
+
+        if (registered := self._scripts.get(script)) is None:
+            redis = await self.get_redis()
+            registered = self._scripts[script] = redis.register_script(script)
+
+        return registered
@@ -1,5 +1,5 @@
 from abc import abstractmethod, ABC
-from typing import Generic, TypeVar, Type, Optional
+from typing import Generic, TypeVar, Type, Optional, Sequence
 
 from sqlalchemy import select, delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -45,8 +45,17 @@ class BaseResource(ABC, Generic[_modelT]):  # TODO: Add validators and methods-e
             session.add(model_obj)
             await session.commit()
 
-    async def get_by_id(self, object_id: int) -> _modelT:
+    async def save_many(self, model_objs: Sequence[_modelT]) -> None:
+        """Saves all objects in one transaction (inserts are sent as multi-row statements)"""
+        if not model_objs:
+            return
+
         async with _db_manager.session() as session:
+            session.add_all(model_objs)
+            await session.commit()
+
+    async def get_by_id(self, object_id: int) -> _modelT:
+        async with _db_manager.session(read_only=True) as session:
             if (obj := await self._fetch_by_id(session, object_id)) is not None:
                 return obj
             raise self.__model_cls__.DoesNotExist(f"Not found {self.__model_cls__.__name__} with id={object_id}")
@@ -3,4 +3,6 @@ from .router import auth_router
 from .login import *
 from .refresh import *
 from .register import *
+from .register_bulk import *
 from .me import *
+from .logout import *
@@ -0,0 +1,18 @@
+from fastapi import Depends
+
+from src.main.components.auth.models.user import UserInternal
+from src.main.components.auth.repository import AuthRepositoryST
+from src.main.components.auth.utils.dependencies.http_auth import HTTPJWTBearerAuthDependency
+from src.main.db import scoped_session_dependency
+from src.main.http import ApplicationJsonResponse
+from src.main.http.responses import SuccessResponse
+from ..router import auth_router
+
+_jwt_auth = HTTPJWTBearerAuthDependency()
+_auth_repository = AuthRepositoryST()
+
+
+@auth_router.post("/logout/", dependencies=[Depends(scoped_session_dependency)])
+async def logout_route(user: UserInternal = Depends(_jwt_auth)) -> ApplicationJsonResponse:
+    await _auth_repository.logout(user)
+    return SuccessResponse()
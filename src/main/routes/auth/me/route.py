@@ -5,6 +5,7 @@ from fastapi import Depends
 from src.core.state import project_settings
 from src.main.components.auth.models.user import UserInternal, UserPrivate
 from src.main.components.auth.utils.dependencies.http_auth import HTTPJWTBearerAuthDependency
+from src.main.db import scoped_session_dependency
 from src.main.http import ApplicationJsonResponse
 from src.main.models import ApplicationResponsePayload
 from .schemas import GetMeResponsePayload
@@ -13,7 +14,7 @@ from ..router import auth_router
 _jwt_auth = HTTPJWTBearerAuthDependency()
 
 
-@auth_router.get("/me/")
+@auth_router.get("/me/", dependencies=[Depends(scoped_session_dependency)])
 async def get_me_route(user: UserInternal = Depends(_jwt_auth)) -> ApplicationJsonResponse:
     return ApplicationJsonResponse(
         status_code=HTTPStatus.OK,
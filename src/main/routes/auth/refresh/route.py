@@ -1,7 +1,10 @@
 from http import HTTPStatus
 
+from fastapi import Depends
+
 from src.core.state import project_settings
 from src.main.components.auth.repository import AuthRepositoryST
+from src.main.db import scoped_session_dependency
 from src.main.http import ApplicationJsonResponse
 from src.main.models import ApplicationResponsePayload
 from .schemas import RefreshRequestPayload, RefreshResponsePayload
@@ -10,7 +13,7 @@ from ..router import auth_router
 _auth_repository = AuthRepositoryST()
 
 
-@auth_router.post("/refresh/")
+@auth_router.post("/refresh/", dependencies=[Depends(scoped_session_dependency)])
 async def refresh_route(token: RefreshRequestPayload) -> ApplicationJsonResponse:
     _, token_pair = await _auth_repository.refresh(token.refresh_token)
 
@@ -0,0 +1 @@
+from .route import register_bulk_route
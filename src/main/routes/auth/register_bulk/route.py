@@ -0,0 +1,65 @@
+from http import HTTPStatus
+
+from fastapi import Depends
+
+from src.core.state import project_settings
+from src.main.components.auth.models.user import UserInternal, UserPrivate
+from src.main.components.auth.repository import AuthRepositoryST
+from src.main.components.auth.utils.dependencies.http_auth import HTTPJWTBearerAuthDependency
+from src.main.components.devices.repository.devices_repository import DevicesRepositoryST
+from src.main.db import AsyncDatabaseManagerST
+from src.main.exceptions.http.generics import ForbiddenHTTPException, BadRequestHTTPException
+from src.main.http import ApplicationJsonResponse
+from src.main.models import ApplicationResponsePayload
+from .schemas import BulkRegisterRequestPayload, BulkRegisterResponsePayload, BulkRegisterItemResult
+from ..router import auth_router
+
+_jwt_auth = HTTPJWTBearerAuthDependency()
+_auth_repository = AuthRepositoryST()
+_devices_repository = DevicesRepositoryST()
+_db_manager = AsyncDatabaseManagerST()
+
+
+@auth_router.post("/register/bulk/")
+async def register_bulk_route(payload: BulkRegisterRequestPayload, user: UserInternal = Depends(_jwt_auth)) -> ApplicationJsonResponse:
+    if user.is_device:
+        raise ForbiddenHTTPException(message="Only non-device user can provision devices")
+
+    if len(payload.devices) > project_settings.AUTH_BULK_REGISTER_MAX_SIZE:
+        raise BadRequestHTTPException(message=f"Unable to register more than {project_settings.AUTH_BULK_REGISTER_MAX_SIZE} devices at once")
+
+    async with _db_manager.transaction():  # Devices and their pairs are created together or not at all
+        users = await _auth_repository.create_users([
+            {"username": device.username, "password": device.password, "is_device": True}
+            for device in payload.devices
+        ])
+
+        created = [item for item in users if item is not None]
+        if payload.pair and created:
+            await _devices_repository.pair_devices(user, created)
+
+    tokens = iter(await _auth_repository.issue_token_pairs(created))  # Only for committed users
+    registered = [None if item is None else (item, next(tokens)) for item in users]
+
+    results = [
+        BulkRegisterItemResult(
+            **project_settings.APPLICATION_STATUS_CODES.GENERIC_ERRORS.ALREADY_EXISTS,
+            username=device.username
+        )
+        if item is None else
+        BulkRegisterItemResult(
+            **project_settings.APPLICATION_STATUS_CODES.GENERICS.CREATED,
+            username=device.username,
+            user=item[0].convert_to(UserPrivate),
+            tokens=item[1]
+        )
+        for device, item in zip(payload.devices, registered)
+    ]
+
+    return ApplicationJsonResponse(
+        status_code=HTTPStatus.CREATED if len(created) == len(payload.devices) else HTTPStatus.MULTI_STATUS,  # Conflicts are reported per item
+        content=ApplicationResponsePayload[BulkRegisterResponsePayload](
+            **project_settings.APPLICATION_STATUS_CODES.GENERICS.CREATED,
+            data=BulkRegisterResponsePayload(created=len(created), results=results)
+        )
+    )
@@ -0,0 +1,30 @@
+from typing import List, Optional
+
+from pydantic import Field
+
+from src.core.db import BaseSchema
+from src.main.components.auth.models.auth_token_pair import AuthTokenPair
+from src.main.components.auth.models.user import UserPrivate
+
+
+class BulkRegisterDevicePayload(BaseSchema):
+    username: str
+    password: str
+
+
+class BulkRegisterRequestPayload(BaseSchema):
+    devices: List[BulkRegisterDevicePayload] = Field(min_length=1)  # Limited by AUTH_BULK_REGISTER_MAX_SIZE
+    pair: bool = False  # Pair created devices with the caller
+
+
+class BulkRegisterItemResult(BaseSchema):
+    application_status_code: int
+    message: str
+    username: str
+    user: Optional[UserPrivate] = None
+    tokens: Optional[AuthTokenPair] = None
+
+
+class BulkRegisterResponsePayload(BaseSchema):
+    created: int
+    results: List[BulkRegisterItemResult]
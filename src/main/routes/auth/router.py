@@ -2,4 +2,5 @@ from fastapi import APIRouter
 
 from src.main.http import ApplicationResponseApiRoute
 
+# Login and registration hash passwords for hundreds of milliseconds, so only the other routes share a scoped session
 auth_router = APIRouter(route_class=ApplicationResponseApiRoute)
@@ -5,3 +5,5 @@ from .unpair_device import *
 from .pair_requests import *
 from .owner import *
 from .devices import *
+from .changes import *
+from .events import *
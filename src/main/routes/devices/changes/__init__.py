@@ -0,0 +1 @@
+from .route import get_device_changes_route
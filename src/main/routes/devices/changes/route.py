@@ -0,0 +1,38 @@
+from fastapi import Depends
+
+from src.core.state import project_settings
+from src.main.components.auth.models.user import UserInternal
+from src.main.components.auth.utils.dependencies.http_auth import HTTPJWTBearerAuthDependency
+from src.main.components.devices.repository.devices_repository import DevicesRepositoryST
+from src.main.db import scoped_session_dependency
+from src.main.exceptions import BadRequestHTTPException
+from src.main.http import ApplicationJsonResponse
+from src.main.http.responses import SuccessResponse
+from .schemas import DeviceChangesResponsePayload
+from ..router import devices_router
+
+_jwt_auth = HTTPJWTBearerAuthDependency()
+_devices_repository = DevicesRepositoryST()
+
+
+@devices_router.get("/changes/", dependencies=[Depends(scoped_session_dependency)])
+async def get_device_changes_route(since: int = 0, user: UserInternal = Depends(_jwt_auth)) -> ApplicationJsonResponse:
+    """
+    Returns pairs created and removed after version `since` (see `version` of `/devices/`) in order of their versions.
+    Users get changes of their devices; Devices get changes of their owner.
+    """
+
+    if since < 0:
+        raise BadRequestHTTPException(message="Version must not be negative")
+
+    page_size = project_settings.DEVICE_PAIR_CHANGES_PAGE_SIZE
+    changes = await _devices_repository.get_pair_changes(user, since, page_size + 1)  # One more to find out if there are more changes
+    has_more, changes = len(changes) > page_size, changes[:page_size]
+
+    return SuccessResponse(
+        data=DeviceChangesResponsePayload(
+            changes=changes,
+            version=changes[-1].version if changes else since,
+            has_more=has_more
+        )
+    )
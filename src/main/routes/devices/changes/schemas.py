@@ -0,0 +1,10 @@
+from typing import List
+
+from src.core.db import BaseSchema
+from src.main.components.devices.models.device_pair_change import DevicePairChange
+
+
+class DeviceChangesResponsePayload(BaseSchema):
+    changes: List[DevicePairChange]
+    version: int  # Pass as `since` to receive later changes
+    has_more: bool  # True if there are more changes after `version` already
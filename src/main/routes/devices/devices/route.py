@@ -1,8 +1,13 @@
+from typing import Optional
+
 from fastapi import Depends
 
-from src.main.components.auth.models.user import UserInternal, UserPublic
+from src.core.state import project_settings
+from src.main.components.auth.models.user import UserInternal
 from src.main.components.auth.utils.dependencies.http_auth import HTTPJWTBearerAuthDependency
 from src.main.components.devices.repository.devices_repository import DevicesRepositoryST
+from src.main.db import scoped_session_dependency
+from src.main.exceptions import BadRequestHTTPException
 from src.main.exceptions.http.generics import ForbiddenHTTPException
 from src.main.http import ApplicationJsonResponse
 from src.main.http.responses import SuccessResponse
@@ -13,16 +18,30 @@ _jwt_auth = HTTPJWTBearerAuthDependency()
 _devices_repository = DevicesRepositoryST()
 
 
-@devices_router.get("/")
-async def get_devices_route(user: UserInternal = Depends(_jwt_auth)) -> ApplicationJsonResponse:
+@devices_router.get("/", dependencies=[Depends(scoped_session_dependency)])
+async def get_devices_route(
+        after_id: int = 0,
+        limit: Optional[int] = None,  # All devices are returned if not specified
+        user: UserInternal = Depends(_jwt_auth)
+) -> ApplicationJsonResponse:
     if user.is_device:
         raise ForbiddenHTTPException(message="Only non-device user can have devices")
 
-    devices_internal = await _devices_repository.get_devices(user)
-    devices = list(map(lambda x: x.convert_to(UserPublic), devices_internal))
+    if limit is not None and limit < 1:
+        raise BadRequestHTTPException(message="Limit must be positive")
+
+    if limit is None:
+        devices, version = await _devices_repository.get_devices_page(user, after_id)
+        has_next_page = False
+    else:
+        page_size = min(limit, project_settings.DEVICES_PAGE_MAX_SIZE)
+        devices, version = await _devices_repository.get_devices_page(user, after_id, page_size + 1)  # One more to find out if there is next page
+        has_next_page, devices = len(devices) > page_size, devices[:page_size]
 
     return SuccessResponse(
         data=DevicesResponsePayload(
-            devices=devices
+            devices=devices,
+            version=version,
+            next_after_id=devices[-1].id if has_next_page else None
         )
     )
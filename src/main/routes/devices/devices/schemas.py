@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from src.core.db import BaseSchema
 from src.main.components.auth.models.user import UserPublic
@@ -6,3 +6,5 @@ from src.main.components.auth.models.user import UserPublic
 
 class DevicesResponsePayload(BaseSchema):
     devices: List[UserPublic]
+    version: int  # Pass as `since` to `/devices/changes/` to receive later changes
+    next_after_id: Optional[int] = None  # Pass as `after_id` to receive the next page; None if this page is the last
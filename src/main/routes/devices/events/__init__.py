@@ -0,0 +1 @@
+from .route import device_events_ws_route
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+
+from fastapi import Depends
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from src.core.utils.collections import for_each
+from src.core.utils.websockets import ws_return_if_closed, is_websocket_connected
+from src.main.components.auth.models.user import UserInternal
+from src.main.components.auth.utils.dependencies.ws_auth import WSJWTBearerAuthDependency
+from src.main.components.devices.internal_utils.device_events import DeviceEventsSubscriber
+from src.main.components.devices.models.device_event import DeviceEvent, DeviceEventType
+from src.main.components.devices.repository.devices_repository import DevicesRepositoryST
+from ..router import devices_router
+
+_logger = logging.getLogger(__name__)
+_jwt_auth = WSJWTBearerAuthDependency()
+_devices_repository = DevicesRepositoryST()
+
+
+async def _send_pending_requests(websocket: WebSocket, user: UserInternal) -> None:
+    if not user.is_device:  # Only devices receive pair requests
+        return
+
+    pair_requests = await _devices_repository.get_pending_pair_requests(user.id)
+    event = DeviceEvent(
+        event_type=DeviceEventType.PAIR_REQUESTS,
+        data={"pair_requests": [request.serialize() for request in pair_requests]}
+    )
+    await websocket.send_text(event.model_dump_json())
+
+
+async def _listen_task(websocket: WebSocket, user: UserInternal, subscriber: DeviceEventsSubscriber) -> None:
+    try:
+        # Subscribed before the snapshot, so requests sent meanwhile are not lost (but may be sent twice)
+        await _send_pending_requests(websocket, user)
+
+        while True:
+            event = await subscriber.get()
+
+            if event is None:  # Events may have been lost while pub/sub was reconnecting
+                await _send_pending_requests(websocket, user)
+                continue
+
+            await websocket.send_text(event.model_dump_json())
+    except (WebSocketDisconnect, RuntimeError):
+        _logger.debug(f"Device events listener (user {user.id}): websocket disconnected")
+    except asyncio.CancelledError:
+        _logger.debug(f"Device events listener (user {user.id}): task canceled")
+
+
+@devices_router.websocket("/me/events/")
+@ws_return_if_closed
+async def device_events_ws_route(websocket: WebSocket, user: UserInternal = Depends(_jwt_auth)) -> None:
+    """
+    Pushes pair events of the user: `pair_request_created` and `pair_request_state_changed`;
+    Devices also get `pair_requests` with all pending requests on connect.
+    Replaces polling of `/me/pair/requests/` and waiting in `/device/{device_identifier}/pair/`.
+    """
+
+    await websocket.accept()
+
+    subscriber = await _devices_repository.subscribe_to_events(user.id)
+    listen_task = asyncio.create_task(_listen_task(websocket, user, subscriber))
+
+    try:
+        while is_websocket_connected(websocket):
+            receive_task = asyncio.create_task(websocket.receive_text())  # Client frames are ignored; Used to detect disconnection
+            done, pending = await asyncio.wait([listen_task, receive_task], return_when=asyncio.FIRST_COMPLETED)
+
+            try:
+                await asyncio.gather(*done)
+            except WebSocketDisconnect:
+                _logger.debug(f"Device events ws (user {user.id}) disconnected")
+            except OSError as error:
+                _logger.debug(f"Device events ws (user {user.id}) disconnected: {error.__class__.__name__}: {error}")
+                return
+            except Exception as error:
+                for_each(asyncio.Task.cancel, pending)
+                raise error
+
+            if listen_task in done:
+                for_each(asyncio.Task.cancel, pending)
+                return
+    finally:
+        if not listen_task.done():
+            listen_task.cancel()
+
+        await _devices_repository.unsubscribe_from_events(subscriber)
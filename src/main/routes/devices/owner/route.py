@@ -3,6 +3,7 @@ from fastapi import Depends
 from src.main.components.auth.models.user import UserInternal, UserPublic
 from src.main.components.auth.utils.dependencies.http_auth import HTTPJWTBearerAuthDependency
 from src.main.components.devices.repository.devices_repository import DevicesRepositoryST
+from src.main.db import scoped_session_dependency
 from src.main.exceptions.http.generics import ForbiddenHTTPException
 from src.main.http import ApplicationJsonResponse
 from src.main.http.responses import SuccessResponse
@@ -13,7 +14,7 @@ _jwt_auth = HTTPJWTBearerAuthDependency()
 _devices_repository = DevicesRepositoryST()
 
 
-@devices_router.get("/me/owner/")
+@devices_router.get("/me/owner/", dependencies=[Depends(scoped_session_dependency)])
 async def get_owner_route(user: UserInternal = Depends(_jwt_auth)) -> ApplicationJsonResponse:
     if not user.is_device:
         raise ForbiddenHTTPException(message="Non-device user can not have owner")
@@ -48,7 +48,7 @@ async def pair_device_route(
 
     await _devices_repository.send_pair_reqeust(request)
     with supress_exception(asyncio.TimeoutError):
-        await request.wait_for_state_change(timeout=30)
+        await _devices_repository.wait_for_pair_request_state(request, timeout=30)
 
     return SuccessResponse(
         **(
@@ -3,6 +3,7 @@ from fastapi import Depends
 from src.main.components.auth.models.user import UserInternal
 from src.main.components.auth.utils.dependencies.http_auth import HTTPJWTBearerAuthDependency
 from src.main.components.devices.repository.devices_repository import DevicesRepositoryST
+from src.main.db import scoped_session_dependency
 from src.main.exceptions import BadRequestHTTPException
 from src.main.http import ApplicationJsonResponse
 from src.main.http.responses import UpdatedResponse, SuccessResponse
@@ -28,7 +29,7 @@ async def pair_requests_get_route(user: UserInternal = Depends(_jwt_auth)) -> Ap
     )
 
 
-@devices_router.post("/me/pair/requests/request/{request_uuid}/{action}/")
+@devices_router.post("/me/pair/requests/request/{request_uuid}/{action}/", dependencies=[Depends(scoped_session_dependency)])
 async def pair_requests_post_route(request_uuid: str, action: str, user: UserInternal = Depends(_jwt_auth)) -> ApplicationJsonResponse:
     try:
         action_enum = PairRequestRespondAction[action.upper()]
@@ -2,3 +2,4 @@ from .router import storage_router
 
 from .storage_ws import *
 from .write import *
+from .rpc import *
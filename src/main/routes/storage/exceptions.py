@@ -1,7 +1 @@
-from abc import ABC
-
-from src.main.exceptions import GenericApplicationHTTPException
-
-
-class StorageHTTPException(GenericApplicationHTTPException, ABC):
-    pass
+from src.main.components.storage.exceptions import StorageHTTPException
@@ -0,0 +1 @@
+from .route import storage_rpc_route
@@ -0,0 +1,35 @@
+from fastapi import Depends
+
+from src.core.state import project_settings
+from src.main.components.auth.models.user import UserInternal
+from src.main.components.auth.utils.dependencies.http_auth import HTTPJWTBearerAuthDependency
+from src.main.components.storage.repository import StorageRepositoryST
+from src.main.http import ApplicationJsonResponse
+from src.main.http.responses import SuccessResponse
+from .schemas import RpcRequestPayload, RpcResponsePayload
+from ..router import storage_router
+
+_jwt_auth = HTTPJWTBearerAuthDependency()
+_storage_repository = StorageRepositoryST()
+
+
+@storage_router.post("/rpc/")
+async def storage_rpc_route(payload: RpcRequestPayload, user: UserInternal = Depends(_jwt_auth)) -> ApplicationJsonResponse:
+    timeout = min(
+        project_settings.STORAGE_RPC_DEFAULT_TIMEOUT if payload.timeout is None else payload.timeout,
+        project_settings.STORAGE_RPC_MAX_TIMEOUT
+    )
+
+    response = await _storage_repository.call(
+        sender_user_id=user.id,
+        target_user_id=payload.target_user_id,
+        data=payload.data,
+        timeout=timeout
+    )
+
+    return SuccessResponse(data=RpcResponsePayload(
+        request_uuid=response.request_uuid,
+        sender_user_id=response.sender_user_id,
+        created_at=response.created_at,
+        data=response.data
+    ))
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import Field
+
+from src.core.db import BaseSchema
+from src.core.utils.types import JsonDict
+from ..write.schemas import StorageWriteRequestPayload
+
+
+class RpcRequestPayload(StorageWriteRequestPayload):
+    timeout: Optional[float] = Field(default=None, gt=0)  # Seconds; Limited by STORAGE_RPC_MAX_TIMEOUT
+
+
+class RpcResponsePayload(BaseSchema):
+    request_uuid: str
+    sender_user_id: int
+    created_at: datetime
+    data: JsonDict
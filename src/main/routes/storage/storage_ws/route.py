@@ -1,60 +1,205 @@
 import asyncio
 import logging
+from typing import Optional, List
 
 from fastapi import Depends
+from pydantic import ValidationError
+from starlette import status
 from starlette.websockets import WebSocket, WebSocketDisconnect
 
+from src.core.state import project_settings
 from src.core.utils.collections import for_each
+from src.core.utils.errors import get_traceback_text, supress_exception
+from src.core.utils.scheduler import IdleTimer
 from src.core.utils.websockets import ws_return_if_closed, is_websocket_connected
+from src.main.components.auth.exceptions import AuthHTTPException
 from src.main.components.auth.models.user import UserInternal
+from src.main.components.auth.repository import AuthRepositoryST
 from src.main.components.auth.utils.dependencies.ws_auth import WSJWTBearerAuthDependency
+from src.main.components.storage.internal_utils.storage_dispatcher import StorageSubscriber, StorageEntry
 from src.main.components.storage.repository import StorageRepositoryST
-from .utils import send_storage_data_message_ws
+from src.main.exceptions import ApplicationHTTPException, SchemaValidationHTTPException
+from src.main.models import ApplicationResponsePayload
+from src.main.redis.collections import parse_entry_id
+from .schemas import StorageClientFrame
+from .utils import (
+    send_storage_raw_data_message_ws,
+    send_storage_raw_data_batch_ws,
+    send_storage_response_ws,
+    StorageDeliveryMode,
+    StorageClientMessageType
+)
+from ..write.schemas import WriteRequestPayload, WriteResponsePayload, StorageWriteResponsePayload
 from ..router import storage_router
 
 _logger = logging.getLogger(__name__)
 _jwt_auth = WSJWTBearerAuthDependency()  # FIXME: Always respond 403 when there is error with connection
 _storage_repository = StorageRepositoryST()
+_auth_repository = AuthRepositoryST()
 
 
-async def _listen_task(websocket: WebSocket, user: UserInternal) -> None:
-    generator = _storage_repository.wait_for_data_message(user_id=user.id)
+async def _take_entries(subscriber: StorageSubscriber, delivery_mode: StorageDeliveryMode) -> List[StorageEntry]:
+    if delivery_mode == StorageDeliveryMode.BATCH:
+        return await subscriber.get_batch(project_settings.STORAGE_WS_BATCH_MAX_SIZE, project_settings.STORAGE_WS_BATCH_WINDOW)
+    return [await subscriber.get()]
+
+
+async def _send_entries(websocket: WebSocket, entries: List[StorageEntry], delivery_mode: StorageDeliveryMode) -> None:
+    # Entries contain client-facing JSON written by the server itself, so it is forwarded as is
+    if delivery_mode == StorageDeliveryMode.BATCH:
+        await send_storage_raw_data_batch_ws(websocket=websocket, messages=[(entry.id, entry.raw) for entry in entries])
+        return
+
+    for entry in entries:
+        await send_storage_raw_data_message_ws(websocket=websocket, raw_data=entry.raw, message_id=entry.id)
+
+
+async def _close_idle_websocket(websocket: WebSocket, user: UserInternal) -> None:
+    _logger.debug(f"Storage ws (user {user.id}): closing idle connection")
+
+    with supress_exception(Exception):  # Connection may be already closed
+        await websocket.close(code=status.WS_1000_NORMAL_CLOSURE, reason="Idle timeout")
+
+
+async def _listen_task(
+        websocket: WebSocket,
+        user: UserInternal,
+        last_id: Optional[str] = None,
+        delivery_mode: StorageDeliveryMode = StorageDeliveryMode.SINGLE,
+        idle_timer: Optional[IdleTimer] = None
+) -> None:
+    subscriber = await _storage_repository.subscribe(user_id=user.id, last_id=last_id)
+    entries: List[StorageEntry] = []
 
     try:
-        # Sending data until access token is not expired; Then closing the connection
-        async for schema in generator:
-            if schema is None:  # TODO: Use timeout to handle access_token expiration
-                continue
-            await send_storage_data_message_ws(
-                websocket=websocket,
-                data=schema.to_json_dict(exclude="target_user_id")
-            )
+        # Sending data until the connection is closed (also when a client frame comes with expired or revoked token)
+        while True:  # TODO: Close the connection when access token expires even if client sends nothing
+            entries = await _take_entries(subscriber, delivery_mode)
+            await _send_entries(websocket, entries, delivery_mode)
+            entries, delivered = [], entries
+
+            if idle_timer is not None:
+                idle_timer.touch()
+
+            # Acknowledge only delivered entries, so the rest is resent after reconnect
+            if entry_ids := [entry.id for entry in delivered if entry.id is not None]:
+                await _storage_repository.ack_data_entries(user.id, *entry_ids)
     except (WebSocketDisconnect, RuntimeError):
         _logger.debug(f"Storage listener (user {user.id}): websocket disconnected")
     except asyncio.CancelledError:
         _logger.debug(f"Storage listener (user {user.id}): task canceled")
+    finally:
+        await _storage_repository.unsubscribe(subscriber, *entries)
+
+
+async def _process_client_frame(user: UserInternal, frame: StorageClientFrame) -> ApplicationResponsePayload:
+    if frame.msg_type == StorageClientMessageType.WRITE_REQUEST:
+        request_payload = WriteRequestPayload.model_validate(frame.payload)
+        request_uuid = await _storage_repository.send_request(
+            sender_user_id=user.id,
+            target_user_id=request_payload.target_user_id,
+            data=request_payload.data
+        )
+        return ApplicationResponsePayload(
+            **project_settings.APPLICATION_STATUS_CODES.GENERICS.SUCCESS,
+            data=StorageWriteResponsePayload(request_uuid=request_uuid)
+        )
+
+    response_payload = WriteResponsePayload.model_validate(frame.payload)
+    await _storage_repository.send_response(
+        sender_user_id=user.id,
+        target_user_id=response_payload.target_user_id,
+        response_to_request_uuid=response_payload.response_to_request_uuid,
+        data=response_payload.data
+    )
+    return ApplicationResponsePayload(**project_settings.APPLICATION_STATUS_CODES.GENERICS.SUCCESS)
+
+
+async def _is_access_token_valid(websocket: WebSocket, user: UserInternal, access_token: str) -> bool:
+    """Checks expiration and revocation of the token the socket was opened with; Closes the socket if it is not valid anymore"""
+
+    try:
+        await _auth_repository.authenticate(access_token)  # Cached tokens are checked without I/O
+        return True
+    except AuthHTTPException as error:
+        _logger.debug(f"Storage ws (user {user.id}): access token is not valid anymore; Closing")
+        with supress_exception(Exception):  # Connection may be already closed
+            await websocket.close(code=error.payload.application_status_code, reason=error.payload.message)
+        return False
+
+
+async def _handle_client_frame(websocket: WebSocket, user: UserInternal, text: str) -> None:
+    """Handles write frame sent by client; The user authenticated on connect is the sender"""
+
+    correlation_id = None
+    try:
+        frame = StorageClientFrame.model_validate_json(text)
+        correlation_id = frame.correlation_id
+        payload = await _process_client_frame(user, frame)
+    except ValidationError as error:
+        payload = SchemaValidationHTTPException(validation_error=error).payload
+    except ApplicationHTTPException as error:
+        payload = error.payload
+    except Exception as error:
+        _logger.error(f"Storage ws (user {user.id}): unable to handle client frame:\n{get_traceback_text(error)}")
+        payload = ApplicationResponsePayload(ok=False, **project_settings.APPLICATION_STATUS_CODES.GENERIC_ERRORS.INTERNAL_SERVER_ERROR)
+
+    await send_storage_response_ws(websocket, payload, correlation_id)
 
 
 @storage_router.websocket("/")
 @ws_return_if_closed
-async def storage_ws_route(websocket: WebSocket, user: UserInternal = Depends(_jwt_auth)) -> None:
+async def storage_ws_route(
+        websocket: WebSocket,
+        last_id: Optional[str] = None,  # Id of the last received message; Used to resume after reconnect
+        delivery_mode: StorageDeliveryMode = StorageDeliveryMode.SINGLE,
+        user: UserInternal = Depends(_jwt_auth)
+) -> None:
+    access_token = await _jwt_auth.extract_token(websocket.headers.get("Authorization"))  # Already validated by `_jwt_auth`
     await websocket.accept()
 
-    listen_task = asyncio.create_task(_listen_task(websocket, user))
-    while is_websocket_connected(websocket):
-        receive_task = asyncio.create_task(websocket.receive_text())
-        done, pending = await asyncio.wait([listen_task, receive_task], return_when=asyncio.FIRST_COMPLETED)
-
+    if last_id is not None:
         try:
-            await asyncio.gather(*done)
-        except WebSocketDisconnect:
-            _logger.debug(f"Storage ws (user {user.id}) disconnected")
-        except OSError as error:
-            _logger.debug(f"Storage ws (user {user.id}) disconnected: {error.__class__.__name__}: {error}")
-            return  # TODO: Close WebSocket?
-        except Exception as error:
-            for_each(asyncio.Task.cancel, pending)
-            raise error
+            parse_entry_id(last_id)
+        except ValueError:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid last_id: expected <ms>-<seq>")
+            return
+
+    idle_timer = (
+        IdleTimer(project_settings.STORAGE_WS_IDLE_TIMEOUT, lambda: _close_idle_websocket(websocket, user))
+        if project_settings.STORAGE_WS_IDLE_TIMEOUT > 0 else
+        None
+    )
+
+    listen_task = asyncio.create_task(_listen_task(websocket, user, last_id, delivery_mode, idle_timer))
+    try:
+        while is_websocket_connected(websocket):
+            receive_task = asyncio.create_task(websocket.receive_text())
+            done, pending = await asyncio.wait([listen_task, receive_task], return_when=asyncio.FIRST_COMPLETED)
+
+            try:
+                await asyncio.gather(*done)
+
+                if receive_task in done:
+                    if idle_timer is not None:
+                        idle_timer.touch()
+
+                    # Writes must stop when the token expires or the user logs out
+                    if not await _is_access_token_valid(websocket, user, access_token):
+                        break
+
+                    await _handle_client_frame(websocket, user, receive_task.result())
+            except WebSocketDisconnect:
+                _logger.debug(f"Storage ws (user {user.id}) disconnected")
+            except OSError as error:
+                _logger.debug(f"Storage ws (user {user.id}) disconnected: {error.__class__.__name__}: {error}")
+                return  # TODO: Close WebSocket?
+            except Exception as error:
+                for_each(asyncio.Task.cancel, pending)
+                raise error
+    finally:
+        if idle_timer is not None:
+            idle_timer.cancel()
 
     if not listen_task.done():
         listen_task.cancel()
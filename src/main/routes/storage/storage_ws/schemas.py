@@ -0,0 +1,11 @@
+from typing import Optional
+
+from src.core.db import BaseSchema
+from src.core.utils.types import JsonDict
+from .utils import StorageClientMessageType
+
+
+class StorageClientFrame(BaseSchema):
+    msg_type: StorageClientMessageType
+    correlation_id: Optional[str] = None  # Set by client; Returned in the RESPONSE frame
+    payload: JsonDict
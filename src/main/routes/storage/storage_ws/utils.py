@@ -1,16 +1,55 @@
+import json
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, Optional, List, Tuple
 
 from fastapi.websockets import WebSocket
 
+from src.main.models import ApplicationResponsePayload
+
 
 class StorageMessageType(Enum):
     RESPONSE = 1
     DATA = 2
+    DATA_BATCH = 3
+
+
+class StorageClientMessageType(Enum):
+    WRITE_REQUEST = 1
+    WRITE_RESPONSE = 2
+
 
+class StorageDeliveryMode(Enum):
+    SINGLE = "single"  # One frame per message
+    BATCH = "batch"  # Messages available within a short window are sent in one frame
 
-async def send_storage_data_message_ws(websocket: WebSocket, data: Dict[str, Any]) -> None:
+
+async def send_storage_data_message_ws(websocket: WebSocket, data: Dict[str, Any], message_id: Optional[str] = None) -> None:
     await websocket.send_json({
         "msg_type": StorageMessageType.DATA.value,
+        "id": message_id,
         "data": data
     })
+
+
+async def send_storage_response_ws(websocket: WebSocket, payload: ApplicationResponsePayload, correlation_id: Optional[str] = None) -> None:
+    await websocket.send_text(
+        f'{{"msg_type":{StorageMessageType.RESPONSE.value},'
+        f'"correlation_id":{json.dumps(correlation_id)},'
+        f'"payload":{payload.model_dump_json()}}}'
+    )
+
+
+async def send_storage_raw_data_message_ws(websocket: WebSocket, raw_data: str, message_id: Optional[str] = None) -> None:
+    """Sends DATA frame with already serialized (trusted) data without decoding it"""
+    await websocket.send_text(_render_raw_data_message(raw_data, message_id, msg_type=StorageMessageType.DATA.value))
+
+
+async def send_storage_raw_data_batch_ws(websocket: WebSocket, messages: List[Tuple[Optional[str], str]]) -> None:
+    """Sends DATA_BATCH frame with already serialized (trusted) data without decoding it"""
+    rendered = ",".join(_render_raw_data_message(raw_data, message_id) for message_id, raw_data in messages)
+    await websocket.send_text(f'{{"msg_type":{StorageMessageType.DATA_BATCH.value},"messages":[{rendered}]}}')
+
+
+def _render_raw_data_message(raw_data: str, message_id: Optional[str], msg_type: Optional[int] = None) -> str:
+    prefix = "" if msg_type is None else f'"msg_type":{msg_type},'
+    return f'{{{prefix}"id":{json.dumps(message_id)},"data":{raw_data}}}'